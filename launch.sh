@@ -4,6 +4,10 @@
 #
 # Последовательный запуск экспериментов.
 #
+# Каждый запуск - отдельный процесс с повторной загрузкой моделей. Без этих затрат на запуск:
+#   python workflow.py serve
+#   python workflow.py submit <файл>
+#
 ##########################################################################################################
 
 # Тема: Cancer breast calcification
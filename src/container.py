@@ -10,6 +10,7 @@ from sqlalchemy.orm import sessionmaker, Session
 
 from src.config.database import DatabaseConfig
 from src.modules.module_registry import get_module_class
+from src.modules.ner.model_cache import ModelCache
 from src.orm.database import (
     create_engine_from_config,
     create_session_factory_from_engine,
@@ -69,6 +70,9 @@ class Container(containers.DeclarativeContainer):
         session_factory=db_session_factory,
     )
 
+    # Кеш моделей NER на время жизни процесса: повторно созданные модули не загружают веса заново
+    model_cache = providers.Singleton(ModelCache)
+
     module = providers.Factory(
         lambda module, type, **kwargs: get_module_class(module, type)(**kwargs)
     )
@@ -1,7 +1,8 @@
 """
 Регистрация модулей.
 
-При создании нового модуля его следует зарегистрировать в этом файле.
+При создании нового модуля его следует зарегистрировать в этом файле: (модуль, тип) -> путь импорта Python-класса.
+Класс импортируется только при первом запросе модуля, поэтому здесь нельзя импортировать сами модули.
 
 Следующий код не будет работать без этого файла:
 
@@ -14,44 +15,30 @@ module = container.module(
 )
 """
 from src.modules.module_registry import register_module
-from .cleaner.database import CleanerDatabase
-from .dictionary.cui import DictionaryCui
-from .dictionary.drugbank import DictionaryDrugBank
-from .dictionary.go import DictionaryGo
-from .dictionary.hpo import DictionaryHpo
-from .dictionary.icd10 import DictionaryIcd10
-from .dictionary.mesh import DictionaryMesh
-from .dictionary.nci import DictionaryNci
-from .dictionary.snomed import DictionarySnomed
-from .dictionary.who import DictionaryWho
-from .fetcher.pubmed import PubMedFetcher
-from .fetcher.pubmed_central import PubMedCentralFetcher
-from .ner.pos_based_hybrid import PosBasedHybrid
-from .ner.transformer import TransformerGlinerBiomedBiLargeV1
-from .ner.transformer import TransformerBiomedicalNerAll
-from .ner.transformer import TransformerOpenBioner
-from .candidate.emerging_term_detection import EmergingTermDetection
-from .output.charts import ChartsOutput
-from .output.excel import ExcelOutput
-from .pytest.pytest_module import PytestModule
 
-register_module(CleanerDatabase)
-register_module(PubMedCentralFetcher)
-register_module(PubMedFetcher)
-register_module(PosBasedHybrid)
-register_module(TransformerGlinerBiomedBiLargeV1)
-register_module(TransformerBiomedicalNerAll)
-register_module(TransformerOpenBioner)
-register_module(EmergingTermDetection)
-register_module(PytestModule)
-register_module(DictionaryMesh)
-register_module(DictionarySnomed)
-register_module(DictionaryCui)
-register_module(DictionaryDrugBank)
-register_module(DictionaryGo)
-register_module(DictionaryHpo)
-register_module(DictionaryIcd10)
-register_module(DictionaryNci)
-register_module(DictionaryWho)
-register_module(ExcelOutput)
-register_module(ChartsOutput)
+register_module("cleaner", "database", "src.modules.cleaner.database.CleanerDatabase")
+register_module("fetcher", "pubmed-central", "src.modules.fetcher.pubmed_central.PubMedCentralFetcher")
+register_module("fetcher", "pubmed", "src.modules.fetcher.pubmed.PubMedFetcher")
+register_module("fetcher", "pubmed-baseline", "src.modules.fetcher.pubmed_baseline.PubMedBaselineFetcher")
+register_module("ner", "pos-based-hybrid", "src.modules.ner.pos_based_hybrid.PosBasedHybrid")
+register_module("ner", "transformer-gliner-biomed-bi-large-v1.0",
+                "src.modules.ner.transformer.transformer_gliner_biomed_bi_large_v1.TransformerGlinerBiomedBiLargeV1")
+register_module("ner", "transformer-biomedical-ner-all",
+                "src.modules.ner.transformer.transformer_biomedical_ner_all.TransformerBiomedicalNerAll")
+register_module("ner", "transformer-open-bioner",
+                "src.modules.ner.transformer.transformer_open_bioner.TransformerOpenBioner")
+register_module("candidate", "emerging-term-detection",
+                "src.modules.candidate.emerging_term_detection.EmergingTermDetection")
+register_module("pytest", "pytest", "src.modules.pytest.pytest_module.PytestModule")
+register_module("dictionary", "MeSH", "src.modules.dictionary.mesh.DictionaryMesh")
+register_module("dictionary", "SNOMED CT", "src.modules.dictionary.snomed.DictionarySnomed")
+register_module("dictionary", "CUI", "src.modules.dictionary.cui.DictionaryCui")
+register_module("dictionary", "DrugBank", "src.modules.dictionary.drugbank.DictionaryDrugBank")
+register_module("dictionary", "GO", "src.modules.dictionary.go.DictionaryGo")
+register_module("dictionary", "HPO", "src.modules.dictionary.hpo.DictionaryHpo")
+register_module("dictionary", "ICD10", "src.modules.dictionary.icd10.DictionaryIcd10")
+register_module("dictionary", "NCI", "src.modules.dictionary.nci.DictionaryNci")
+register_module("dictionary", "WHO", "src.modules.dictionary.who.DictionaryWho")
+register_module("output", "excel", "src.modules.output.excel.ExcelOutput")
+register_module("output", "charts", "src.modules.output.charts.ChartsOutput")
+register_module("output", "parquet", "src.modules.output.parquet.ParquetOutput")
@@ -1,11 +1,13 @@
 import logging
 
-from sqlalchemy import text
-from sqlalchemy.dialects.postgresql import insert
+import numpy as np
+from sqlalchemy import text, Result
 from sqlalchemy.orm import Session
 
 from src.helper import all_years_range
+from src.modules.candidate.emerging_term_detection.term_year_matrix import TermYearMatrix
 from src.modules.module import Module, ModuleInfo
+from src.orm.bulk_loader import BulkLoader
 from src.orm.models import Dictionary, Candidate
 
 
@@ -14,19 +16,39 @@ class EmergingTermDetection(Module):
     Модуль поиска терминов-кандидатов.
     """
 
+    # Способы расчета метрик:
+    # python - расчет в Python по каждому термину;
+    # sql - расчет целиком в PostgreSQL одним запросом INSERT ... SELECT;
+    # numpy - векторный расчет по матрице "термин × год".
+    ENGINES = ("python", "sql", "numpy")
+
+    # Размер пакета строк при потоковом чтении результатов запроса
+    YIELD_PER: int = 10000
+
+    tables = ("candidates",)
+
+    # Колонки кандидатов для записи через COPY (способы расчета python и numpy)
+    CANDIDATE_COLUMNS = ["term_id", "first_year", "last_year", "first_stable_year", "max_consecutive", "growth",
+                         "total_mentions", "counts_per_year"]
+
     def __init__(self, min_years_present: int | str, min_growth: int | float | str, min_total_mentions: int | str,
-                 dictionaries: list[str]):
+                 dictionaries: list[str], engine: str = "python"):
         """
         Args:
             min_years_present: минимальная устойчивость - количество лет подряд с ненулевой частотой
             min_growth: минимальный рост
             min_total_mentions: минимальное количество упоминаний
             dictionaries: список словарей
+            engine: способ расчета метрик, см. ENGINES
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Неизвестный способ расчета: {engine}. Варианты: {", ".join(self.ENGINES)}")
+
         self.min_years_present = int(min_years_present)
         self.min_growth = float(min_growth)
         self.min_total_mentions = int(min_total_mentions)
         self.dictionaries = set(dictionaries)
+        self.engine = engine
         self.logger = logging.getLogger(EmergingTermDetection.info().name())
 
     @staticmethod
@@ -38,9 +60,18 @@ class EmergingTermDetection(Module):
 
         with container.db_session() as session:
             dictionaries = self._load_dictionaries(session, self.dictionaries)
+            self._mark_tables_changed(session)
+
+            if self.engine == "sql":
+                self._search_and_save_sql(session, dictionaries)
+                return
+
+            if self.engine == "numpy":
+                self._search_and_save_numpy(session, dictionaries, all_years_range(session))
+                return
 
             # Получение терминов по годам. Пример:
-            # [{'year': Decimal('2005'), 'term_id': 52224, 'count': 1}, ...]
+            # [{'year': 2005, 'term_id': 52224, 'count': 1}, ...]
             terms_count_by_year_rows = self._fetch_terms_count_by_year(session, dictionaries)
 
             # Агрегация. Пример:
@@ -54,28 +85,41 @@ class EmergingTermDetection(Module):
             self._search_and_save(session, terms_count_by_year, all_years)
 
     def _fetch_terms_count_by_year(self, session: Session, dictionaries) -> list[dict]:
-        params, joins_sql, where_sql = Dictionary.filter_not_in_dict(dictionaries)
+        return self._query_terms_count_by_year(session, dictionaries).mappings().all()
+
+    def _query_terms_count_by_year(self, session: Session, dictionaries, yield_per: int | None = None) -> Result:
+        """
+        Запрос частоты терминов по годам из агрегата term_year_counts (заполняется модулями NER).
+
+        Args:
+            session: сессия SQLAlchemy
+            dictionaries: список словарей
+            yield_per: размер пакета для потокового чтения, None - прочитать результат сразу
+
+        Returns:
+            Результат запроса со строками (year, term_id, count)
+        """
+        params, where_sql = Dictionary.filter_not_in_dict(dictionaries)
 
         # Финальный SQL
         sql = text(f"""
             SELECT
-                EXTRACT(YEAR FROM a.pubdate) AS year,       -- Год
-                t.id                         AS term_id,    -- Термин
-                COUNT(*)                     AS count       -- Количество
+                c.year       AS year,       -- Год
+                t.id         AS term_id,    -- Термин
+                SUM(c.count) AS count       -- Количество
             FROM terms t
-                JOIN article_term_annotations ann ON t.id = ann.term_id
-                JOIN articles a ON a.id = ann.article_id
-                {joins_sql}
+                JOIN term_year_counts c ON t.id = c.term_id
             WHERE 1=1 
                 {where_sql}
-            GROUP BY year, t.id
-            ORDER BY year
+            GROUP BY c.year, t.id
+            ORDER BY c.year
         """)
 
         # Оставлено для отладки
         # print(sql, params, sep="\n")
 
-        return session.execute(sql, params).mappings().all()
+        execution_options = {"yield_per": yield_per} if yield_per else {}
+        return session.execute(sql, params, execution_options=execution_options)
 
     def _group_by_term(self, terms_count_by_year_rows: list[dict]) -> dict:
         terms_data_by_term = {}
@@ -98,7 +142,7 @@ class EmergingTermDetection(Module):
     def _search_and_save(self, session: Session, terms_count_by_year: dict, all_years: range):
         self.logger.info(f"Выбрано терминов: {len(terms_count_by_year)}")
 
-        candidate_cnt = 0
+        rows = []
         for term_id, data in terms_count_by_year.items():
             counts = data['counts_per_year']
             counts_filled = [counts.get(y, 0) for y in all_years]
@@ -155,21 +199,141 @@ class EmergingTermDetection(Module):
                 counts_per_year=data['counts_per_year']
             )
 
-            stmt = insert(Candidate).values(
-                term_id=candidate.term_id,
-                first_year=candidate.first_year,
-                last_year=candidate.last_year,
-                first_stable_year=candidate.first_stable_year,
-                max_consecutive=candidate.max_consecutive,
-                growth=candidate.growth,
-                total_mentions=candidate.total_mentions,
-                counts_per_year=candidate.counts_per_year,
-            ).on_conflict_do_nothing(index_elements=['term_id'])
+            rows.append(tuple(getattr(candidate, column) for column in self.CANDIDATE_COLUMNS))
+
+        self._save_candidates(session, rows)
+
+        self.logger.info(f"Найдено терминов-кандидатов: {len(rows)}")
+
+    def _search_and_save_sql(self, session: Session, dictionaries) -> None:
+        """
+        Поиск терминов-кандидатов и сохранение в БД одним запросом.
+
+        Метрики те же, что и в _search_and_save().
+        Максимальная последовательность лет - задача "gaps and islands": у лет одной непрерывной
+        последовательности разность "год - номер строки" одинакова.
+        """
+        params, where_sql = Dictionary.filter_not_in_dict(dictionaries)
+        params.update({
+            "min_years_present": self.min_years_present,
+            "min_growth": self.min_growth,
+            "min_total_mentions": self.min_total_mentions,
+        })
 
-            candidate_cnt += 1
+        # Финальный SQL
+        sql = text(f"""
+            WITH counts AS (
+                -- Частота терминов по годам
+                SELECT
+                    t.id               AS term_id,
+                    c.year             AS year,
+                    SUM(c.count)::int  AS count
+                FROM terms t
+                    JOIN term_year_counts c ON t.id = c.term_id
+                WHERE 1=1
+                    {where_sql}
+                GROUP BY t.id, c.year
+            ),
+            islands AS (
+                -- Номер непрерывной последовательности лет
+                SELECT
+                    term_id,
+                    year,
+                    year - ROW_NUMBER() OVER (PARTITION BY term_id ORDER BY year) AS island
+                FROM counts
+            ),
+            stable AS (
+                -- Самая длинная последовательность, при равенстве - самая ранняя
+                SELECT DISTINCT ON (term_id)
+                    term_id,
+                    MIN(year) AS first_stable_year,
+                    COUNT(*)  AS max_consecutive
+                FROM islands
+                GROUP BY term_id, island
+                ORDER BY term_id, COUNT(*) DESC, MIN(year)
+            ),
+            stats AS (
+                SELECT
+                    term_id,
+                    MIN(year)                                 AS first_year,
+                    MAX(year)                                 AS last_year,
+                    MAX(count)::float
+                        / (ARRAY_AGG(count ORDER BY year))[1] AS growth,
+                    SUM(count)                                AS total_mentions,
+                    JSON_OBJECT_AGG(year, count ORDER BY year) AS counts_per_year
+                FROM counts
+                GROUP BY term_id
+            )
+            INSERT INTO candidates (term_id, first_year, last_year, first_stable_year, max_consecutive, growth,
+                                    total_mentions, counts_per_year)
+            SELECT
+                s.term_id, s.first_year, s.last_year, st.first_stable_year, st.max_consecutive, s.growth,
+                s.total_mentions, s.counts_per_year
+            FROM stats s
+                JOIN stable st ON st.term_id = s.term_id
+            WHERE st.max_consecutive >= :min_years_present
+                AND s.growth >= :min_growth
+                AND s.total_mentions >= :min_total_mentions
+            ON CONFLICT (term_id) DO NOTHING
+        """)
 
-            session.execute(stmt)
+        # Оставлено для отладки
+        # print(sql, params, sep="\n")
 
+        candidate_cnt = session.execute(sql, params).rowcount
         session.commit()
 
         self.logger.info(f"Найдено терминов-кандидатов: {candidate_cnt}")
+
+    def _search_and_save_numpy(self, session: Session, dictionaries, all_years: range) -> None:
+        """
+        Поиск терминов-кандидатов по матрице "термин × год" и пакетное сохранение в БД.
+
+        Метрики те же, что и в _search_and_save(), но считаются сразу для всех терминов.
+        Матрица сохраняется в self.matrix для расчета дополнительных статистик без повторного запроса.
+        """
+        result = self._query_terms_count_by_year(session, dictionaries, yield_per=self.YIELD_PER)
+        self.matrix = TermYearMatrix.from_rows(result.partitions(), all_years)
+        matrix = self.matrix
+
+        self.logger.info(f"Выбрано терминов: {len(matrix.term_ids)}")
+
+        is_candidate = (
+                (matrix.max_consecutive >= self.min_years_present)
+                & (matrix.growth >= self.min_growth)
+                & (matrix.total_mentions >= self.min_total_mentions)
+        )
+
+        # Типы numpy приводятся к типам Python для передачи в драйвер БД.
+        # Порядок значений - CANDIDATE_COLUMNS.
+        rows = [
+            (
+                int(matrix.term_ids[idx]),
+                int(matrix.first_year[idx]),
+                int(matrix.last_year[idx]),
+                int(matrix.first_stable_year[idx]),
+                int(matrix.max_consecutive[idx]),
+                float(matrix.growth[idx]),
+                int(matrix.total_mentions[idx]),
+                matrix.counts_per_year(idx),
+            )
+            for idx in np.flatnonzero(is_candidate)
+        ]
+
+        self._save_candidates(session, rows)
+
+        self.logger.info(f"Найдено терминов-кандидатов: {len(rows)}")
+
+    def _save_candidates(self, session: Session, rows: list[tuple]) -> None:
+        """
+        Сохранение терминов-кандидатов в БД через COPY.
+
+        Args:
+            session: сессия SQLAlchemy
+            rows: значения колонок CANDIDATE_COLUMNS
+        """
+        loader = BulkLoader(session, Candidate, self.CANDIDATE_COLUMNS, on_conflict="nothing",
+                            conflict_columns=["term_id"])
+        loader.load(rows)
+        session.commit()
+        loader.log_stats(self.logger)
@@ -0,0 +1,112 @@
+from functools import cached_property
+from typing import Iterable, Sequence
+
+import numpy as np
+
+
+class TermYearMatrix:
+    """
+    Матрица частот "термин × год" для векторного расчета метрик.
+
+    Строки - термины (term_ids), столбцы - все года исследований (years), включая года без упоминаний.
+    Плотная матрица выбрана осознанно: лет немного (десятки), поэтому разреженное хранение не дает выигрыша.
+    """
+
+    def __init__(self, term_ids: np.ndarray, years: range, counts: np.ndarray):
+        """
+        Args:
+            term_ids: id терминов, по одному на строку матрицы
+            years: все года исследований, по одному на столбец матрицы
+            counts: матрица частот размером len(term_ids) × len(years)
+        """
+        self.term_ids = term_ids
+        self.years = years
+        self.counts = counts
+
+    @classmethod
+    def from_rows(cls, partitions: Iterable[Sequence[tuple[int, int, int]]], years: range) -> "TermYearMatrix":
+        """
+        Построение матрицы из потока строк запроса.
+
+        Args:
+            partitions: пакеты строк (year, term_id, count)
+            years: все года исследований
+
+        Returns:
+            Матрица частот
+        """
+        chunks = [np.asarray(partition, dtype=np.int64).reshape(-1, 3) for partition in partitions]
+        rows = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+
+        term_ids, term_idx = np.unique(rows[:, 1], return_inverse=True)
+
+        counts = np.zeros((len(term_ids), len(years)), dtype=np.int64)
+        counts[term_idx, rows[:, 0] - years.start] = rows[:, 2]
+
+        return cls(term_ids, years, counts)
+
+    @cached_property
+    def _present(self) -> np.ndarray:
+        """Признак ненулевой частоты"""
+        return self.counts > 0
+
+    @cached_property
+    def _first_idx(self) -> np.ndarray:
+        """Индекс столбца первого упоминания"""
+        return np.argmax(self._present, axis=1)
+
+    @cached_property
+    def _run_lengths(self) -> np.ndarray:
+        """
+        Длина текущей последовательности лет с ненулевой частотой в каждой ячейке.
+
+        Пример строки: [1, 0, 3, 3] -> [1, 0, 1, 2].
+        """
+        cumsum = np.cumsum(self._present, axis=1)
+        # Значение cumsum в последнем году без упоминаний - точка сброса последовательности
+        reset = np.maximum.accumulate(np.where(self._present, 0, cumsum), axis=1)
+        return cumsum - reset
+
+    @cached_property
+    def first_year(self) -> np.ndarray:
+        """Год первого упоминания"""
+        return self.years.start + self._first_idx
+
+    @cached_property
+    def last_year(self) -> np.ndarray:
+        """Год последнего упоминания"""
+        return self.years.start + len(self.years) - 1 - np.argmax(self._present[:, ::-1], axis=1)
+
+    @cached_property
+    def max_consecutive(self) -> np.ndarray:
+        """Максимальное число лет подряд с ненулевой частотой"""
+        return self._run_lengths.max(axis=1, initial=0)
+
+    @cached_property
+    def first_stable_year(self) -> np.ndarray:
+        """Год начала первой из максимальных последовательностей"""
+        end_idx = np.argmax(self._run_lengths == self.max_consecutive[:, None], axis=1)
+        return self.years.start + end_idx - self.max_consecutive + 1
+
+    @cached_property
+    def growth(self) -> np.ndarray:
+        """Коэффициент роста частоты (max / first)"""
+        first_count = self.counts[np.arange(len(self.term_ids)), self._first_idx]
+        return self.counts.max(axis=1, initial=0) / np.maximum(first_count, 1)
+
+    @cached_property
+    def total_mentions(self) -> np.ndarray:
+        """Общее число упоминаний"""
+        return self.counts.sum(axis=1)
+
+    def counts_per_year(self, idx: int) -> dict[int, int]:
+        """
+        Частота термина по годам, только года с упоминаниями.
+
+        Args:
+            idx: индекс строки матрицы
+        """
+        return {
+            self.years.start + int(col): int(self.counts[idx, col])
+            for col in np.flatnonzero(self._present[idx])
+        }
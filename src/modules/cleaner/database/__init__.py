@@ -1,22 +1,58 @@
 import logging
 
+from sqlalchemy import Table, delete, select, text
+from sqlalchemy.orm import Session
+
 from src.modules.module import Module, ModuleInfo
 from src.orm import models
 from src.orm.database import BaseModel
+from src.orm.models import Dictionary, NerProcessedArticle, StageRun, TermYearCount
+from src.orm.models.module import Module as DbModule
 
 
 class CleanerDatabase(Module):
     """
     Модуль очистки базы данных.
+
+    Таблица очищается через TRUNCATE ... RESTART IDENTITY CASCADE: без построчного удаления, каскадных
+    триггеров и последующей очистки (vacuum). TRUNCATE CASCADE очищает и все зависимые таблицы, поэтому
+    используется, только если результат совпадает с DELETE: все внешние ключи зависимых таблиц
+    обязательные и с ON DELETE CASCADE. Иначе таблица очищается через DELETE.
+
+    С параметром modules удаляются только данные указанных модулей (по колонке module_id).
+
+    После очистки пересчитываются производные данные, которые не связаны с очищенными таблицами внешними
+    ключами: частота терминов по годам (term_year_counts) после очистки статей или разметки, битовые маски
+    словарей (terms.dictionary_mask) после очистки словарей или ссылок на них. После очистки терминов или
+    разметки удаляются отметки об обработанных статьях (ner_processed_articles): иначе NER в режиме
+    incremental не обработает статьи повторно.
+
+    Кеш этапов workflow, результаты которых находились в очищенных таблицах, сбрасывается (см. StageRun):
+    при следующем запуске эти этапы будут выполнены повторно. Номера изменения очищенных и пересчитанных
+    таблиц увеличиваются (см. TableGeneration): модули вывода перегенерируют результаты.
     """
 
-    def __init__(self, models: list[str]):
+    def __init__(self, models: list[str], modules: list[str] = None):
         """
         Args:
             models: список моделей для очистки
+            modules: список модулей (например, ner-pos-based-hybrid) - удалить только их данные
         """
         self.logger = logging.getLogger(CleanerDatabase.info().name())
         self.models = models
+        self.modules = modules
+
+        if modules:
+            for model_name in models:
+                if "module_id" not in self._table(model_name).c:
+                    raise ValueError(f"Модель {model_name} не связана с модулями, очистка по модулям невозможна")
+
+        # Очищенные таблицы, включая зависимые
+        self.cleared_tables: list[str] = []
+        # Таблицы с пересчитанными производными данными
+        self.refreshed_tables: list[str] = []
+        # id модулей для очистки по модулям, None - очищены данные всех модулей
+        self.module_ids: list[int] | None = None
 
     @staticmethod
     def info() -> ModuleInfo:
@@ -28,9 +64,128 @@ class CleanerDatabase(Module):
 
         with container.db_session() as session:
             for model_name in self.models:
-                model: BaseModel = getattr(models, model_name)
+                table = self._table(model_name)
 
-                self.logger.info(f"Очистка модели {model_name}")
+                if self.modules:
+                    self._delete_by_modules(session, model_name, table)
+                elif self.can_truncate(table):
+                    self._truncate(session, model_name, table)
+                else:
+                    self.logger.info(f"Очистка модели {model_name} (DELETE)")
+                    session.execute(delete(table))
+                    self.cleared_tables.append(table.name)
 
-                session.query(model).delete()
                 session.commit()
+
+            self._refresh_derived(session)
+            self._reset_stage_runs(session)
+            self._mark_tables_changed(session, (*self.cleared_tables, *self.refreshed_tables))
+            session.commit()
+
+    def _refresh_derived(self, session: Session) -> None:
+        """Пересчет производных данных по очищенным таблицам"""
+        cleared = set(self.cleared_tables)
+
+        # Агрегат строится по разметке и датам статей, но ссылается только на термины и модули
+        if cleared & {"articles", "article_term_annotations"} and "term_year_counts" not in cleared:
+            self.logger.info("Пересчет частоты терминов по годам")
+            for module_id in self.module_ids or [None]:
+                TermYearCount.refresh(session, module_id)
+            self.refreshed_tables.append("term_year_counts")
+
+        # Маски хранятся в самих терминах и без пересчета указывают на удаленные словари
+        if cleared & {"dictionaries", "term_dictionary_ref"} and "terms" not in cleared:
+            self.logger.info("Пересчет битовых масок словарей")
+            Dictionary.refresh_term_masks(session)
+            self.refreshed_tables.append("terms")
+
+        # Отметки ссылаются только на статьи и модули, но без разметки статьи нужно обработать заново
+        if cleared & {"terms", "article_term_annotations"} and "ner_processed_articles" not in cleared:
+            self.logger.info("Сброс отметок об обработанных статьях NER")
+            stmt = delete(NerProcessedArticle)
+            if self.module_ids is not None:
+                stmt = stmt.where(NerProcessedArticle.module_id.in_(self.module_ids))
+            session.execute(stmt)
+            self.refreshed_tables.append("ner_processed_articles")
+
+    def _reset_stage_runs(self, session: Session) -> None:
+        """Удаление хешей этапов, результаты которых находились в очищенных таблицах"""
+        cleared = set(self.cleared_tables)
+
+        for stage_run in session.scalars(select(StageRun)).all():
+            if cleared & set(stage_run.tables):
+                self.logger.info(f"Сброс кеша этапа {stage_run.position} ({stage_run.name})")
+                session.delete(stage_run)
+
+    @staticmethod
+    def _table(model_name: str) -> Table:
+        model: BaseModel = getattr(models, model_name)
+        return model.__table__
+
+    def _truncate(self, session: Session, model_name: str, table: Table) -> None:
+        dependents = [dependent.name for dependent in self.dependent_tables(table)]
+
+        self.logger.info(f"Очистка модели {model_name} (TRUNCATE), "
+                         f"зависимые таблицы: {", ".join(dependents) if dependents else "нет"}")
+
+        session.execute(text(f"TRUNCATE TABLE {table.name} RESTART IDENTITY CASCADE"))
+        self.cleared_tables += [table.name, *dependents]
+
+    def _delete_by_modules(self, session: Session, model_name: str, table: Table) -> None:
+        self.module_ids = session.scalars(select(DbModule.id).where(DbModule.name.in_(self.modules))).all()
+        if len(self.module_ids) != len(self.modules):
+            self.logger.warning(f"Не все модули найдены в БД: {", ".join(self.modules)}")
+
+        result = session.execute(delete(table).where(table.c.module_id.in_(self.module_ids)))
+        self.logger.info(f"Очистка модели {model_name} для модулей {", ".join(self.modules)}: "
+                         f"удалено строк: {result.rowcount}")
+        self.cleared_tables.append(table.name)
+
+    @staticmethod
+    def dependent_tables(table: Table) -> list[Table]:
+        """
+        Таблицы, которые ссылаются на таблицу внешними ключами, в том числе через другие таблицы.
+
+        Args:
+            table: таблица
+
+        Returns:
+            Зависимые таблицы в порядке обхода
+        """
+        dependents: list[Table] = []
+        queue = [table]
+
+        while queue:
+            current = queue.pop(0)
+            for other in table.metadata.sorted_tables:
+                if other is table or other in dependents:
+                    continue
+                if any(fk.column.table is current for fk in other.foreign_keys):
+                    dependents.append(other)
+                    queue.append(other)
+
+        return dependents
+
+    @classmethod
+    def can_truncate(cls, table: Table) -> bool:
+        """
+        Проверка, что TRUNCATE CASCADE удалит те же строки, что и DELETE: все ссылки на таблицу
+        и зависимые таблицы - обязательные внешние ключи с ON DELETE CASCADE.
+
+        Args:
+            table: таблица
+
+        Returns:
+            True, если таблицу можно очистить через TRUNCATE CASCADE
+        """
+        cleared = {table, *cls.dependent_tables(table)}
+
+        for other in cleared:
+            for fk in other.foreign_keys:
+                if fk.column.table not in cleared:
+                    continue
+                if (fk.ondelete or "").upper() != "CASCADE" or fk.parent.nullable:
+                    return False
+
+        return True
+
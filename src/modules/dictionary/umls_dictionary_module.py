@@ -2,15 +2,16 @@ import logging
 from abc import abstractmethod
 from sqlite3 import OperationalError
 
-from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm.session import Session
 
-from src.modules.dictionary import UmlsMetathesaurus, TermDTO
+from src.modules.dictionary import UmlsMetathesaurus
 from src.modules.module import Module
+from src.orm.bulk_loader import BulkLoader
 from src.orm.models import Dictionary, TermDictionaryRef, Term
 
 
 class UmlsDictionaryModule(Module):
+    tables = ("dictionaries", "term_dictionary_ref")
 
     def __init__(self):
         self.logger = logging.getLogger(self.info().name())
@@ -34,15 +35,21 @@ class UmlsDictionaryModule(Module):
             dictionary = self.dictionary()
 
             dictionary_id = self._register_dictionary_in_db(session, dictionary)
+            # Битовые маски словарей обновляются в самих терминах (см. Dictionary.refresh_term_masks())
+            self._mark_tables_changed(session, (*self.tables, "terms"))
 
             # Получаем все статьи из БД
             terms = session.query(Term).all()
 
+            # Найденные термины записываются в БД одной загрузкой через COPY после поиска
+            refs = []
+
             # Эта часть работает медленно из-за dictionary.search(). Эта операция занимает ~ 93% времени.
             # На 23066 терминах этап поиска в словаре MeSH выполняется 130-160 сек, загрузка CPU ~100% (один процесс).
             # Было сделано профилирование и визуализация (открывается в браузере):
             #   python -m cProfile -o prof.out workflow.py workflows/simple-dimple.yaml
             #   snakeviz prof.out
+            # Профиль каждого модуля отдельно: python workflow.py workflows/simple-dimple.yaml --profile
             # Установка snakeviz:
             #   sudo apt install pipx
             #   pipx ensurepath
@@ -55,16 +62,28 @@ class UmlsDictionaryModule(Module):
                     # Узкое место производительности
                     result = dictionary.search(term.term_text)
                     if result is not None:
-                        self._mark_term_as_known(session, dictionary_id, term.id, result)
+                        refs.append((term.id, dictionary_id, result.ref_id))
                         known_cnt += 1
                         self.logger.debug(f"Найдено в словаре: '{term.term_text}'")
                     else:
                         unknown_cnt += 1
                         self.logger.debug(f"Не найдено в словаре: '{term.term_text}'")
                 except OperationalError as e:
+                    # Блокировка БД словаря (например, при параллельном запуске модулей словарей) - ошибка модуля,
+                    # а не термина: иначе термины молча пропускаются
+                    if "locked" in str(e):
+                        raise
                     self.logger.error(f"Ошибка поиска: '{term.term_text}'")
-                    pass
 
+            self.items_processed = len(terms)
+
+            loader = BulkLoader(session, TermDictionaryRef, ["term_id", "dictionary_id", "ref_id"],
+                                on_conflict="nothing", conflict_columns=["term_id", "dictionary_id"])
+            loader.load(refs)
+            loader.log_stats(self.logger)
+
+            # Битовые маски словарей для фильтрации терминов на следующих этапах
+            Dictionary.refresh_term_masks(session)
             session.commit()
 
         self.logger.info(f"Обработка завершена. Найдено в словаре: {known_cnt}. Не найдено в словаре: {unknown_cnt}")
@@ -89,23 +108,3 @@ class UmlsDictionaryModule(Module):
             session.flush()
 
         return model.id
-
-    def _mark_term_as_known(self, session: Session, dictionary_id: int, term_id: int, result: TermDTO) -> None:
-        """
-        Записать термин как найденный в словаре.
-
-        Args:
-            session: сессия SQLAlchemy
-            dictionary_id: id словаря
-            term_id: id термина
-            result: DTO найденного термина
-        """
-        ref = TermDictionaryRef(term_id=term_id, dictionary_id=dictionary_id)
-
-        stmt = insert(TermDictionaryRef).values(
-            term_id=ref.term_id,
-            dictionary_id=ref.dictionary_id,
-            ref_id=result.ref_id,
-        ).on_conflict_do_nothing(index_elements=["term_id", "dictionary_id"])
-
-        session.execute(stmt)
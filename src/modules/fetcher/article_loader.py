@@ -0,0 +1,38 @@
+"""
+Пакетная запись статей в БД через COPY (см. BulkLoader).
+
+Общий код для всех модулей типа fetcher.
+"""
+from sqlalchemy.orm import Session
+
+from src.orm.bulk_loader import BulkLoader
+from src.orm.models import Article
+
+ARTICLE_COLUMNS = ["pmid", "pmcid", "title", "abstract", "authors", "pubdate", "author_keywords", "publication_type"]
+
+
+def article_loader(session: Session, id_column: str) -> BulkLoader:
+    """
+    Загрузчик статей: уже импортированные статьи пропускаются.
+
+    Args:
+        session: сессия SQLAlchemy
+        id_column: колонка идентификатора источника - pmid или pmcid
+
+    Returns:
+        Загрузчик статей
+    """
+    return BulkLoader(session, Article, ARTICLE_COLUMNS, on_conflict="nothing", conflict_columns=[id_column])
+
+
+def article_row(article: Article) -> tuple:
+    """
+    Строка для загрузчика статей. Статья создается как модель, чтобы пройти валидации ORM.
+
+    Args:
+        article: статья (не сохраненная в БД)
+
+    Returns:
+        Значения колонок ARTICLE_COLUMNS
+    """
+    return tuple(getattr(article, column) for column in ARTICLE_COLUMNS)
@@ -0,0 +1,89 @@
+"""
+Разбор поля DP (Date of Publication) из записей MEDLINE.
+
+Общий код для всех модулей типа fetcher.
+"""
+import datetime
+import re
+
+from cachetools import cached, LRUCache
+from dateutil import parser
+
+# Типовые форматы DP в MEDLINE: "2019 Mar 5", "2019 Mar", "2019", "2019 Winter", "2018 Dec-2019 Jan".
+# Для диапазонов используется начало диапазона.
+# Документация: https://www.nlm.nih.gov/bsd/mms/medlineelements.html#dp
+_DP_PATTERN = re.compile(r"^\s*(?P<year>\d{4})(?:\s+(?P<word>[A-Za-z]+)\.?(?:\s+(?P<day>\d{1,2})(?!\d))?)?(?!\w)")
+
+_MONTH_NAMES = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+
+# Допустимы сокращения ("Mar") и полные названия ("March").
+_MONTHS = {
+    **{name[:3]: idx for idx, name in enumerate(_MONTH_NAMES, start=1)},
+    **{name: idx for idx, name in enumerate(_MONTH_NAMES, start=1)},
+}
+
+# Сезоны dateutil пропускает (fuzzy=True), поэтому дата приходится на 1 января.
+_SEASONS = {"winter", "spring", "summer", "fall", "autumn"}
+
+
+@cached(cache=LRUCache(maxsize=65536))
+def parse_pubdate(dp_value: str | None) -> datetime.date | None:
+    """
+    Парсит поле DP (Date of Publication) в datetime.date.
+
+    Сначала проверяются типовые форматы MEDLINE (регулярное выражение), остальные значения разбираются
+    dateutil. Значений DP немного, поэтому результаты кешируются.
+    """
+    if not dp_value:
+        return None
+
+    date = _parse_common_format(dp_value)
+    if date is not None:
+        return date
+
+    try:
+        # Пробуем парсить с помощью dateutil (умный разбор)
+        dt = parser.parse(dp_value, fuzzy=True, default=datetime.datetime(1900, 1, 1))
+        return datetime.date(dt.year, dt.month, dt.day)
+    except Exception:
+        # В случае ошибки пробуем получить хотя бы год
+        parts = dp_value.split()
+        if parts and parts[0].isdigit():
+            return datetime.date(int(parts[0]), 1, 1)
+        return None
+
+
+def _parse_common_format(dp_value: str) -> datetime.date | None:
+    """
+    Разбор типовых форматов DP.
+
+    Returns:
+        Дата или None, если формат не распознан
+    """
+    match = _DP_PATTERN.match(dp_value)
+    if not match:
+        return None
+
+    year = int(match["year"])
+    word = match["word"]
+    day = match["day"]
+
+    if word is None:
+        return datetime.date(year, 1, 1)
+
+    word = word.lower()
+    if word in _SEASONS and day is None:
+        return datetime.date(year, 1, 1)
+
+    month = _MONTHS.get(word)
+    if month is None:
+        return None
+
+    try:
+        return datetime.date(year, month, int(day) if day else 1)
+    except ValueError:
+        # Например, "2019 Feb 30"
+        return None
@@ -1,11 +1,10 @@
-import datetime
 import logging
 
 from Bio import Entrez, Medline
-from dateutil import parser
-from sqlalchemy.dialects.postgresql import insert
 
 from src.config.ncbi import NcbiConfig
+from src.modules.fetcher.article_loader import article_loader, article_row
+from src.modules.fetcher.pubdate import parse_pubdate
 from src.modules.module import Module, ModuleInfo
 from src.orm.models import Article
 
@@ -26,6 +25,8 @@ class PubMedFetcher(Module):
 
     BATCH_SIZE: int = 100
 
+    tables = ("articles",)
+
     def __init__(self, term: str, retmax: int):
         """
         Args:
@@ -47,6 +48,8 @@ class PubMedFetcher(Module):
         from src.container import container
 
         with container.db_session() as session:
+            loader = article_loader(session, "pmid")
+            self._mark_tables_changed(session)
 
             # Поиск статей по термину
             with Entrez.esearch(db="pubmed", term=self.term, retmax=self.retmax) as search_handle:
@@ -54,6 +57,7 @@ class PubMedFetcher(Module):
                 id_list = record.get("IdList", [])
 
             self.logger.info(f"Найдено статей: {len(id_list)}")
+            self.items_processed = len(id_list)
 
             # Загрузка данных батчами
             # Если id="12528561", то PMID="12528561" - по факту.
@@ -61,6 +65,7 @@ class PubMedFetcher(Module):
             for i in range(0, len(id_list), self.BATCH_SIZE):
                 batch_ids = id_list[i:i + self.BATCH_SIZE]
                 self.logger.debug(f"Пакетная загрузка: {i}-{min(i + self.BATCH_SIZE, len(id_list))} из {len(id_list)}")
+                rows = []
                 with Entrez.efetch(db="pubmed", id=batch_ids, rettype="medline", retmode="text") as fetch_handle:
                     records = Medline.parse(fetch_handle)
                     for rec in records:
@@ -72,42 +77,17 @@ class PubMedFetcher(Module):
                                 title=rec.get("TI"),
                                 abstract=rec.get("AB"),
                                 authors=", ".join(rec.get("AU", [])),
-                                pubdate=self._parse_pubdate(rec.get("DP")),
+                                pubdate=parse_pubdate(rec.get("DP")),
                                 author_keywords=rec.get("OT"),
                                 publication_type=rec.get("PT"),
                             )
-
-                            stmt = insert(Article).values(
-                                pmid=article.pmid,
-                                title=article.title,
-                                abstract=article.abstract,
-                                authors=article.authors,
-                                pubdate=article.pubdate,
-                                author_keywords=article.author_keywords,
-                                publication_type=article.publication_type,
-                            ).on_conflict_do_nothing(index_elements=["pmid"])
-
-                            session.execute(stmt)
+                            rows.append(article_row(article))
 
                         except ValueError as e:
                             self.logger.warning(f"Пропускаем запись: {rec.get("PMID")} - {e}")
                             continue
 
+                loader.load(rows)
                 session.commit()
 
-    @staticmethod
-    def _parse_pubdate(dp_value: str | None) -> datetime.date | None:
-        """Парсит поле DP (Date of Publication) в datetime.date."""
-        if not dp_value:
-            return None
-
-        try:
-            # Пробуем парсить с помощью dateutil (умный разбор)
-            dt = parser.parse(dp_value, fuzzy=True, default=datetime.datetime(1900, 1, 1))
-            return datetime.date(dt.year, dt.month, dt.day)
-        except Exception:
-            # В случае ошибки пробуем получить хотя бы год
-            parts = dp_value.split()
-            if parts and parts[0].isdigit():
-                return datetime.date(int(parts[0]), 1, 1)
-            return None
+            loader.log_stats(self.logger)
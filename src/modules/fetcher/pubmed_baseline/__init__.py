@@ -0,0 +1,279 @@
+import glob
+import gzip
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+from xml.etree.ElementTree import Element, iterparse
+
+from src.modules.fetcher.article_loader import article_loader, article_row
+from src.modules.fetcher.pubdate import parse_pubdate
+from src.modules.module import Module, ModuleInfo
+from src.orm.models import Article
+
+
+class PubMedBaselineFetcher(Module):
+    """
+    Модуль для оффлайн-импорта статей из файлов PubMed baseline и update.
+
+    Файлы скачиваются заранее, доступ к сети не требуется:
+    https://ftp.ncbi.nlm.nih.gov/pubmed/baseline/
+    https://ftp.ncbi.nlm.nih.gov/pubmed/updatefiles/
+
+    Описание формата XML
+    https://www.nlm.nih.gov/bsd/licensee/elements_descriptions.html
+    """
+
+    tables = ("articles",)
+
+    def __init__(self, files: str | list[str], mesh: list[str] = None, keywords: list[str] = None,
+                 min_year: int | str = None, max_year: int | str = None, workers: int | str = 1):
+        """
+        Args:
+            files: маска (или список масок) файлов, например "resources/pubmed/baseline/*.xml.gz"
+            mesh: список дескрипторов MeSH, статья должна содержать хотя бы один из них
+            keywords: список ключевых слов, хотя бы одно должно встретиться в названии, аннотации
+                или авторских ключевых словах
+            min_year: минимальный год публикации
+            max_year: максимальный год публикации
+            workers: количество процессов для разбора файлов
+        """
+        self.logger = logging.getLogger(PubMedBaselineFetcher.info().name())
+        self.files = [files] if isinstance(files, str) else files
+        self.mesh = {m.lower() for m in mesh or []}
+        self.keywords = [k.lower() for k in keywords or []]
+        self.min_year = int(min_year) if min_year is not None else None
+        self.max_year = int(max_year) if max_year is not None else None
+        self.workers = int(workers)
+
+        if self.workers < 1:
+            raise ValueError("Количество процессов должно быть >= 1")
+
+    @staticmethod
+    def info() -> ModuleInfo:
+        return ModuleInfo(module="fetcher", type="pubmed-baseline")
+
+    def handle(self) -> None:
+        """Запуск импорта статей"""
+        from src.container import container
+
+        files = self._find_files()
+        self.logger.info(f"Найдено файлов: {len(files)}")
+
+        with container.db_session() as session:
+            imported_cnt = 0
+            loader = article_loader(session, "pmid")
+            self._mark_tables_changed(session)
+
+            # Разбор XML - самая затратная часть, поэтому файлы распределяются по процессам.
+            # Запись в БД выполняется в основном процессе, в рамках одной сессии, через COPY.
+            for file, records in zip(files, self._parse_files(files)):
+                saved_cnt = loader.load(self._article_rows(records))
+                imported_cnt += saved_cnt
+                session.commit()
+                self.logger.debug(f"Файл {file}: подходящих статей {len(records)}, сохранено {saved_cnt}")
+
+            loader.log_stats(self.logger)
+            self.logger.info(f"Импорт завершен. Всего сохранено статей: {imported_cnt}")
+            self.items_processed = imported_cnt
+
+    def _find_files(self) -> list[Path]:
+        """
+        Returns:
+            Отсортированный список файлов по маскам
+        """
+        files = set()
+        for pattern in self.files:
+            files.update(glob.glob(pattern))
+
+        return [Path(file) for file in sorted(files)]
+
+    def _parse_files(self, files: list[Path]) -> Iterator[list[dict]]:
+        """
+        Разбор файлов, в том числе в нескольких процессах. Порядок результатов совпадает с порядком файлов.
+
+        В обработке находится не больше workers * 2 файлов: следующий файл передается в разбор, только когда
+        результат первого из них забран. Иначе при записи в БД медленнее разбора результаты всех файлов
+        накапливаются в памяти основного процесса.
+
+        Args:
+            files: список файлов
+
+        Returns:
+            Для каждого файла - список подходящих записей
+        """
+        args = [(file, self.mesh, self.keywords, self.min_year, self.max_year) for file in files]
+
+        if self.workers == 1:
+            yield from (_parse_file(*arg) for arg in args)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for arg in args:
+                pending.append(executor.submit(_parse_file, *arg))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def _article_rows(self, records: list[dict]) -> Iterator[tuple]:
+        """
+        Строки статей для загрузки в БД.
+
+        Args:
+            records: записи в формате Medline (PMID, TI, AB, ...)
+
+        Returns:
+            Строки для загрузчика статей, см. article_row()
+        """
+        for rec in records:
+            # Без даты публикации запись в БД невозможна
+            pubdate = parse_pubdate(rec.get("DP"))
+            if pubdate is None:
+                self.logger.warning(f"Пропускаем запись: {rec.get('PMID')} - не указана дата публикации")
+                continue
+
+            try:
+                # В ORM есть дополнительные валидации, поэтому пишем не напрямую в БД,
+                # а предварительно создаем модель
+                article = Article(
+                    pmid=rec.get("PMID"),
+                    title=rec.get("TI"),
+                    abstract=rec.get("AB"),
+                    authors=", ".join(rec.get("AU", [])),
+                    pubdate=pubdate,
+                    author_keywords=rec.get("OT"),
+                    publication_type=rec.get("PT"),
+                )
+            except ValueError as e:
+                self.logger.warning(f"Пропускаем запись: {rec.get('PMID')} - {e}")
+                continue
+
+            yield article_row(article)
+
+
+# Функции разбора вынесены на уровень модуля: они запускаются в дочерних процессах и должны сериализоваться (pickle).
+
+def _parse_file(file: Path, mesh: set[str], keywords: list[str], min_year: int | None,
+                max_year: int | None) -> list[dict]:
+    """
+    Потоковый разбор файла PubMed XML (в том числе .xml.gz) с отбором записей по фильтру.
+
+    Args:
+        file: путь к файлу
+        mesh: дескрипторы MeSH в нижнем регистре
+        keywords: ключевые слова в нижнем регистре
+        min_year: минимальный год публикации
+        max_year: максимальный год публикации
+
+    Returns:
+        Список записей в формате Medline (PMID, TI, AB, ...), прошедших фильтр
+    """
+    ret = []
+    opener = gzip.open if file.suffix == ".gz" else open
+
+    with opener(file, "rb") as f:
+        context = iterparse(f, events=("start", "end"))
+        _, root = next(context)
+
+        for event, elem in context:
+            if event != "end" or elem.tag != "PubmedArticle":
+                continue
+
+            rec, descriptors = _parse_article(elem)
+            if _match(rec, descriptors, mesh, keywords, min_year, max_year):
+                ret.append(rec)
+
+            # Освобождаем память: без этого дерево растет до размера всего файла.
+            root.clear()
+
+    return ret
+
+
+def _parse_article(elem: Element) -> tuple[dict, set[str]]:
+    """
+    Преобразование элемента PubmedArticle в запись формата Medline.
+
+    Returns:
+        Запись и список дескрипторов MeSH в нижнем регистре
+    """
+    citation = elem.find("MedlineCitation")
+    article = citation.find("Article")
+
+    abstract = "\n".join(
+        "".join(node.itertext()).strip()
+        for node in article.iterfind("Abstract/AbstractText")
+    )
+
+    authors = []
+    for author in article.iterfind("AuthorList/Author"):
+        last_name = author.findtext("LastName")
+        if last_name:
+            initials = author.findtext("Initials")
+            authors.append(f"{last_name} {initials}" if initials else last_name)
+        elif author.findtext("CollectiveName"):
+            authors.append(author.findtext("CollectiveName"))
+
+    title_node = article.find("ArticleTitle")
+    rec = {
+        "PMID": citation.findtext("PMID"),
+        "TI": "".join(title_node.itertext()).strip() if title_node is not None else None,
+        "AB": abstract or None,
+        "AU": authors,
+        "DP": _pubdate(article),
+        "OT": [kw.text.strip() for kw in citation.iterfind("KeywordList/Keyword") if kw.text] or None,
+        "PT": [pt.text for pt in article.iterfind("PublicationTypeList/PublicationType") if pt.text] or None,
+    }
+
+    descriptors = {
+        d.text.lower()
+        for d in citation.iterfind("MeshHeadingList/MeshHeading/DescriptorName")
+        if d.text
+    }
+
+    return rec, descriptors
+
+
+def _pubdate(article: Element) -> str | None:
+    """
+    Дата публикации в формате поля DP, например "2019 Mar 5" или "2018 Dec-2019 Jan".
+    """
+    pub_date = article.find("Journal/JournalIssue/PubDate")
+    if pub_date is None:
+        return None
+
+    medline_date = pub_date.findtext("MedlineDate")
+    if medline_date:
+        return medline_date
+
+    parts = [pub_date.findtext(tag) for tag in ("Year", "Season", "Month", "Day")]
+    return " ".join(part for part in parts if part) or None
+
+
+def _match(rec: dict, descriptors: set[str], mesh: set[str], keywords: list[str], min_year: int | None,
+           max_year: int | None) -> bool:
+    """
+    Проверка записи на соответствие фильтру. Пустые условия не проверяются.
+    """
+    if mesh and not mesh & descriptors:
+        return False
+
+    if keywords:
+        text = " ".join([rec["TI"] or "", rec["AB"] or "", *(rec["OT"] or [])]).lower()
+        if not any(keyword in text for keyword in keywords):
+            return False
+
+    if min_year is not None or max_year is not None:
+        dp = rec["DP"] or ""
+        year = int(dp[:4]) if dp[:4].isdigit() else None
+        if year is None:
+            return False
+        if min_year is not None and year < min_year:
+            return False
+        if max_year is not None and year > max_year:
+            return False
+
+    return True
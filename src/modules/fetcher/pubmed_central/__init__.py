@@ -1,14 +1,12 @@
-import datetime
 import logging
 import time
 from typing import Any
 
 from Bio import Entrez, Medline
-from dateutil import parser
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.orm import Session
 
 from src.config.ncbi import NcbiConfig
+from src.modules.fetcher.article_loader import article_loader, article_row
+from src.modules.fetcher.pubdate import parse_pubdate
 from src.modules.module import Module, ModuleInfo
 from src.orm.models import Article
 
@@ -29,6 +27,8 @@ class PubMedCentralFetcher(Module):
 
     BATCH_SIZE: int = 100
 
+    tables = ("articles",)
+
     def __init__(self, term: str, retmax: int):
         """
         Args:
@@ -50,6 +50,8 @@ class PubMedCentralFetcher(Module):
         from src.container import container
 
         with container.db_session() as session:
+            loader = article_loader(session, "pmcid")
+            self._mark_tables_changed(session)
 
             # Поиск статей по термину
             with Entrez.esearch(db="pmc", term=self.term, retmax=self.retmax) as search_handle:
@@ -57,6 +59,7 @@ class PubMedCentralFetcher(Module):
                 id_list = record.get("IdList", [])
 
             self.logger.info(f"Найдено статей: {len(id_list)}")
+            self.items_processed = len(id_list)
 
             # Загрузка данных батчами
             # Если id="12528561", то PMC="PMC12528561" - по факту.
@@ -67,15 +70,28 @@ class PubMedCentralFetcher(Module):
 
                 # Повторная загрузка при возникновении ошибки.
                 try:
-                    self._import_batch(batch_ids, session)
+                    rows = self._fetch_batch(batch_ids)
                 except Exception:
                     self.logger.warning(f"Попытка повторной загрузки")
                     time.sleep(30)
-                    self._import_batch(batch_ids, session)
+                    rows = self._fetch_batch(batch_ids)
 
+                loader.load(rows)
                 session.commit()
 
-    def _import_batch(self, batch_ids: list[Any], session: Session):
+            loader.log_stats(self.logger)
+
+    def _fetch_batch(self, batch_ids: list[Any]) -> list[tuple]:
+        """
+        Загрузка пакета статей из PubMed Central.
+
+        Args:
+            batch_ids: идентификаторы статей
+
+        Returns:
+            Строки для загрузчика статей, см. article_row()
+        """
+        rows = []
         with Entrez.efetch(db="pmc", id=batch_ids, rettype="medline", retmode="text") as fetch_handle:
             records = Medline.parse(fetch_handle)
             for rec in records:
@@ -87,40 +103,14 @@ class PubMedCentralFetcher(Module):
                         title=rec.get("TI"),
                         abstract=rec.get("AB"),
                         authors=", ".join(rec.get("AU", [])),
-                        pubdate=self._parse_pubdate(rec.get("DP")),
+                        pubdate=parse_pubdate(rec.get("DP")),
                         author_keywords=rec.get("OT"),
                         publication_type=rec.get("PT"),
                     )
-
-                    stmt = insert(Article).values(
-                        pmcid=article.pmcid,
-                        title=article.title,
-                        abstract=article.abstract,
-                        authors=article.authors,
-                        pubdate=article.pubdate,
-                        author_keywords=article.author_keywords,
-                        publication_type=article.publication_type,
-                    ).on_conflict_do_nothing(index_elements=["pmcid"])
-
-                    session.execute(stmt)
+                    rows.append(article_row(article))
 
                 except ValueError as e:
                     self.logger.warning(f"Пропускаем запись: {rec.get("PMC")} - {e}")
                     continue
 
-    @staticmethod
-    def _parse_pubdate(dp_value: str | None) -> datetime.date | None:
-        """Парсит поле DP (Date of Publication) в datetime.date."""
-        if not dp_value:
-            return None
-
-        try:
-            # Пробуем парсить с помощью dateutil (умный разбор)
-            dt = parser.parse(dp_value, fuzzy=True, default=datetime.datetime(1900, 1, 1))
-            return datetime.date(dt.year, dt.month, dt.day)
-        except Exception:
-            # В случае ошибки пробуем получить хотя бы год
-            parts = dp_value.split()
-            if parts and parts[0].isdigit():
-                return datetime.date(int(parts[0]), 1, 1)
-            return None
+        return rows
@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from src.orm.models import Dictionary
+from src.orm.models import Dictionary, TableGeneration
 from src.orm.models.module import Module as DbModule
 from src.workflow import Experiment
 
@@ -21,6 +21,14 @@ class ModuleInfo(BaseModel):
 class Module(ABC):
     """Абстрактный модуль"""
 
+    # Количество обработанных объектов (статей, терминов) для отчета о запуске workflow.
+    # Заполняется модулем в handle(), по умолчанию - не учитывается.
+    items_processed: int = 0
+
+    # Таблицы БД, в которые модуль записывает результаты. Сохраняются с хешем выполненного этапа:
+    # очистка любой из них (CleanerDatabase) сбрасывает кеш этапа, и он будет запущен повторно.
+    tables: tuple[str, ...] = ()
+
     @staticmethod
     @abstractmethod
     def info() -> ModuleInfo:
@@ -62,6 +70,17 @@ class Module(ABC):
 
         return module.id
 
+    def _mark_tables_changed(self, session: Session, tables: tuple[str, ...] = None) -> None:
+        """
+        Отметка об изменении таблиц для отпечатка входных данных модулей вывода (см. TableGeneration).
+        Вызывается до записи в таблицы, в транзакции модуля.
+
+        Args:
+            session: сессия SQLAlchemy
+            tables: измененные таблицы, по умолчанию - tables модуля
+        """
+        TableGeneration.bump(session, tables or self.tables)
+
     def _load_dictionaries(self, session: Session, dict_names: set[str]) -> list[Dictionary]:
         """
         Получение списка словарей из БД для дальнейшей подстановки в SQL.
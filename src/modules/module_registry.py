@@ -1,31 +1,39 @@
+import importlib
 from typing import Dict, Tuple, Type
 
 from src.modules.module import Module
 
 
 class ModuleRegistry:
-    """Реестр всех зарегистрированных модулей."""
+    """
+    Реестр всех зарегистрированных модулей.
+
+    Модули регистрируются по пути импорта и импортируются только при первом запросе (get()):
+    зависимости модулей (transformers, spaCy, owlready2, matplotlib) загружаются долго и занимают много памяти,
+    а workflow обычно использует лишь часть модулей.
+    """
 
     def __init__(self):
-        self._registry: Dict[Tuple[str, str], Type] = {}
+        self._registry: Dict[Tuple[str, str], str] = {}
+        self._classes: Dict[Tuple[str, str], Type] = {}
 
-    def register(self, module: str, type: str, module_class: Type[Module]) -> None:
+    def register(self, module: str, type: str, path: str) -> None:
         """
         Зарегистрировать модуль.
 
         Args:
             module: модуль
             type: тип
-            module_class: Python-класс модуля
+            path: путь импорта Python-класса модуля, например "src.modules.cleaner.database.CleanerDatabase"
         """
         key = (module, type)
         if key in self._registry:
             raise ValueError(f"Модуль ({module}, {type}) уже зарегистрирован")
-        self._registry[key] = module_class
+        self._registry[key] = path
 
     def get(self, module: str, type: str) -> Type:
         """
-        Получить Python-класс модуля.
+        Получить Python-класс модуля. Класс импортируется при первом запросе.
 
         Args:
             module: модуль
@@ -37,15 +45,32 @@ class ModuleRegistry:
         key = (module, type)
         if key not in self._registry:
             raise KeyError(f"Модуль ({module}, {type}) не зарегистрирован")
-        return self._registry[key]
+
+        if key not in self._classes:
+            module_path, class_name = self._registry[key].rsplit(".", 1)
+            module_class: Type[Module] = getattr(importlib.import_module(module_path), class_name)
+
+            info = module_class.info()
+            if (info.module, info.type) != key:
+                raise ValueError(f"Модуль ({module}, {type}) зарегистрирован с классом {self._registry[key]}, "
+                                 f"который относится к модулю ({info.module}, {info.type})")
+
+            self._classes[key] = module_class
+
+        return self._classes[key]
+
+    def keys(self) -> list[Tuple[str, str]]:
+        """Список зарегистрированных модулей: (модуль, тип)"""
+        return list(self._registry)
 
 
 # Глобальный реестр
 _global_registry = ModuleRegistry()
 
 
-def register_module(module: Type[Module]):
-    _global_registry.register(module.info().module, module.info().type, module)
+def register_module(module: str, type: str, path: str) -> None:
+    """Зарегистрировать модуль по пути импорта его Python-класса."""
+    _global_registry.register(module, type, path)
 
 
 def get_module_class(module: str, type: str) -> Type:
@@ -0,0 +1,52 @@
+import logging
+import threading
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class ModelCache:
+    """
+    Кеш загруженных моделей (веса трансформеров, модели spaCy) на время жизни процесса.
+
+    Ключ - идентификатор модели и устройство (cpu, cuda). Модули NER с одной и той же моделью,
+    созданные повторно в одном процессе, используют уже загруженные веса.
+    Экземпляр создается контейнером: container.model_cache().
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("model-cache")
+        self._models: dict[tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_id: str, device: str, loader: Callable[[], T]) -> T:
+        """
+        Получить модель из кеша, а если ее нет - загрузить.
+
+        Args:
+            model_id: идентификатор модели, например 'd4data/biomedical-ner-all'
+            device: устройство
+            loader: функция загрузки модели
+
+        Returns:
+            Модель
+        """
+        key = (model_id, device)
+
+        with self._lock:
+            if key not in self._models:
+                self.logger.info(f"Загрузка модели {model_id} ({device})")
+                self._models[key] = loader()
+
+            return self._models[key]
+
+    def clear(self) -> None:
+        """Удалить все модели из кеша"""
+        with self._lock:
+            self._models.clear()
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
@@ -1,14 +1,20 @@
+import hashlib
+import json
 import logging
 from abc import abstractmethod
 from typing import Optional
 
-from cachetools import cached, LFUCache
+from cachetools import cachedmethod, LFUCache
 from pydantic import BaseModel
+from sqlalchemy import ColumnElement, and_, delete, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from src.dictionaries.stop_words import StopWords
 from src.modules.module import Module
-from src.orm.models import Article, ArticleTermAnnotation, Term
+from src.orm.bulk_loader import BulkLoader
+from src.orm.database import analyze_tables
+from src.orm.models import Article, ArticleTermAnnotation, NerMemo, NerProcessedArticle, Term, TermYearCount
 
 
 class TermDto(BaseModel):
@@ -24,11 +30,28 @@ class TermDto(BaseModel):
 
 
 class Ner(Module):
-    term_id_cache = LFUCache(maxsize=10000)
+    # Версия алгоритма извлечения. Увеличивается при изменении кода, влияющем на результат,
+    # чтобы не использовать сохраненные результаты предыдущей версии (см. NerMemo).
+    VERSION = 1
+
+    BATCH_SIZE = 100  # Количество статей между commit
+
+    tables = ("terms", "article_term_annotations", "term_year_counts", "ner_memos", "ner_processed_articles")
 
     def _extract_terms_from_article_field(self, article: Article, field: str) -> list[TermDto]:
-        text = article.get_text(field)
-        dto_list = self._extract_terms_from_text(text)
+        content_hash = article.get_hash(field)
+
+        # Текст уже обработан: дубликат статьи или результат предыдущего эксперимента
+        if content_hash in self.memo:
+            self.memo_hits += 1
+            dto_list = [TermDto(**term) for term in self.memo[content_hash]]
+        else:
+            text = article.get_text(field)
+            dto_list = self._extract_terms_from_text(text)
+            if content_hash is not None:
+                terms = [dto.model_dump(exclude={"article_field"}) for dto in dto_list]
+                self.memo[content_hash] = self.new_memo[content_hash] = terms
+
         for dto in dto_list:
             dto.article_field = field
         return dto_list
@@ -47,21 +70,32 @@ class Ner(Module):
         """
         pass
 
-    def __init__(self, article_fields: list, stopwords: list = None):
+    def __init__(self, article_fields: list, stopwords: list = None, incremental: bool = False):
         """
         Инициализация модуля.
 
         Args:
             article_fields: список полей из статьи для извлечения именованных сущностей.
             stopwords: список путей к файлам со списками стоп-слов.
+            incremental: обработать только новые статьи и статьи с измененным текстом, без очистки терминов.
         """
 
         self.logger = logging.getLogger(self.info().name())
 
+        # Кеш id терминов по тексту. Свой у каждого экземпляра: модули одного этапа могут работать
+        # в разных процессах (parallel: true), общий кеш класса хранил бы id из чужих запусков.
+        self.term_id_cache = LFUCache(maxsize=10000)
+
+        # Результаты извлечения по хешу текста: загруженные из БД для текущего пакета статей и новые
+        self.memo: dict[str, list[dict]] = {}
+        self.new_memo: dict[str, list[dict]] = {}
+        self.memo_hits = 0
+
         # Список полей
         if not article_fields:
             raise ValueError("Список полей не может быть пустым")
         self.article_fields = article_fields
+        self.incremental = incremental
 
         # Загрузка списка стоп-слов
         if stopwords is None:
@@ -75,52 +109,85 @@ class Ner(Module):
 
         with container.db_session() as session:
             module_id = self._register_module_in_db(session)
-
-            # Получаем все статьи из БД
-            articles = session.query(Article).all()
-            self.logger.info(f"Найдено статей: {len(articles)}")
+            self._mark_tables_changed(session)
+
+            version = self._memo_version()
+            content_hash = self._content_hash(version)
+
+            # Получаем статьи из БД: все или, в режиме incremental, еще не обработанные этой версией модуля
+            query = select(Article).order_by(Article.id)
+            if self.incremental:
+                query = query.outerjoin(NerProcessedArticle, and_(
+                    NerProcessedArticle.article_id == Article.id,
+                    NerProcessedArticle.module_id == module_id,
+                )).where(or_(
+                    NerProcessedArticle.content_hash.is_(None),
+                    NerProcessedArticle.content_hash != content_hash,
+                ))
+            articles = session.scalars(query).all()
+            self.logger.info(f"Найдено статей{" для обработки" if self.incremental else ""}: {len(articles)}")
 
             term_count = 0
             processed_count = 0
 
-            for article in articles:
-                terms = self._extract_terms(article)
-                if not terms:
-                    self.logger.debug(f"Статья {article.id} пропущена: отсутствуют термины")
-                    continue
-
-                # Сохраняем термины и разметку статей по терминам в БД
-                term_dto: TermDto
-                for term_dto in terms:
-                    term_id = self._get_or_create_term_id(session, term_dto)
-
-                    article_term_annotation = ArticleTermAnnotation(
-                        term_id=term_id,
-                        article_id=article.id,
-                        module_id=module_id,
-                        start_char=term_dto.start_pos,
-                        end_char=term_dto.end_pos,
-                        surface_form=term_dto.surface_form,
-                        article_field=term_dto.article_field,
-                    )
-                    session.add(article_term_annotation)
-                    term_count += 1
-
-                processed_count += 1
+            # Разметка и результаты извлечения записываются через COPY пакетами статей
+            annotation_loader = BulkLoader(session, ArticleTermAnnotation, [
+                "term_id", "article_id", "module_id", "start_char", "end_char", "surface_form", "article_field"])
+            memo_loader = BulkLoader(session, NerMemo, ["content_hash", "module_id", "version", "terms"],
+                                     on_conflict="nothing")
+
+            for i in range(0, len(articles), self.BATCH_SIZE):
+                batch = articles[i:i + self.BATCH_SIZE]
+                batch_ids = [article.id for article in batch]
+                self._load_memo(session, module_id, version, batch)
+
+                # Разметка измененных статей заменяется новой
+                if self.incremental:
+                    session.execute(delete(ArticleTermAnnotation).where(
+                        ArticleTermAnnotation.module_id == module_id,
+                        ArticleTermAnnotation.article_id.in_(batch_ids),
+                    ))
+
+                annotations = []
+                for article in batch:
+                    terms = self._extract_terms(article)
+                    if not terms:
+                        self.logger.debug(f"Статья {article.id} пропущена: отсутствуют термины")
+                        continue
+
+                    # Сохраняем термины и разметку статей по терминам в БД
+                    term_dto: TermDto
+                    for term_dto in terms:
+                        term_id = self._get_or_create_term_id(session, term_dto)
+
+                        annotations.append((term_id, article.id, module_id, term_dto.start_pos, term_dto.end_pos,
+                                            term_dto.surface_form, term_dto.article_field))
+                        term_count += 1
+
+                    processed_count += 1
 
                 # Периодический commit для больших объемов
-                if processed_count % 100 == 0:
-                    session.commit()
-                    self.logger.debug(
-                        f"Обработано статей: {processed_count} из {len(articles)}, извлечено терминов: {term_count}")
-
-            # Финальный commit
-            if processed_count % 100 != 0:
+                annotation_loader.load(annotations)
+                self._save_memo(memo_loader, module_id, version)
+                self._mark_processed(session, module_id, content_hash, batch_ids)
                 session.commit()
                 self.logger.debug(
-                    f"Обработано статей: {processed_count} из {len(articles)}, извлечено терминов: {term_count}")
+                    f"Обработано статей: {i + len(batch)} из {len(articles)}, извлечено терминов: {term_count}")
 
+            self.logger.info(f"Статей с терминами: {processed_count}, "
+                             f"тексты без повторного извлечения: {self.memo_hits}")
             self.logger.info(f"Обработка завершена. Всего извлечено терминов: {term_count}")
+            annotation_loader.log_stats(self.logger)
+            self.items_processed = len(articles)
+
+            # Частота терминов по годам для следующих этапов (кандидаты, вывод результатов)
+            TermYearCount.refresh(session, module_id)
+            session.commit()
+            self.logger.info("Частота терминов по годам обновлена")
+
+            # Статистика планировщика для запросов следующих этапов
+            analyze_tables(session, ["articles", "terms", "article_term_annotations", "term_year_counts"])
+            session.commit()
 
     def _extract_terms(self, article: Article) -> list[TermDto]:
         """
@@ -140,7 +207,65 @@ class Ner(Module):
             terms += self._extract_terms_from_article_field(article, field)
         return terms
 
-    @cached(cache=term_id_cache, key=lambda self, session, term_dto: term_dto.text)
+    def _memo_params(self) -> dict:
+        """Параметры модуля, влияющие на результат извлечения"""
+        return {"stop_words": sorted(self.stop_words)}
+
+    def _memo_version(self) -> str:
+        """Версия модуля для NerMemo: хеш названия, VERSION и параметров"""
+        params = {"module": self.info().name(), "version": self.VERSION, **self._memo_params()}
+        return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _content_hash(self, version: str) -> ColumnElement[str]:
+        """Выражение SQL: хеш версии модуля и текста обработанных полей статьи, см. NerProcessedArticle"""
+        field_hashes = [getattr(Article, f"{field}_hash") for field in self.article_fields]
+        return func.md5(func.concat_ws(":", version, *field_hashes))
+
+    def _mark_processed(self, session: Session, module_id: int, content_hash: ColumnElement[str],
+                        article_ids: list[int]) -> None:
+        """
+        Сохранение списка обработанных статей с хешем текста для режима incremental.
+
+        Args:
+            session: сессия SQLAlchemy
+            module_id: id модуля
+            content_hash: хеш, см. _content_hash()
+            article_ids: id статей
+        """
+        query = select(Article.id, literal(module_id), content_hash).where(Article.id.in_(article_ids))
+        stmt = insert(NerProcessedArticle).from_select(["article_id", "module_id", "content_hash"], query)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=["article_id", "module_id"],
+            set_={"content_hash": stmt.excluded.content_hash},
+        ))
+
+    def _load_memo(self, session: Session, module_id: int, version: str, articles: list[Article]) -> None:
+        """
+        Загрузка сохраненных результатов извлечения для текстов пакета статей.
+
+        Args:
+            session: сессия SQLAlchemy
+            module_id: id модуля
+            version: версия модуля, см. _memo_version()
+            articles: статьи
+        """
+        hashes = {article.get_hash(field) for article in articles for field in self.article_fields}
+
+        rows = session.execute(
+            select(NerMemo.content_hash, NerMemo.terms)
+            .where(NerMemo.module_id == module_id, NerMemo.version == version, NerMemo.content_hash.in_(hashes))
+        )
+        self.memo = {content_hash: terms for content_hash, terms in rows}
+
+    def _save_memo(self, loader: BulkLoader, module_id: int, version: str) -> None:
+        """Сохранение новых результатов извлечения"""
+        if not self.new_memo:
+            return
+
+        loader.load((content_hash, module_id, version, terms) for content_hash, terms in self.new_memo.items())
+        self.new_memo = {}
+
+    @cachedmethod(lambda self: self.term_id_cache, key=lambda self, session, term_dto: term_dto.text)
     def _get_or_create_term_id(self, session: Session, term_dto: TermDto) -> int:
         """
         Получить id термина, а если его нет - создать.
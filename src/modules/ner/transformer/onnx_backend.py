@@ -0,0 +1,176 @@
+"""
+Бэкенд ONNX Runtime для трансформеров классификации токенов (например, biomedical-ner-all).
+
+Модель PyTorch экспортируется в ONNX и квантизуется в int8 (динамическая квантизация весов), результат
+сохраняется в resources/onnx/<модель> и используется при следующих запусках. Перед сохранением проверяется
+совпадение результатов с PyTorch на фиксированной выборке текстов (PARITY_SAMPLE).
+"""
+import json
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+
+import onnxruntime as ort
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import AutoConfig, AutoModelForTokenClassification, AutoTokenizer, PretrainedConfig, pipeline
+from transformers.pipelines import TokenClassificationPipeline
+
+ONNX_DIR = Path("resources/onnx")
+MODEL_FILE = "model-int8.onnx"
+PARITY_FILE = "parity.json"
+
+# Минимальная доля совпадающих сущностей (F1 по началу, концу и метке) с результатами PyTorch
+MIN_PARITY = 0.95
+
+# Фиксированная выборка для проверки совпадения результатов ONNX и PyTorch
+PARITY_SAMPLE = [
+    "The patient was diagnosed with acute myeloid leukemia and treated with cytarabine.",
+    "Chronic obstructive pulmonary disease is a major cause of morbidity in smokers.",
+    "Magnetic resonance imaging of the brain revealed a lesion in the left temporal lobe.",
+    "Mutations in the BRCA1 gene increase the risk of breast and ovarian cancer.",
+    "Metformin reduces hepatic glucose production in patients with type 2 diabetes mellitus.",
+    "Blood samples were analyzed by polymerase chain reaction for SARS-CoV-2 RNA.",
+    "The 45-year-old woman presented with fever, cough and shortness of breath for 3 days.",
+    "Coronary artery bypass grafting improved left ventricular ejection fraction after myocardial infarction.",
+]
+
+logger = logging.getLogger("onnx-backend")
+
+
+class OnnxTokenClassifier(torch.nn.Module):
+    """
+    Модель классификации токенов на ONNX Runtime с интерфейсом модели PyTorch,
+    чтобы использовать pipeline из transformers (токенизация, агрегация сущностей) без изменений.
+    """
+
+    def __init__(self, model_file: Path, config: PretrainedConfig):
+        super().__init__()
+        self.config = config
+        self.session = ort.InferenceSession(str(model_file), providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    @property
+    def device(self) -> torch.device:
+        return torch.device("cpu")
+
+    def can_generate(self) -> bool:
+        return False
+
+    def forward(self, **inputs) -> dict:
+        feed = {name: tensor.numpy() for name, tensor in inputs.items() if name in self.input_names}
+        logits, = self.session.run(["logits"], feed)
+        return {"logits": torch.from_numpy(logits)}
+
+
+class OnnxTokenClassificationPipeline(TokenClassificationPipeline):
+    def check_model_type(self, supported_models) -> None:
+        # Модель ONNX не входит в список моделей transformers, проверка типа не нужна
+        pass
+
+
+def onnx_pipeline(model_dir: Path, aggregation_strategy: str) -> TokenClassificationPipeline:
+    """
+    Конвейер NER на квантизованной модели ONNX.
+
+    Args:
+        model_dir: каталог модели, см. export_quantized()
+        aggregation_strategy: стратегия объединения токенов в сущности, см. pipeline из transformers
+
+    Returns:
+        Конвейер NER
+    """
+    model = OnnxTokenClassifier(model_dir / MODEL_FILE, AutoConfig.from_pretrained(model_dir))
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline('ner', model=model, tokenizer=tokenizer, aggregation_strategy=aggregation_strategy,
+                    pipeline_class=OnnxTokenClassificationPipeline)
+
+
+def export_quantized(model_id: str, aggregation_strategy: str, onnx_dir: Path = ONNX_DIR) -> Path:
+    """
+    Экспорт модели в ONNX с динамической int8-квантизацией. Если модель уже экспортирована - только путь к ней.
+
+    Args:
+        model_id: идентификатор модели, например 'd4data/biomedical-ner-all', или путь к ней
+        aggregation_strategy: стратегия объединения токенов в сущности, используется для проверки совпадения
+        onnx_dir: каталог для экспортированных моделей
+
+    Returns:
+        Каталог модели: квантизованная модель, токенизатор, конфигурация и результат проверки совпадения
+    """
+    model_dir = onnx_dir / model_id.strip("/").replace("/", "--")
+    if (model_dir / MODEL_FILE).exists():
+        return model_dir
+
+    logger.info(f"Экспорт модели {model_id} в ONNX (int8)")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    model = AutoModelForTokenClassification.from_pretrained(model_id).eval()
+
+    onnx_dir.mkdir(parents=True, exist_ok=True)
+    # Модель собирается во временном каталоге и переносится целиком, чтобы не оставить неполный результат
+    tmp_dir = Path(tempfile.mkdtemp(dir=onnx_dir))
+    try:
+        fp32_file = tmp_dir / "model.onnx"
+
+        inputs = tokenizer(PARITY_SAMPLE[:2], padding=True, return_tensors="pt")
+        axes = {0: "batch", 1: "sequence"}
+        torch.onnx.export(
+            model,
+            (inputs["input_ids"], inputs["attention_mask"]),
+            str(fp32_file),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={"input_ids": axes, "attention_mask": axes, "logits": axes},
+            opset_version=17,
+            dynamo=False,
+        )
+        quantize_dynamic(fp32_file, tmp_dir / MODEL_FILE, weight_type=QuantType.QInt8)
+        fp32_file.unlink()
+
+        tokenizer.save_pretrained(tmp_dir)
+        model.config.save_pretrained(tmp_dir)
+
+        torch_pipe = pipeline('ner', model=model, tokenizer=tokenizer, aggregation_strategy=aggregation_strategy)
+        parity = check_parity(torch_pipe, onnx_pipeline(tmp_dir, aggregation_strategy), PARITY_SAMPLE)
+        logger.info(f"Совпадение результатов ONNX и PyTorch: {parity:.3f}")
+
+        if parity < MIN_PARITY:
+            raise RuntimeError(f"Результаты квантизованной модели {model_id} отличаются от PyTorch: "
+                               f"совпадение {parity:.3f} < {MIN_PARITY}")
+
+        (tmp_dir / PARITY_FILE).write_text(json.dumps({"parity": parity, "sample_size": len(PARITY_SAMPLE)}))
+
+        # Модель могла быть экспортирована параллельно другим процессом
+        if not (model_dir / MODEL_FILE).exists():
+            shutil.rmtree(model_dir, ignore_errors=True)
+            tmp_dir.rename(model_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return model_dir
+
+
+def check_parity(expected_pipe: TokenClassificationPipeline, actual_pipe: TokenClassificationPipeline,
+                 texts: list[str]) -> float:
+    """
+    Совпадение результатов двух конвейеров NER.
+
+    Args:
+        expected_pipe: эталонный конвейер (PyTorch)
+        actual_pipe: проверяемый конвейер (ONNX)
+        texts: тексты
+
+    Returns:
+        F1 по сущностям (начало, конец, метка): 1.0 - полное совпадение
+    """
+    expected, actual = set(), set()
+    for i, text in enumerate(texts):
+        expected |= {(i, ent['start'], ent['end'], ent['entity_group']) for ent in expected_pipe(text)}
+        actual |= {(i, ent['start'], ent['end'], ent['entity_group']) for ent in actual_pipe(text)}
+
+    if not expected and not actual:
+        return 1.0
+
+    return 2 * len(expected & actual) / (len(expected) + len(actual))
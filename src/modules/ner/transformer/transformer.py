@@ -1,9 +1,10 @@
-from abc import ABC
-from typing import List
+import re
+from abc import ABC, abstractmethod
+from typing import List, NamedTuple
 
 import spacy
 
-from src.modules.ner.ner import Ner
+from src.modules.ner.ner import Ner, TermDto
 
 
 class TermFeature:
@@ -16,20 +17,228 @@ class TermFeature:
         self.word_count = len(pos_parts)
 
 
+class TextChunk(NamedTuple):
+    """Фрагмент текста для трансформера"""
+    start: int  # Смещение фрагмента в исходном тексте
+    text: str
+
+
+class EntitySpan(NamedTuple):
+    """Сущность, найденная трансформером: позиции в тексте и метка"""
+    start: int
+    end: int
+    label: str
+
+
 class Transformer(Ner, ABC):
+    """
+    Базовый модуль NER на трансформере.
+
+    Длинный текст разбивается на окна из целых предложений, каждое не длиннее max_tokens токенов модели.
+    Соседние окна перекрываются на CHUNK_OVERLAP предложений, чтобы у предложений на стыке был контекст.
+    Окна одного текста обрабатываются моделью одним пакетом (_predict()), позиции сущностей пересчитываются
+    в позиции исходного текста, а дубликаты из перекрытий объединяются.
+    """
+
     MIN_TERM_LENGTH = 3  # Минимальная длина термина в символах
+    MAX_TOKENS = 384  # Максимальная длина окна в токенах, если модель не задает свою (max_tokens)
+    CHUNK_OVERLAP = 1  # Перекрытие соседних окон в предложениях
+    BATCH_SIZE = 8  # Размер пакета окон для модели
+
+    # Символы, удаляемые по краям найденной сущности (None - пробельные)
+    SURFACE_FORM_STRIP = None
+
+    # Граница предложения: знак конца предложения, пробелы и начало следующего предложения
+    SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9(\["])')
+    # Слова и отдельные знаки - приближенное количество токенов, если у модели нет своего токенизатора
+    WORD = re.compile(r'\w+(?:[-_]\w+)*|\S')
 
-    def __init__(self, article_fields: list, stopwords: list = None):
+    def __init__(self, article_fields: list, stopwords: list = None, device: str = 'cpu',
+                 incremental: bool = False):
         """
         Инициализация модуля.
 
         Args:
             article_fields: список полей из статьи для извлечения именованных сущностей.
             stopwords: список путей к файлам со списками стоп-слов.
+            device: устройство для трансформера: cpu, cuda.
+            incremental: обработать только новые статьи и статьи с измененным текстом, без очистки терминов.
         """
-        super().__init__(article_fields, stopwords)
-        self.nlp_en_core_web_sm = spacy.load('en_core_web_sm')
+        from src.container import container
+
+        super().__init__(article_fields, stopwords, incremental)
+        self.device = device
+        # Модели загружаются один раз на процесс и переиспользуются модулями с той же моделью
+        self.model_cache = container.model_cache()
+        self.nlp_en_core_web_sm = self.model_cache.get('spacy/en_core_web_sm', 'cpu',
+                                                       lambda: spacy.load('en_core_web_sm'))
         self.bad_parts = ['PUNCT', 'SYM', 'NUM']
+        self.max_tokens = self.MAX_TOKENS
+
+    def _extract_terms_from_text(self, text: str) -> list[TermDto]:
+        ret: list[TermDto] = []
+
+        chunks = self._split_text(text)
+        predictions = self._predict([chunk.text for chunk in chunks])
+
+        spans = [
+            (EntitySpan(chunk.start + ent.start, chunk.start + ent.end, ent.label), chunk_idx)
+            for chunk_idx, (chunk, entities) in enumerate(zip(chunks, predictions))
+            for ent in entities
+        ]
+
+        for ent in self._merge_spans(spans):
+            self._add_term_if_valid(ret, ent, text)
+
+        return ret
+
+    def _memo_params(self) -> dict:
+        # Длина окна влияет на разбиение длинных текстов, а значит и на результат
+        return {**super()._memo_params(), "max_tokens": self.max_tokens}
+
+    @abstractmethod
+    def _predict(self, texts: list[str]) -> list[list[EntitySpan]]:
+        """
+        Извлечение сущностей трансформером из пакета текстов.
+
+        Args:
+            texts: тексты (окна), каждый не длиннее max_tokens токенов
+
+        Returns:
+            Список сущностей для каждого текста, позиции - в пределах текста
+        """
+        pass
+
+    def _count_tokens(self, text: str) -> int:
+        """Количество токенов модели в тексте"""
+        return len(self.WORD.findall(text))
+
+    def _split_text(self, text: str) -> list[TextChunk]:
+        """
+        Разбиение текста на окна из целых предложений, не длиннее max_tokens токенов.
+
+        Args:
+            text: текст
+
+        Returns:
+            Окна; короткий текст - одно окно
+        """
+        if self._count_tokens(text) <= self.max_tokens:
+            return [TextChunk(0, text)]
+
+        # Предложения (start, end, количество токенов)
+        units = self._split_sentences(text)
+
+        chunks = []
+        i = 0
+        while i < len(units):
+            j, tokens = i, 0
+            while j < len(units) and (j == i or tokens + units[j][2] <= self.max_tokens):
+                tokens += units[j][2]
+                j += 1
+
+            chunks.append(TextChunk(units[i][0], text[units[i][0]:units[j - 1][1]]))
+            if j == len(units):
+                break
+
+            # Следующее окно начинается с последних предложений текущего, если вместе со следующим они помещаются
+            k = max(j - self.CHUNK_OVERLAP, i + 1)
+            while k < j and sum(unit[2] for unit in units[k:j + 1]) > self.max_tokens:
+                k += 1
+            i = k
+
+        return chunks
+
+    def _split_sentences(self, text: str) -> list[tuple[int, int, int]]:
+        """
+        Разбиение текста на предложения. Предложение длиннее max_tokens разбивается по словам.
+
+        Args:
+            text: текст
+
+        Returns:
+            Список (начало, конец, количество токенов)
+        """
+        bounds = []
+        start = 0
+        for match in self.SENTENCE_BOUNDARY.finditer(text):
+            bounds.append((start, match.start()))
+            start = match.end()
+        bounds.append((start, len(text)))
+
+        units = []
+        for start, end in bounds:
+            tokens = self._count_tokens(text[start:end])
+            if tokens <= self.max_tokens:
+                units.append((start, end, tokens))
+                continue
+
+            # Слишком длинное предложение: части из слов подряд
+            part_start, part_end, part_tokens = None, None, 0
+            for word in self.WORD.finditer(text, start, end):
+                word_tokens = self._count_tokens(word.group())
+                if part_start is not None and part_tokens + word_tokens > self.max_tokens:
+                    units.append((part_start, part_end, part_tokens))
+                    part_start, part_tokens = None, 0
+                if part_start is None:
+                    part_start = word.start()
+                part_end = word.end()
+                part_tokens += word_tokens
+            if part_start is not None:
+                units.append((part_start, part_end, part_tokens))
+
+        return units
+
+    @staticmethod
+    def _merge_spans(spans: list[tuple[EntitySpan, int]]) -> list[EntitySpan]:
+        """
+        Объединение сущностей из перекрывающихся окон.
+
+        Предложения на стыке окон обрабатываются дважды. Пересекающиеся сущности из разных окон считаются
+        одной сущностью, остается более длинный вариант (при равной длине - из первого окна).
+
+        Args:
+            spans: список (сущность с позициями в исходном тексте, номер окна)
+
+        Returns:
+            Сущности, упорядоченные по позиции в тексте
+        """
+        merged: list[tuple[EntitySpan, int]] = []
+
+        for span, chunk_idx in sorted(spans, key=lambda item: (item[0].start, -item[0].end, item[1])):
+            if merged:
+                last, last_chunk_idx = merged[-1]
+                if span.start < last.end and chunk_idx != last_chunk_idx:
+                    if span.end - span.start > last.end - last.start:
+                        merged[-1] = (span, chunk_idx)
+                    continue
+            merged.append((span, chunk_idx))
+
+        return [span for span, _ in merged]
+
+    def _add_term_if_valid(self, ret: list[TermDto], ent: EntitySpan, text: str):
+        surface_form = text[ent.start:ent.end].strip(self.SURFACE_FORM_STRIP)
+
+        # Ранний пропуск, если является стоп-словом.
+        if surface_form.lower() in self.stop_words:
+            return
+
+        term_feature = self._term_feature(surface_form)
+
+        if self._should_skip(term_feature):
+            return
+
+        dto = TermDto(
+            text=term_feature.lemmas,
+            word_count=term_feature.word_count,
+            start_pos=ent.start,
+            end_pos=ent.end,
+            surface_form=surface_form,
+            pos_model=term_feature.pos_model,
+            label=ent.label,
+        )
+
+        ret.append(dto)
 
     def _term_feature(self, term: str) -> TermFeature:
         """
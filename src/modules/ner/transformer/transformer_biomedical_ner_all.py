@@ -3,8 +3,7 @@ from typing import TypedDict, List
 from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
 
 from src.modules.module import ModuleInfo
-from src.modules.ner.ner import TermDto
-from src.modules.ner.transformer.transformer import Transformer
+from src.modules.ner.transformer.transformer import EntitySpan, Transformer
 
 
 class DistilBertEntity(TypedDict):
@@ -26,64 +25,78 @@ class TransformerBiomedicalNerAll(Transformer):
     * Архитектура: DistilBert (DistilBertForTokenClassification)
     * Особенности: настроена на заранее определенный список меток
     * Оценка выделения: 4/5
-    * Оценка скорости: 1 сек
+    * Оценка скорости: 1 сек (PyTorch), ~0.3 сек (ONNX Runtime int8, backend: onnx)
     * [HuggingFace](https://huggingface.co/d4data/biomedical-ner-all)
     * [Colab](https://colab.research.google.com/drive/1c9iFoqyMr2JjXBJaFR8na-ph3RSEMFy8#scrollTo=wpMJy2lzryaU)
     """
 
-    def __init__(self, article_fields: list, stopwords: list = None):
+    MODEL_ID = 'd4data/biomedical-ner-all'
+    AGGREGATION_STRATEGY = 'max'
+
+    # Бэкенды: torch - PyTorch fp32, onnx - ONNX Runtime с int8-квантизацией (только cpu)
+    BACKENDS = ('torch', 'onnx')
+
+    def __init__(self, article_fields: list, stopwords: list = None, device: str = 'cpu', backend: str = 'torch',
+                 incremental: bool = False):
         """
         Инициализация модуля.
 
         Args:
             article_fields: список полей из статьи для извлечения именованных сущностей.
             stopwords: список путей к файлам со списками стоп-слов.
+            device: устройство для трансформера: cpu, cuda.
+            backend: бэкенд для трансформера: torch, onnx.
+            incremental: обработать только новые статьи и статьи с измененным текстом, без очистки терминов.
         """
 
-        super().__init__(article_fields, stopwords)
-        tokenizer = AutoTokenizer.from_pretrained('d4data/biomedical-ner-all')
-        model = AutoModelForTokenClassification.from_pretrained('d4data/biomedical-ner-all')
-        self.pipe = pipeline('ner', model=model, tokenizer=tokenizer, aggregation_strategy='max')
+        if backend not in self.BACKENDS:
+            raise ValueError(f'Неизвестный бэкенд: {backend}. Варианты: {", ".join(self.BACKENDS)}')
+        if backend == 'onnx' and device != 'cpu':
+            raise ValueError(f'Бэкенд onnx поддерживает только устройство cpu, указано: {device}')
 
-    @staticmethod
-    def info() -> ModuleInfo:
-        return ModuleInfo(module='ner', type='transformer-biomedical-ner-all')
+        super().__init__(article_fields, stopwords, device, incremental)
+        self.backend = backend
 
-    def _extract_terms_from_text(self, text: str) -> list[TermDto]:
-        ret: list[TermDto] = []
+        if backend == 'onnx':
+            self.pipe = self.model_cache.get(f'{self.MODEL_ID}@onnx-int8', device, self._load_onnx_pipeline)
+        else:
+            self.pipe = self.model_cache.get(self.MODEL_ID, device, self._load_pipeline)
 
-        # Пример entities:
-        # [
-        #     {'entity_group': 'Biological_structure', 'score': np.float32(0.99993896), 'word': 'lung', 'start': 27, 'end': 31}
-        # ]
+        # Длина окна - позиционные эмбеддинги модели без служебных токенов [CLS] и [SEP]
+        self.max_tokens = self.pipe.model.config.max_position_embeddings - 2
 
-        entities: List[DistilBertEntity] = self.pipe(text)
+    def _load_pipeline(self):
+        tokenizer = AutoTokenizer.from_pretrained(self.MODEL_ID)
+        model = AutoModelForTokenClassification.from_pretrained(self.MODEL_ID)
+        return pipeline('ner', model=model, tokenizer=tokenizer, aggregation_strategy=self.AGGREGATION_STRATEGY,
+                        device=self.device)
 
-        for ent in entities:
-            self._add_term_if_valid(ret, ent, text)
+    def _load_onnx_pipeline(self):
+        # Модель экспортируется в resources/onnx при первом запуске, с проверкой совпадения результатов с PyTorch
+        from src.modules.ner.transformer.onnx_backend import export_quantized, onnx_pipeline
 
-        return ret
+        model_dir = export_quantized(self.MODEL_ID, self.AGGREGATION_STRATEGY)
+        return onnx_pipeline(model_dir, self.AGGREGATION_STRATEGY)
 
-    def _add_term_if_valid(self, ret: list[TermDto], ent: DistilBertEntity, text: str):
-        surface_form = text[ent['start']:ent['end']].strip()
+    @staticmethod
+    def info() -> ModuleInfo:
+        return ModuleInfo(module='ner', type='transformer-biomedical-ner-all')
 
-        # Ранний пропуск, если является стоп-словом.
-        if surface_form.lower() in self.stop_words:
-            return
+    def _memo_params(self) -> dict:
+        return {**super()._memo_params(), "backend": self.backend}
 
-        term_feature = self._term_feature(surface_form)
+    def _count_tokens(self, text: str) -> int:
+        return len(self.pipe.tokenizer.tokenize(text))
 
-        if self._should_skip(term_feature):
-            return
+    def _predict(self, texts: list[str]) -> list[list[EntitySpan]]:
+        # Пример entities для одного текста:
+        # [
+        #     {'entity_group': 'Biological_structure', 'score': np.float32(0.99993896), 'word': 'lung', 'start': 27, 'end': 31}
+        # ]
 
-        dto = TermDto(
-            text=term_feature.lemmas,
-            word_count=term_feature.word_count,
-            start_pos=ent['start'],
-            end_pos=ent['end'],
-            surface_form=surface_form,
-            pos_model=term_feature.pos_model,
-            label=ent['entity_group'],
-        )
+        predictions: List[List[DistilBertEntity]] = self.pipe(texts, batch_size=self.BATCH_SIZE)
 
-        ret.append(dto)
+        return [
+            [EntitySpan(ent['start'], ent['end'], ent['entity_group']) for ent in entities]
+            for entities in predictions
+        ]
@@ -3,8 +3,7 @@ from typing import TypedDict, List
 from gliner import GLiNER
 
 from src.modules.module import ModuleInfo
-from src.modules.ner.ner import TermDto
-from src.modules.ner.transformer.transformer import Transformer
+from src.modules.ner.transformer.transformer import EntitySpan, Transformer
 
 
 class GlinerEntity(TypedDict):
@@ -31,7 +30,10 @@ class TransformerGlinerBiomedBiLargeV1(Transformer):
     * [Colab](https://colab.research.google.com/drive/1fQfBIRLOVrnvgfbRfo8ylpmeKtKiA6Aj#scrollTo=13WHlnTXBg4k)
     """
 
-    def __init__(self, labels: list, article_fields: list, stopwords: list = None):
+    MODEL_ID = 'Ihor/gliner-biomed-bi-large-v1.0'
+
+    def __init__(self, labels: list, article_fields: list, stopwords: list = None, device: str = 'cpu',
+                 incremental: bool = False):
         """
         Инициализация модуля.
 
@@ -39,54 +41,37 @@ class TransformerGlinerBiomedBiLargeV1(Transformer):
             labels: список меток для извлечения, например ['Disease', 'Drug', 'Anatomy', 'Medical device']
             article_fields: список полей из статьи для извлечения именованных сущностей.
             stopwords: список путей к файлам со списками стоп-слов.
+            device: устройство для трансформера: cpu, cuda.
+            incremental: обработать только новые статьи и статьи с измененным текстом, без очистки терминов.
         """
 
         # Список полей
         if not labels:
             raise ValueError('Список меток не может быть пустым')
 
-        super().__init__(article_fields, stopwords)
-        self.model = GLiNER.from_pretrained('Ihor/gliner-biomed-bi-large-v1.0')
+        super().__init__(article_fields, stopwords, device, incremental)
+        self.model = self.model_cache.get(self.MODEL_ID, device,
+                                          lambda: GLiNER.from_pretrained(self.MODEL_ID, map_location=device))
         self.labels = labels
+        # Длина окна в словах: GLiNER разбивает текст на слова и обрезает его по max_len
+        self.max_tokens = self.model.config.max_len
 
     @staticmethod
     def info() -> ModuleInfo:
         return ModuleInfo(module='ner', type='transformer-gliner-biomed-bi-large-v1.0')
 
-    def _extract_terms_from_text(self, text: str) -> list[TermDto]:
-        ret: list[TermDto] = []
+    def _memo_params(self) -> dict:
+        return {**super()._memo_params(), "labels": self.labels}
 
-        # Пример entities:
+    def _predict(self, texts: list[str]) -> list[list[EntitySpan]]:
+        # Пример entities для одного текста:
         # [
         #     {'start': 0, 'end': 14, 'text': 'Calcifications', 'label': 'Pathological condition', 'score': 0.8707718849182129}
         # ]
-        entities: List[GlinerEntity] = self.model.predict_entities(text, self.labels, threshold=0.5)
-
-        for ent in entities:
-            self._add_term_if_valid(ret, ent, text)
-
-        return ret
-
-    def _add_term_if_valid(self, ret: list[TermDto], ent: GlinerEntity, text: str):
-        surface_form = text[ent['start']:ent['end']].strip()
-
-        # Ранний пропуск, если является стоп-словом.
-        if surface_form.lower() in self.stop_words:
-            return
-
-        term_feature = self._term_feature(surface_form)
-
-        if self._should_skip(term_feature):
-            return
-
-        dto = TermDto(
-            text=term_feature.lemmas,
-            word_count=term_feature.word_count,
-            start_pos=ent['start'],
-            end_pos=ent['end'],
-            surface_form=surface_form,
-            pos_model=term_feature.pos_model,
-            label=ent['label'],
-        )
+        predictions: List[List[GlinerEntity]] = self.model.inference(texts, self.labels, threshold=0.5,
+                                                                     batch_size=self.BATCH_SIZE)
 
-        ret.append(dto)
+        return [
+            [EntitySpan(ent['start'], ent['end'], ent['label']) for ent in entities]
+            for entities in predictions
+        ]
@@ -1,13 +1,11 @@
 import spacy
 from spacy.tokens.doc import Doc
-from spacy.tokens.span import Span
 from zshot import PipelineConfig
 from zshot.linker import LinkerSMXM
 from zshot.utils.data_models import Entity
 
 from src.modules.module import ModuleInfo
-from src.modules.ner.ner import TermDto
-from src.modules.ner.transformer.transformer import Transformer
+from src.modules.ner.transformer.transformer import EntitySpan, Transformer
 
 
 class TransformerOpenBioner(Transformer):
@@ -26,71 +24,65 @@ class TransformerOpenBioner(Transformer):
     * [Colab](https://colab.research.google.com/drive/1tqWKjX91PWttiMC6eHqZDSNefjSM3T4R#scrollTo=QkiWfpjj-ZRe)
     """
 
-    def __init__(self, article_fields: list, stopwords: list = None):
+    MODEL_ID = 'disi-unibo-nlp/openbioner-base'
+
+    # Есть проблема с NER: в конце может идти знак
+    SURFACE_FORM_STRIP = ":,.; "
+
+    def __init__(self, article_fields: list, stopwords: list = None, device: str = 'cpu',
+                 incremental: bool = False):
         """
         Инициализация модуля.
 
         Args:
             article_fields: список полей из статьи для извлечения именованных сущностей.
             stopwords: список путей к файлам со списками стоп-слов.
+            device: устройство для трансформера: cpu, cuda.
+            incremental: обработать только новые статьи и статьи с измененным текстом, без очистки терминов.
         """
 
-        super().__init__(article_fields, stopwords)
+        super().__init__(article_fields, stopwords, device, incremental)
+
+        # Список меток не зависит от параметров модуля, поэтому кешируется весь конвейер spaCy
+        self.nlp = self.model_cache.get(self.MODEL_ID, device, self._load_pipeline)
 
+        # Длина окна: SMXM добавляет к тексту описание метки и обрезает пару до 512 токенов BERT
+        zshot = self.nlp.get_pipe('zshot')
+        self.tokenizer = zshot.linker.tokenizer
+        description_tokens = max(len(self.tokenizer.tokenize(entity.description)) for entity in zshot.entities)
+        self.max_tokens = 512 - description_tokens - 3
+
+    def _load_pipeline(self) -> spacy.Language:
         # Список меток с описанием для извлечения по методике zero-shot.
         entities = self._fetch_entities()
 
-        self.nlp = spacy.blank('en')
+        nlp = spacy.blank('en')
         nlp_config = PipelineConfig(
-            linker=LinkerSMXM(model_name='disi-unibo-nlp/openbioner-base'),
+            linker=LinkerSMXM(model_name=self.MODEL_ID),
             entities=entities,
-            # Можно поменять на 'cuda'.
-            device='cpu'
+            device=self.device
         )
-        self.nlp.add_pipe('zshot', config=nlp_config, last=True)
+        nlp.add_pipe('zshot', config=nlp_config, last=True)
+        return nlp
 
     @staticmethod
     def info() -> ModuleInfo:
         return ModuleInfo(module='ner', type='transformer-open-bioner')
 
-    def _extract_terms_from_text(self, text: str) -> list[TermDto]:
-        ret: list[TermDto] = []
+    def _count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.tokenize(text))
 
-        doc: Doc = self.nlp(text)
+    def _predict(self, texts: list[str]) -> list[list[EntitySpan]]:
+        ret = []
 
-        span: Span
-        for span in doc.ents:
-            self._add_term_if_valid(ret, span, text)
+        doc: Doc
+        for doc in self.nlp.pipe(texts, batch_size=self.BATCH_SIZE):
+            ret.append([EntitySpan(span.start_char, span.end_char, span.label_) for span in doc.ents])
 
         self.logger.debug('Terms extracted')
 
         return ret
 
-    def _add_term_if_valid(self, ret: list[TermDto], span: Span, text: str):
-        # Есть проблема с NER: в конце может идти знак
-        surface_form = text[span.start_char:span.end_char].strip(":,.; ")
-
-        # Ранний пропуск, если является стоп-словом.
-        if surface_form.lower() in self.stop_words:
-            return
-
-        term_feature = self._term_feature(surface_form)
-
-        if self._should_skip(term_feature):
-            return
-
-        dto = TermDto(
-            text=term_feature.lemmas,
-            word_count=term_feature.word_count,
-            start_pos=span.start_char,
-            end_pos=span.end_char,
-            surface_form=surface_form,
-            pos_model=term_feature.pos_model,
-            label=span.label_,
-        )
-
-        ret.append(dto)
-
     def _fetch_entities(self) -> list[Entity]:
         return [
             Entity(name='DISEASE',
@@ -1,5 +1,13 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import matplotlib
+
 from src.modules.module import ModuleInfo
 from src.modules.output.charts.candidates_by_year import CandidatesByYear
+from src.modules.output.charts.chart import Chart
 from src.modules.output.charts.pos_model_by_year import PosModelByYear
 from src.modules.output.charts.vocabulary_coverage import VocabularyCoverage
 from src.modules.output.charts.wordcloud_image import WordcloudImage
@@ -9,17 +17,30 @@ from src.modules.output.output import Output
 class ChartsOutput(Output):
     """
     Модуль для графического вывода результатов.
+
+    Данные для всех графиков получаются из БД в основном процессе, отрисовка выполняется
+    в пуле процессов (workers > 1) или последовательно.
     """
 
-    def __init__(self, dpi: int, dictionaries: list[str]):
+    def __init__(self, dpi: int, dictionaries: list[str], workers: int | str = 1, candidates_layout: str = "png",
+                 force: bool = False):
         """
         Args:
             dpi: DPI для вывода графиков
             dictionaries: список словарей
+            workers: количество процессов для отрисовки графиков
+            candidates_layout: вариант вывода траекторий терминов-кандидатов, см. CandidatesByYear.LAYOUTS
+            force: перестроить все графики, даже если входные данные не изменились
         """
-        super().__init__()
+        if candidates_layout not in CandidatesByYear.LAYOUTS:
+            raise ValueError(
+                f"Неизвестный вариант вывода: {candidates_layout}. Варианты: {", ".join(CandidatesByYear.LAYOUTS)}")
+
+        super().__init__(force)
         self.dpi = dpi
         self.dictionaries = set(dictionaries)
+        self.workers = max(int(workers), 1)
+        self.candidates_layout = candidates_layout
 
     @staticmethod
     def info() -> ModuleInfo:
@@ -34,22 +55,85 @@ class ChartsOutput(Output):
         with container.db_session() as session:
             dictionaries = self._load_dictionaries(session, self.dictionaries)
 
-            # Генерация графика "Динамика покрытия извлеченных терминов"
-            chart1 = VocabularyCoverage(session, self.dpi, dictionaries, self._generate_output_file_path)
-            output_files = chart1.handle()
-            self._print_results(VocabularyCoverage, output_files)
-
-            # Генерация "Облако терминов".
-            chart2 = WordcloudImage(session, self.dpi, dictionaries, self._generate_output_file_path)
-            output_files = chart2.handle(2, 200)
-            self._print_results(WordcloudImage, output_files)
-
-            # Генерация 3-х графиков "Динамика POS-структур по годам"
-            chart3 = PosModelByYear(session, self.dpi, dictionaries, self._generate_output_file_path)
-            output_files = chart3.handle(10)
-            self._print_results(PosModelByYear, output_files)
-
-            # Генерация "Траектория появления терминов-кандидатов по годам"
-            chart4 = CandidatesByYear(session, self.dpi, self._generate_output_file_path)
-            output_files = chart4.handle()
-            self._print_results(CandidatesByYear, output_files)
+            charts: list[tuple[Chart, tuple]] = [
+                # График "Динамика покрытия извлеченных терминов"
+                (VocabularyCoverage(session, self.dpi, dictionaries, self._generate_output_file_path), ()),
+                # "Облако терминов"
+                (WordcloudImage(session, self.dpi, dictionaries, self._generate_output_file_path), (2, 200)),
+                # 3 графика "Динамика POS-структур по годам"
+                (PosModelByYear(session, self.dpi, dictionaries, self._generate_output_file_path), (10,)),
+                # "Траектория появления терминов-кандидатов по годам"
+                (CandidatesByYear(session, self.dpi, self._generate_output_file_path, self.candidates_layout), ()),
+            ]
+
+            # Получение данных. Графики большого объема разбиваются на части для параллельной отрисовки.
+            tasks: list[tuple[Chart, Any]] = []
+            fingerprints: dict[type, str] = {}
+            output_files: dict[type, list[Path]] = {}
+
+            for chart, args in charts:
+                name = type(chart).__name__
+
+                # Графики, входные данные которых не изменились, не перестраиваются
+                fingerprint = self._fingerprint(session, chart.SOURCES, {**chart.params(), "args": args})
+                if self._is_up_to_date(name, fingerprint):
+                    self.logger.info(f"[{name}] входные данные не изменились, графики не перестраиваются")
+                    continue
+
+                fingerprints[type(chart)] = fingerprint
+                output_files[type(chart)] = []
+
+                start = time.perf_counter()
+                data = chart.fetch(*args)
+                if isinstance(chart, CandidatesByYear):
+                    output_files[type(chart)].append(chart.save_meta(data))
+                self.logger.info(f"[{name}] данные получены за {time.perf_counter() - start:.2f} сек")
+
+                tasks += [(chart, part) for part in chart.split(data, self.workers)]
+
+        # Отрисовка
+        elapsed: dict[type, float] = {handler: 0.0 for handler in output_files}
+
+        for (chart, _), (files, seconds) in zip(tasks, self._render(tasks)):
+            output_files[type(chart)] += files
+            elapsed[type(chart)] += seconds
+
+        for handler, files in output_files.items():
+            self._save_fingerprint(handler.__name__, fingerprints[handler], files)
+
+            self.logger.info(f"[{handler.__name__}] графики построены за {elapsed[handler]:.2f} сек")
+            self._print_results(handler, files)
+
+    def _render(self, tasks: list[tuple[Chart, Any]]) -> list[tuple[list[Path], float]]:
+        """
+        Отрисовка графиков.
+
+        Args:
+            tasks: пары (график, данные для отрисовки)
+
+        Returns:
+            Для каждой пары - список файлов и время отрисовки
+        """
+        if self.workers == 1:
+            return [_render_chart(chart, data) for chart, data in tasks]
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+            futures = [executor.submit(_render_chart, chart, data) for chart, data in tasks]
+            return [future.result() for future in futures]
+
+
+def _init_worker() -> None:
+    """Инициализация процесса отрисовки: неинтерактивный backend matplotlib"""
+    matplotlib.use("Agg")
+
+
+def _render_chart(chart: Chart, data: Any) -> tuple[list[Path], float]:
+    """
+    Отрисовка графика. Функция уровня модуля, чтобы ее можно было передать в пул процессов.
+
+    Returns:
+        Список файлов и время отрисовки, сек
+    """
+    start = time.perf_counter()
+    output_files = chart.render(data)
+    return output_files, time.perf_counter() - start
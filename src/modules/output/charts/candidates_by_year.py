@@ -1,22 +1,48 @@
 import csv
+from itertools import groupby
 from pathlib import Path
 
 import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from src.helper import disable_logging, enable_logging, all_years_range
+from src.modules.output.charts.chart import Chart
 
 
-class CandidatesByYear():
+class CandidatesByYear(Chart):
     """
     Траектория появления терминов-кандидатов по годам.
+
+    Варианты вывода (layout):
+        * png - отдельный файл на каждого кандидата;
+        * pdf - один многостраничный PDF, страница на кандидата;
+        * grid - small multiples, сетка GRID_ROWS × GRID_COLS кандидатов на одном PNG.
+
+    Фигура и оси создаются один раз и переиспользуются: между кандидатами удаляются только
+    линия и отметки лет.
     """
 
-    def __init__(self, session: Session, dpi: int, path_generator):
-        self.session = session
-        self.dpi = dpi
-        self.path_generator = path_generator
+    SOURCES = ("candidates", "terms", "articles")
+
+    LAYOUTS = ("png", "pdf", "grid")
+
+    # Размер сетки для layout=grid
+    GRID_ROWS: int = 4
+    GRID_COLS: int = 4
+
+    PDF_FILENAME = "candidates.pdf"
+
+    def __init__(self, session: Session, dpi: int, path_generator, layout: str = "png"):
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Неизвестный вариант вывода: {layout}. Варианты: {", ".join(self.LAYOUTS)}")
+
+        super().__init__(session, dpi, [], path_generator)
+        self.layout = layout
 
     def handle(self) -> list[Path]:
         """
@@ -25,37 +51,82 @@ class CandidatesByYear():
         Returns:
             Список файлов
         """
+        data = self.fetch()
+        self.save_meta(data)
+        return self.render(data)
+
+    def fetch(self) -> tuple[list[dict], range]:
+        """
+        Returns:
+            Термины-кандидаты (с именем файла графика) и все года исследований
+        """
+        results = [dict(row) for row in self._fetch_results()]
 
-        # Получение результатов
-        results = self._fetch_results()
+        per_page = self.GRID_ROWS * self.GRID_COLS
+        for idx, term in enumerate(results):
+            term['filename'] = {
+                "png": f"{term['id']}.png",
+                "pdf": self.PDF_FILENAME,
+                "grid": f"grid_{idx // per_page + 1:03d}.png",
+            }[self.layout]
 
-        # Все года исследований
-        all_years = all_years_range(self.session)
+        return results, all_years_range(self.session)
 
-        # Каталог для хранения результатов
-        candidates_dir = self.path_generator("Траектория появления терминов-кандидатов")
-        candidates_dir.mkdir(parents=True, exist_ok=True)
+    def render(self, data: tuple[list[dict], range]) -> list[Path]:
+        results, all_years = data
 
-        output_files = []
-        meta_description = []
+        candidates_dir = self._candidates_dir()
 
-        for term in results:
-            # Генерация имен файлов
-            filename = str(term['id']) + ".png"
-            output_file_path = candidates_dir / filename
-            output_files.append(output_file_path)
+        disable_logging()
 
-            # Создание графиков
-            self._generate_chart(term, all_years, output_file_path)
-            meta_description.append({
-                **term,
-                'filename': filename
-            })
+        if self.layout == "png":
+            output_files = self._render_png(results, all_years, candidates_dir)
+        elif self.layout == "pdf":
+            output_files = self._render_pdf(results, all_years, candidates_dir)
+        else:
+            output_files = self._render_grid(results, all_years, candidates_dir)
 
-        self._save_meta(meta_description, candidates_dir / 'meta.csv')
+        enable_logging()
 
         return output_files
 
+    def params(self) -> dict:
+        return {**super().params(), "layout": self.layout}
+
+    def split(self, data: tuple[list[dict], range], parts: int) -> list:
+        """Файлы (группы кандидатов с одним filename) распределяются по частям целиком"""
+        results, all_years = data
+
+        files = [list(group) for _, group in groupby(results, key=lambda term: term['filename'])]
+
+        return [
+            ([term for file in files[idx::parts] for term in file], all_years)
+            for idx in range(parts)
+            if files[idx::parts]
+        ]
+
+    def save_meta(self, data: tuple[list[dict], range]) -> Path:
+        """
+        Сохранение описания графиков в meta.csv.
+
+        Args:
+            data: результат fetch()
+
+        Returns:
+            Путь к файлу
+        """
+        results, _ = data
+
+        meta_file = self._candidates_dir() / 'meta.csv'
+        self._save_meta(results, meta_file)
+        return meta_file
+
+    def _candidates_dir(self) -> Path:
+        """Каталог для хранения результатов"""
+        candidates_dir = self.path_generator("Траектория появления терминов-кандидатов")
+        candidates_dir.mkdir(parents=True, exist_ok=True)
+        return candidates_dir
+
     def _fetch_results(self) -> list[dict]:
         params = {}
         sql = f"""
@@ -71,61 +142,155 @@ class CandidatesByYear():
 
         return self.session.execute(text(sql), params).mappings().all()
 
-    def _generate_chart(self, term: dict, all_years: range, output_file_path: Path) -> None:
-        disable_logging()
+    def _render_png(self, results: list[dict], all_years: range, candidates_dir: Path) -> list[Path]:
+        """Отдельный PNG на каждого кандидата"""
+        fig, ax = self._create_figure(all_years)
+
+        output_files = []
+        for term in results:
+            output_file_path = candidates_dir / term['filename']
+            output_files.append(output_file_path)
+
+            artists = self._draw_term(ax, term, all_years)
+            fig.tight_layout()
+            fig.savefig(output_file_path, dpi=self.dpi)
+            self._clear(artists)
+
+        plt.close(fig)
+
+        return output_files
+
+    def _render_pdf(self, results: list[dict], all_years: range, candidates_dir: Path) -> list[Path]:
+        """Многостраничный PDF, страница на кандидата"""
+        if not results:
+            return []
+
+        output_file_path = candidates_dir / self.PDF_FILENAME
+        fig, ax = self._create_figure(all_years)
+
+        with PdfPages(output_file_path) as pdf:
+            for term in results:
+                artists = self._draw_term(ax, term, all_years)
+                fig.tight_layout()
+                pdf.savefig(fig)
+                self._clear(artists)
+
+        plt.close(fig)
+
+        return [output_file_path]
+
+    def _render_grid(self, results: list[dict], all_years: range, candidates_dir: Path) -> list[Path]:
+        """Small multiples: сетка кандидатов на одном PNG"""
+        output_files = []
+
+        for filename, group in groupby(results, key=lambda term: term['filename']):
+            output_file_path = candidates_dir / filename
+            output_files.append(output_file_path)
+
+            fig, axes = plt.subplots(
+                self.GRID_ROWS,
+                self.GRID_COLS,
+                figsize=(4 * self.GRID_COLS, 3 * self.GRID_ROWS),
+                sharex=True,
+                squeeze=False,
+            )
+            axes = axes.flatten()
+
+            terms = list(group)
+            for ax, term in zip(axes, terms):
+                self._draw_term(ax, term, all_years, legend=False)
+                ax.set_xticks(list(all_years)[::2])
+                ax.tick_params(labelsize=7)
+                ax.title.set_fontsize(9)
+
+            # Пустые ячейки последней страницы
+            for ax in axes[len(terms):]:
+                ax.set_visible(False)
+
+            # Общая легенда: одинаковые отметки встречаются на разных графиках
+            handles = {}
+            for ax in axes[:len(terms)]:
+                for handle, label in zip(*ax.get_legend_handles_labels()):
+                    handles.setdefault(label, handle)
+            fig.legend(handles.values(), handles.keys(), loc="lower center", ncol=len(handles))
+
+            fig.supxlabel('Год')
+            fig.supylabel('Количество упоминаний')
+            # Фиксированные отступы вместо tight_layout: расчет раскладки для всей сетки заметно дороже
+            fig.subplots_adjust(left=0.06, right=0.98, bottom=0.1, top=0.96, hspace=0.35, wspace=0.2)
+            fig.savefig(output_file_path, dpi=self.dpi)
+            plt.close(fig)
+
+        return output_files
+
+    def _create_figure(self, all_years: range) -> tuple[Figure, Axes]:
+        """Фигура с постоянными элементами: подписи осей и года"""
+        fig, ax = plt.subplots()
+
+        ax.set_xticks(list(all_years)[::2])
+        ax.set_xlabel('Год')
+        ax.set_ylabel('Количество упоминаний')
 
+        return fig, ax
+
+    def _draw_term(self, ax: Axes, term: dict, all_years: range, legend: bool = True) -> list[Artist]:
+        """
+        Отрисовка траектории кандидата.
+
+        Returns:
+            Добавленные элементы графика
+        """
         # Подготовка временного ряда
         years = list(all_years)
         counts = [term['counts_per_year'].get(str(y), 0) for y in years]
 
-        # Построение графика
-        plt.figure()
-        plt.plot(years, counts, marker='o')
+        # Цвет задан явно: на переиспользуемых осях цикл цветов продолжается от кандидата к кандидату
+        artists = ax.plot(years, counts, marker='o', color='C0')
+        artists += self._draw_points(ax, term)
 
-        self._draw_points(term)
+        # Пределы осей пересчитываются только по текущим элементам
+        ax.relim()
+        ax.autoscale_view()
 
-        y_min = 0
-        y_max = max(counts)
-        plt.yticks(range(y_min, y_max + 1))
+        ax.set_yticks(range(0, max(counts) + 1))
+        ax.set_title(f'{term["term_text"]}')
 
-        plt.xticks(years[::2])
+        if legend:
+            artists.append(ax.legend())
 
-        plt.xlabel('Год')
-        plt.ylabel('Количество упоминаний')
-        plt.title(f'{term["term_text"]}')
-        plt.legend()
-        plt.tight_layout()
-        plt.savefig(output_file_path, dpi=self.dpi)
-        plt.close()
+        return artists
 
-        enable_logging()
+    def _clear(self, artists: list[Artist]) -> None:
+        """Удаление элементов кандидата с переиспользуемых осей"""
+        for artist in artists:
+            artist.remove()
 
-    def _draw_points(self, term: dict):
+    def _draw_points(self, ax: Axes, term: dict) -> list[Artist]:
         if term['first_year'] == term['first_stable_year']:
-            plt.axvspan(
+            return [ax.axvspan(
                 term['first_year'] - 0.5,
                 term['first_year'] + 0.5,
                 color='yellow',
                 alpha=0.2,
                 label='Появление термина + минимальная устойчивость'
-            )
-            return
-
-        plt.axvspan(
-            term['first_year'] - 0.5,
-            term['first_year'] + 0.5,
-            color='green',
-            alpha=0.2,
-            label='Появление термина'
-        )
-
-        plt.axvspan(
-            term['first_stable_year'] - 0.5,
-            term['first_stable_year'] + 0.5,
-            color='red',
-            alpha=0.2,
-            label='Минимальная устойчивость'
-        )
+            )]
+
+        return [
+            ax.axvspan(
+                term['first_year'] - 0.5,
+                term['first_year'] + 0.5,
+                color='green',
+                alpha=0.2,
+                label='Появление термина'
+            ),
+            ax.axvspan(
+                term['first_stable_year'] - 0.5,
+                term['first_stable_year'] + 0.5,
+                color='red',
+                alpha=0.2,
+                label='Минимальная устойчивость'
+            ),
+        ]
 
     def _save_meta(self, meta_description: list[dict], csv_file: Path) -> None:
         columns = [
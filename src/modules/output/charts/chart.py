@@ -0,0 +1,85 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from src.orm.models import Dictionary
+
+
+class Chart(ABC):
+    """
+    Абстрактный график.
+
+    Построение разделено на два шага:
+        * fetch() - получение данных из БД, выполняется в основном процессе;
+        * render() - отрисовка и сохранение файлов, не использует БД и может выполняться в другом процессе.
+    """
+
+    # Таблицы-источники данных, используются для отпечатка входных данных (см. Output._fingerprint())
+    SOURCES: tuple[str, ...] = ("terms", "term_year_counts", "dictionaries")
+
+    def __init__(self, session: Session, dpi: int, dictionaries: list[Dictionary], path_generator):
+        self.session = session
+        self.dpi = dpi
+        self.dictionaries = dictionaries
+        self.path_generator = path_generator
+
+    def __getstate__(self) -> dict:
+        # Сессия и словари (объекты ORM) нужны только для fetch() и не передаются в другой процесс
+        state = self.__dict__.copy()
+        state["session"] = None
+        state["dictionaries"] = None
+        return state
+
+    def handle(self, *args) -> list[Path]:
+        """
+        Запуск генерации
+
+        Returns:
+            Список файлов
+        """
+        return self.render(self.fetch(*args))
+
+    @abstractmethod
+    def fetch(self, *args) -> Any:
+        """
+        Получение данных из БД для построения графиков.
+
+        Returns:
+            Данные для render(), должны поддерживать pickle
+        """
+        pass
+
+    @abstractmethod
+    def render(self, data: Any) -> list[Path]:
+        """
+        Построение графиков.
+
+        Args:
+            data: результат fetch()
+
+        Returns:
+            Список файлов
+        """
+        pass
+
+    def params(self) -> dict:
+        """Параметры, влияющие на результат"""
+        return {
+            "dpi": self.dpi,
+            "dictionaries": sorted(dictionary.name for dictionary in self.dictionaries),
+        }
+
+    def split(self, data: Any, parts: int) -> list:
+        """
+        Разбиение данных на части для параллельной отрисовки.
+
+        Args:
+            data: результат fetch()
+            parts: желаемое количество частей
+
+        Returns:
+            Список данных для render(), по умолчанию - без разбиения
+        """
+        return [data]
@@ -6,38 +6,46 @@ import pandas as pd
 import seaborn as sns
 import statsmodels.api as sm
 from scipy.stats import pearsonr, kendalltau
-from sqlalchemy import text, bindparam
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from src.helper import disable_logging, enable_logging
+from src.modules.output.charts.chart import Chart
 from src.orm.models import Dictionary
 
 
-class PosModelByYear():
+class PosModelByYear(Chart):
     """
     Динамика распределения POS-структур по годам, кроме униграмм.
     """
 
     def __init__(self, session: Session, dpi: int, dictionaries: list[Dictionary], path_generator):
-        self.session = session
-        self.dpi = dpi
-        self.dictionaries = dictionaries
-        self.path_generator = path_generator
+        super().__init__(session, dpi, dictionaries, path_generator)
+        # Результаты запроса по n_top, общие для всех графиков (абсолютных, относительных и фасетных)
+        self._results: dict[int, tuple[list[dict], list[dict]]] = {}
 
-    def handle(self, n_top: int) -> list[Path]:
+    def fetch(self, n_top: int) -> tuple[list[dict], list[dict]]:
         """
-        Запуск генерации
-
         Args:
             n_top: ТОП-n POS-структур (количество популярных структурных моделей на графике)
         Returns:
-            Список файлов
+            Количество POS-структур по годам: ТОП-n и всего
         """
+        if n_top not in self._results:
+            pos_models_by_year = []
+            total_pos_models_by_year = []
+            for row in self._fetch_pos_models_by_year(n_top):
+                if row["is_total"]:
+                    total_pos_models_by_year.append({"year": row["year"], "count": row["count"]})
+                else:
+                    pos_models_by_year.append({"year": row["year"], "pos_model": row["pos_model"], "count": row["count"]})
+
+            self._results[n_top] = (pos_models_by_year, total_pos_models_by_year)
 
-        # Получение данных
-        total_pos_models_by_year = self._fetch_total_pos_models_by_year()
-        top_pos_models = self._fetch_top_pos_models(n_top)
-        pos_models_by_year = self._fetch_pos_models_by_year(top_pos_models)
+        return self._results[n_top]
+
+    def render(self, data: tuple[list[dict], list[dict]]) -> list[Path]:
+        pos_models_by_year, total_pos_models_by_year = data
 
         # Генерация имен файлов
         file_pos_model_by_year_abs = self.path_generator("Количество POS-структур по годам, кроме униграмм.png")
@@ -64,67 +72,40 @@ class PosModelByYear():
 
         return [file_pos_model_by_year_abs, file_pos_model_by_year_rel, file_pos_model_by_year_facet]
 
-    def _fetch_total_pos_models_by_year(self) -> list:
-        params, joins_sql, where_sql = Dictionary.filter_not_in_dict(self.dictionaries)
-
-        # Финальный SQL
-        sql = text(f"""
-            SELECT
-                EXTRACT(YEAR FROM a.pubdate) AS year,       -- Год
-                COUNT(*)                     AS count       -- Количество
-            FROM terms t
-                JOIN article_term_annotations ann ON t.id = ann.term_id
-                JOIN articles a ON a.id = ann.article_id
-                {joins_sql}
-            WHERE 1=1 
-                {where_sql}
-            GROUP BY year
-        """)
-
-        # Оставлено для отладки
-        # print(sql, params, sep="\n")
-
-        return self.session.execute(sql, params).mappings().all()
-
-    def _fetch_top_pos_models(self, n_top: int) -> list:
-        params, joins_sql, where_sql = Dictionary.filter_not_in_dict(self.dictionaries)
-        params.update({"n_top": n_top})
-
-        # Финальный SQL
-        sql = f"""
-            SELECT pos_model, COUNT(*) AS count
-            FROM terms t
-                {joins_sql}
-            WHERE word_count > 1
-                {where_sql}
-            GROUP BY pos_model
-            ORDER BY COUNT(*) DESC
-            LIMIT :n_top
+    def _fetch_pos_models_by_year(self, n_top: int) -> list:
         """
+        Количество POS-структур по годам за один запрос.
 
-        # Оставлено для отладки
-        # print(text(sql), params, sep="\n")
-
-        return self.session.execute(text(sql), params).mappings().all()
-
-    def _fetch_pos_models_by_year(self, top_pos_models: list) -> list:
-        params, joins_sql, where_sql = Dictionary.filter_not_in_dict(self.dictionaries)
-        params.update({"top_pos_models": [it["pos_model"] for it in top_pos_models]})
+        ТОП-n POS-структур (кроме униграмм) выбирается по количеству терминов в CTE, годовые суммы
+        считаются через GROUPING SETS: строки (год) - всего по году, строки (год, pos_model) - по ТОП-n.
+        """
+        params, where_sql = Dictionary.filter_not_in_dict(self.dictionaries)
+        params.update({"n_top": n_top})
 
         # Финальный SQL
         sql = text(f"""
+            WITH top_pos_models AS (
+                SELECT
+                    t.pos_model,
+                    ROW_NUMBER() OVER (ORDER BY COUNT(*) DESC, t.pos_model) AS rank
+                FROM terms t
+                WHERE t.word_count > 1
+                    {where_sql}
+                GROUP BY t.pos_model
+            )
             SELECT
-                EXTRACT(YEAR FROM a.pubdate) AS year,       -- Год
-                t.pos_model                  AS pos_model,  -- Схема
-                COUNT(*)                     AS count       -- Количество
+                c.year                       AS year,       -- Год
+                tp.pos_model                 AS pos_model,  -- Схема (NULL для строки "всего")
+                GROUPING(tp.pos_model) = 1   AS is_total,   -- Строка "всего" по году
+                SUM(c.count)                 AS count       -- Количество
             FROM terms t
-                JOIN article_term_annotations ann ON t.id = ann.term_id
-                JOIN articles a ON a.id = ann.article_id
-                {joins_sql}
-            WHERE t.pos_model IN :top_pos_models
+                JOIN term_year_counts c ON t.id = c.term_id
+                LEFT JOIN top_pos_models tp ON tp.pos_model = t.pos_model AND tp.rank <= :n_top
+            WHERE 1=1
                 {where_sql}
-            GROUP BY year, pos_model
-        """).bindparams(bindparam("top_pos_models", expanding=True))
+            GROUP BY GROUPING SETS ((c.year), (c.year, tp.pos_model))
+            HAVING GROUPING(tp.pos_model) = 1 OR tp.pos_model IS NOT NULL
+        """)
 
         # Оставлено для отладки
         # print(sql, params, sep="\n")
@@ -7,29 +7,21 @@ import seaborn as sns
 import statsmodels.api as sm
 from scipy.stats import pearsonr, kendalltau
 from sqlalchemy import text
-from sqlalchemy.orm import Session
 
 from src.helper import disable_logging, enable_logging
+from src.modules.output.charts.chart import Chart
 from src.orm.models import Dictionary
 
 
-class VocabularyCoverage():
+class VocabularyCoverage(Chart):
     """
     Генерация графика "Количество терминов в PubMed и их покрытие словарями"
     """
 
-    def __init__(self, session: Session, dpi: int, dictionaries: list[Dictionary], path_generator):
-        self.session = session
-        self.dpi = dpi
-        self.dictionaries = dictionaries
-        self.path_generator = path_generator
-
-    def handle(self) -> list[Path]:
-        """
-        Запуск генерации
-        """
-        results = self._fetch_results()
+    def fetch(self) -> list[dict]:
+        return self._fetch_results()
 
+    def render(self, results: list[dict]) -> list[Path]:
         # Генерация имен файлов
         output_file_path = self.path_generator("Количество извлеченных терминов и их покрытие словарями.png")
         output_file_path_facet = self.path_generator("Динамика покрытия извлеченных терминов словарями.png")
@@ -45,48 +37,37 @@ class VocabularyCoverage():
         """
         params = {}
         select_fields = []
-        join_tables = []
         dict_column_to_dict_name_map = {}
 
         # Проходим по списку словарей и подготавливаем части SQL для постановки в финальный запрос.
         for idx, dictionary in enumerate(self.dictionaries):
-            # Для множественного объединения таблиц используем алиасы.
-            table_alias = f"ref_{idx}"
-
-            # Параметр для dictionary_id
-            param_name = f"dict_id_{idx}"
-            params[param_name] = dictionary.id
+            # Параметр для бита словаря в terms.dictionary_mask
+            param_name = f"dict_bit_{idx}"
+            params[param_name] = dictionary.bit
 
             dict_column = f"in_{idx}"
             select_fields.append(
-                f"SUM(CASE WHEN {table_alias}.id IS NULL THEN 0 ELSE 1 END) AS {dict_column}"
+                f"SUM(((t.dictionary_mask >> :{param_name}) & 1)::int * c.count) AS {dict_column}"
             )
             # Также сохраняем связку колонки и названия словаря для дальнейшего его восстановления.
             # Передавать в SQL название словаря как название колонки не безопасно,
             # поэтому используется такой путь.
             dict_column_to_dict_name_map[dict_column] = dictionary.name
 
-            join_tables.append(
-                f"""
-                LEFT JOIN term_dictionary_ref {table_alias}
-                       ON {table_alias}.term_id = t.id
-                      AND {table_alias}.dictionary_id = :{param_name}""")
+        # Проверка, что словарям назначены биты
+        Dictionary.bit_mask(self.dictionaries)
 
-        joins_sql = "\n".join(join_tables)
-        fields_sql = ",\n        ".join(select_fields)
+        fields_sql = ",\n        ".join(["SUM(c.count) AS total_count"] + select_fields)
 
         # Финальный SQL
         sql = f"""
         SELECT
-            EXTRACT(YEAR FROM a.pubdate) AS year,
-            COUNT(*)                     AS total_count,
+            c.year AS year,
             {fields_sql}
         FROM terms t
-            JOIN article_term_annotations ann ON t.id = ann.term_id
-            JOIN articles a ON a.id = ann.article_id
-            {joins_sql}
-        GROUP BY year
-        ORDER BY year;
+            JOIN term_year_counts c ON t.id = c.term_id
+        GROUP BY c.year
+        ORDER BY c.year;
         """
 
         # Оставлено для отладки
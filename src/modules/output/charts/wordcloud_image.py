@@ -3,42 +3,34 @@ from pathlib import Path
 import pandas as pd
 from matplotlib import pyplot as plt
 from sqlalchemy import text
-from sqlalchemy.orm import Session
 from wordcloud import WordCloud
 
 from src.helper import disable_logging, enable_logging
+from src.modules.output.charts.chart import Chart
 from src.orm.models import Dictionary
 
 
-class WordcloudImage():
+class WordcloudImage(Chart):
     """
     Генерация облака слов.
     """
 
-    def __init__(self, session: Session, dpi: int, dictionaries: list[Dictionary], path_generator):
-        self.session = session
-        self.dpi = dpi
-        self.dictionaries = dictionaries
-        self.path_generator = path_generator
-
-    def handle(self, min_word_count: int, max_terms: int) -> list[Path]:
+    def fetch(self, min_word_count: int, max_terms: int) -> tuple[list[dict], int]:
         """
-        Запуск генерации
-
         Args:
             min_word_count: минимальное количества слов в термине
             max_terms: максимальное количество терминов в облаке слов
-        Returns:
-            Список файлов
         """
+        results = [dict(row) for row in self._fetch_results(min_word_count, max_terms)]
+        return results, max_terms
+
+    def render(self, data: tuple[list[dict], int]) -> list[Path]:
+        results, max_terms = data
 
         # Генерация имен файлов
         wordcloud_img_file = self.path_generator("Облако терминов.png")
         wordcloud_csv_file = self.path_generator("Облако терминов.csv")
 
-        # Получение результатов
-        results = self._fetch_results(min_word_count, max_terms)
-
         # WordCloud имеет дефолтное значение max_words=200, поэтому передаем реальное значение для
         # случая, когда терминов более 200.
         self._generate_chart(results, max_terms, wordcloud_img_file)
@@ -52,7 +44,7 @@ class WordcloudImage():
         """
         Получение данных из БД для построения облака слов.
         """
-        params, joins_sql, where_sql = Dictionary.filter_not_in_dict(self.dictionaries)
+        params, where_sql = Dictionary.filter_not_in_dict(self.dictionaries)
         params.update({
             "min_word_count": min_word_count,
             "max_terms": max_terms,
@@ -60,11 +52,9 @@ class WordcloudImage():
 
         # Финальный SQL
         sql = f"""
-            SELECT term_text, count(*) as count
+            SELECT term_text, SUM(c.count) as count
             FROM terms t
-                JOIN article_term_annotations ann on t.id = ann.term_id
-                JOIN articles a on a.id = ann.article_id
-                {joins_sql}
+                JOIN term_year_counts c on t.id = c.term_id
             WHERE
                 word_count >= :min_word_count
                 {where_sql}
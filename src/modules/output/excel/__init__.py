@@ -1,6 +1,12 @@
+import csv
+import gzip
+from itertools import chain, islice
 from pathlib import Path
+from typing import Iterable, Iterator
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
@@ -12,16 +18,47 @@ from src.orm.models import Dictionary
 class ExcelOutput(Output):
     """
     Модуль для сохранения результатов в Excel.
+
+    Строки статистики читаются из БД потоком (серверный курсор) и сразу записываются в файл,
+    поэтому расход памяти не зависит от объема данных.
     """
 
-    def __init__(self, dictionaries: list[str]):
+    # Форматы файлов: название формата -> метод генерации
+    FORMATS = {
+        "xlsx": "_generate_excel",
+        "parquet": "_generate_parquet",
+        "csv.gz": "_generate_csv",
+    }
+
+    # Ограничение Excel на количество строк на листе (вместе с заголовком)
+    EXCEL_MAX_ROWS: int = 1_048_576
+
+    # Размер пакета строк при потоковом чтении из БД и записи в Parquet
+    BATCH_SIZE: int = 10000
+
+    # Колонки с числовыми значениями, остальные - строковые
+    NUMERIC_COLUMNS = ("Word count", "Year", "Count")
+
+    # Таблицы-источники данных, используются для отпечатка входных данных (см. Output._fingerprint())
+    SOURCES = ("terms", "term_year_counts", "term_dictionary_ref", "dictionaries")
+
+    def __init__(self, dictionaries: list[str], formats: list[str] = None, force: bool = False):
         """
         Args:
             dictionaries: список словарей
+            formats: форматы файлов, см. FORMATS. По умолчанию - только xlsx.
+            force: перегенерировать файлы, даже если входные данные не изменились
         """
-        super().__init__()
+        super().__init__(force)
         self.dictionaries = set(dictionaries)
 
+        if formats is None:
+            formats = ["xlsx"]
+        for output_format in formats:
+            if output_format not in self.FORMATS:
+                raise ValueError(f"Неизвестный формат: {output_format}. Варианты: {", ".join(self.FORMATS)}")
+        self.formats = formats
+
     @staticmethod
     def info() -> ModuleInfo:
         return ModuleInfo(module="output", type="excel")
@@ -33,13 +70,26 @@ class ExcelOutput(Output):
         with container.db_session() as session:
             dictionaries = self._load_dictionaries(session, self.dictionaries)
 
-            results = self._load_statistics(session, dictionaries)
+            params = {"dictionaries": sorted(self.dictionaries), "formats": self.formats}
+            fingerprint = self._fingerprint(session, self.SOURCES, params)
+            if self._is_up_to_date("statistics", fingerprint):
+                self.logger.info("Входные данные не изменились, файлы не перегенерируются")
+                return
+
+            output_files = []
+            for output_format in self.formats:
+                # Для каждого формата - отдельный проход по результатам запроса
+                results = self._load_statistics(session, dictionaries)
+
+                output_file = getattr(self, self.FORMATS[output_format])(results)
+                if output_file:
+                    output_files.append(output_file)
 
-            excel_file = self._generate_excel(results)
-            if excel_file:
-                self._print_results(ExcelOutput, [excel_file])
+            if output_files:
+                self._save_fingerprint("statistics", fingerprint, output_files)
+                self._print_results(ExcelOutput, output_files)
 
-    def _load_statistics(self, session: Session, dictionaries: list[Dictionary]):
+    def _load_statistics(self, session: Session, dictionaries: list[Dictionary]) -> Iterator[dict]:
         """
         Статистика терминов по годам и словарям.
 
@@ -48,69 +98,73 @@ class ExcelOutput(Output):
             dictionaries: список словарей
 
         Returns:
-            Собранная статистика по годам и словарям
+            Поток строк статистики по годам и словарям
         """
 
         params = {}
         select_fields = []
-        join_tables = []
-        group_fields = []
+        pivot_fields = []
         dict_column_to_dict_name_map = {}
 
         # Проходим по списку словарей и подготавливаем части SQL для постановки в финальный запрос.
         for idx, dictionary in enumerate(dictionaries):
-            # Для множественного объединения таблиц используем алиасы.
-            table_alias = f"ref_{idx}"
-
-            # Параметр для dictionary_id
-            param_name = f"dict_id_{idx}"
-            params[param_name] = dictionary.id
+            # Параметры для dictionary_id и бита словаря в terms.dictionary_mask
+            param_id = f"dict_id_{idx}"
+            param_bit = f"dict_bit_{idx}"
+            params[param_id] = dictionary.id
+            params[param_bit] = dictionary.bit
 
             dict_column = f"in_{idx}"
+            pivot_fields.append(
+                f"MAX(ref.ref_id) FILTER (WHERE ref.dictionary_id = :{param_id}) AS {dict_column}"
+            )
             select_fields.append(
-                f"CASE WHEN {table_alias}.id IS NULL THEN '' ELSE {table_alias}.ref_id END AS {dict_column}"
+                f"CASE WHEN (t.dictionary_mask >> :{param_bit}) & 1 = 0 THEN '' ELSE refs.{dict_column} END "
+                f"AS {dict_column}"
             )
             # Также сохраняем связку колонки и названия словаря для дальнейшего его восстановления.
             # Передавать в SQL название словаря как название колонки не безопасно,
             # поэтому используется такой путь.
             dict_column_to_dict_name_map[dict_column] = dictionary.name
 
-            join_tables.append(
-                f"""
-                LEFT JOIN term_dictionary_ref {table_alias}
-                       ON {table_alias}.term_id = t.id
-                      AND {table_alias}.dictionary_id = :{param_name}
-                """
-            )
-
-            group_fields.append(dict_column)
+        params["dict_mask"] = Dictionary.bit_mask(dictionaries)
 
-        joins_sql = "\n".join(join_tables)
-        fields_sql = ",\n        ".join(select_fields)
-        group_sql = ", ".join(group_fields)
+        fields_sql = ",\n            ".join(["c.count AS count"] + select_fields)
+        pivot_sql = ",\n                ".join(["ref.term_id"] + pivot_fields)
 
-        # Финальный SQL
+        # Финальный SQL.
+        # Коды терминов в словарях разворачиваются в колонки одним проходом по term_dictionary_ref,
+        # только для терминов, которые есть хотя бы в одном из словарей.
         sql = f"""
+        WITH counts AS (
+            SELECT term_id, year, SUM(count) AS count
+            FROM term_year_counts
+            GROUP BY term_id, year
+        ),
+        refs AS (
+            SELECT
+                {pivot_sql}
+            FROM term_dictionary_ref ref
+                JOIN terms t ON t.id = ref.term_id
+            WHERE t.dictionary_mask & :dict_mask <> 0
+            GROUP BY ref.term_id
+        )
         SELECT
             t.term_text,
             t.word_count,
             t.pos_model,
-            EXTRACT(YEAR FROM a.pubdate) AS year,
-            COUNT(*) AS count,
+            c.year AS year,
             {fields_sql}
         FROM terms t
-        JOIN article_term_annotations ann ON t.id = ann.term_id
-        JOIN articles a ON a.id = ann.article_id
-        {joins_sql}
-        GROUP BY t.term_text, t.word_count, t.pos_model, year, {group_sql}
-        ORDER BY t.term_text, year;
+        JOIN counts c ON t.id = c.term_id
+        LEFT JOIN refs ON refs.term_id = t.id
+        ORDER BY t.term_text, c.year;
         """
 
         # Оставлено для отладки
         # print(text(sql), params, sep="\n")
 
-        rows = session.execute(text(sql), params).mappings().all()
-        ret = []
+        rows = session.execute(text(sql), params, execution_options={"yield_per": self.BATCH_SIZE}).mappings()
 
         # Делаем маппинг данных на структуру, подходящую для использования в Excel.
         for row in rows:
@@ -125,26 +179,97 @@ class ExcelOutput(Output):
                 # Восстанавливаем название словаря.
                 result[dict_name] = row[table_alias]
 
-            ret.append(result)
-
-        return ret
+            yield result
 
-    def _generate_excel(self, results: list[dict]) -> Path | None:
+    def _generate_excel(self, results: Iterable[dict]) -> Path | None:
         """
         Генерация Excel из результатов.
 
+        Файл пишется в режиме write-only. Если строк больше, чем помещается на лист Excel,
+        создаются дополнительные листы: statistics, statistics_2, ...
+
         Args:
             results: результаты для записи в файл
         """
-        if not results:
+        results = iter(results)
+        first = next(results, None)
+        if first is None:
             self.logger.warning("Нет данных для записи в Excel")
             return
 
-        # Превращаем результаты в DataFrame
-        df = pd.DataFrame(results)
+        columns = list(first.keys())
+
+        workbook = Workbook(write_only=True)
+        sheet = None
+        sheet_count = 0
+        sheet_rows = 0
+
+        for result in chain([first], results):
+            if sheet is None or sheet_rows == self.EXCEL_MAX_ROWS:
+                sheet_count += 1
+                sheet = workbook.create_sheet("statistics" if sheet_count == 1 else f"statistics_{sheet_count}")
+                sheet.append(columns)
+                sheet_rows = 1
+
+            sheet.append(list(result.values()))
+            sheet_rows += 1
+
+        if sheet_count > 1:
+            self.logger.info(f"Результаты разбиты на листы Excel: {sheet_count}")
 
         # Сохраняем
         self._create_experiment_dir()
         excel_file = self._generate_output_file_path("statistics.xlsx")
-        df.to_excel(excel_file, index=False)
+        workbook.save(excel_file)
         return excel_file
+
+    def _generate_parquet(self, results: Iterable[dict]) -> Path | None:
+        """
+        Генерация Parquet из результатов, пакетами по BATCH_SIZE строк.
+
+        Args:
+            results: результаты для записи в файл
+        """
+        results = iter(results)
+        first = next(results, None)
+        if first is None:
+            self.logger.warning("Нет данных для записи в Parquet")
+            return
+
+        schema = pa.schema([
+            (column, pa.int64() if column in self.NUMERIC_COLUMNS else pa.string())
+            for column in first.keys()
+        ])
+
+        self._create_experiment_dir()
+        parquet_file = self._generate_output_file_path("statistics.parquet")
+
+        results = chain([first], results)
+        with pq.ParquetWriter(parquet_file, schema, compression="zstd") as writer:
+            while batch := list(islice(results, self.BATCH_SIZE)):
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+        return parquet_file
+
+    def _generate_csv(self, results: Iterable[dict]) -> Path | None:
+        """
+        Генерация CSV, сжатого gzip, из результатов.
+
+        Args:
+            results: результаты для записи в файл
+        """
+        results = iter(results)
+        first = next(results, None)
+        if first is None:
+            self.logger.warning("Нет данных для записи в CSV")
+            return
+
+        self._create_experiment_dir()
+        csv_file = self._generate_output_file_path("statistics.csv.gz")
+
+        with gzip.open(csv_file, "wt", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(first.keys()))
+            writer.writeheader()
+            writer.writerows(chain([first], results))
+
+        return csv_file
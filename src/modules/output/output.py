@@ -1,12 +1,24 @@
+import hashlib
+import json
 import logging
 from pathlib import Path
 
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
 from src.modules.module import Module
+from src.orm.database import BaseModel
+from src.orm.models import TableGeneration
 
 
 class Output(Module):
-    def __init__(self):
+    def __init__(self, force: bool = False):
+        """
+        Args:
+            force: перегенерировать результаты, даже если входные данные не изменились
+        """
         self.logger = logging.getLogger(self.info().name())
+        self.force = force
 
     def _create_experiment_dir(self):
         """
@@ -30,3 +42,78 @@ class Output(Module):
     def _print_results(self, handler: type, output_files: list[Path]) -> None:
         output_files = ", ".join([str(file) for file in output_files])
         self.logger.info(f"[{handler.__name__}] результаты сохранены в файлы: {output_files}")
+
+    def _fingerprint(self, session: Session, sources: tuple[str, ...], params: dict) -> str:
+        """
+        Отпечаток входных данных: статистика таблиц-источников и параметры генерации.
+
+        Статистика таблицы - количество строк, максимальный id и номер изменения (см. TableGeneration).
+        Содержимое таблиц не читается: изменения на месте и очистку с перезапуском счетчиков id
+        отмечают модули, которые записывают в таблицы.
+
+        Args:
+            session: сессия SQLAlchemy
+            sources: таблицы-источники
+            params: параметры, влияющие на результат
+
+        Returns:
+            Хеш SHA-256
+        """
+        generations = dict(session.execute(
+            select(TableGeneration.table_name, TableGeneration.generation)
+            .where(TableGeneration.table_name.in_(sources))
+        ).all())
+
+        stats = {}
+        for name in sources:
+            table = BaseModel.metadata.tables[name]
+            columns = [func.count(), func.max(table.c.id)] if "id" in table.c else [func.count()]
+            row = session.execute(select(*columns).select_from(table)).one()
+            stats[name] = [*row, generations.get(name)]
+
+        payload = json.dumps({"sources": stats, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _is_up_to_date(self, name: str, fingerprint: str) -> bool:
+        """
+        Проверка, что результаты уже сгенерированы по тем же входным данным.
+
+        Args:
+            name: название набора результатов
+            fingerprint: отпечаток текущих входных данных
+
+        Returns:
+            True - отпечаток совпадает, и все файлы на месте
+        """
+        if self.force:
+            return False
+
+        fingerprint_file = self._fingerprint_path(name)
+        if not fingerprint_file.exists():
+            return False
+
+        saved = json.loads(fingerprint_file.read_text(encoding="utf-8"))
+        if saved["fingerprint"] != fingerprint:
+            return False
+
+        return all(self._generate_output_file_path(file).exists() for file in saved["files"])
+
+    def _save_fingerprint(self, name: str, fingerprint: str, output_files: list[Path]) -> None:
+        """
+        Сохранение отпечатка входных данных рядом с результатами.
+
+        Args:
+            name: название набора результатов
+            fingerprint: отпечаток входных данных
+            output_files: сгенерированные файлы
+        """
+        directory = Path(self.experiment.directory)
+        saved = {
+            "fingerprint": fingerprint,
+            "files": [str(Path(file).relative_to(directory)) for file in output_files],
+        }
+        self._fingerprint_path(name).write_text(json.dumps(saved, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def _fingerprint_path(self, name: str) -> Path:
+        """Путь к файлу с отпечатком входных данных"""
+        return self._generate_output_file_path(f".{name}.fingerprint.json")
@@ -0,0 +1,167 @@
+import json
+import shutil
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+from sqlalchemy import JSON, Boolean, Date, DateTime, Float, Integer, Select, String, Table, extract, select
+from sqlalchemy.types import TypeEngine
+from sqlalchemy.orm import Session
+
+from src.modules.module import ModuleInfo
+from src.modules.output.output import Output
+from src.orm.database import BaseModel
+
+
+class ParquetOutput(Output):
+    """
+    Модуль выгрузки таблиц эксперимента в Parquet для анализа без обращения к БД.
+
+    Каждая таблица сохраняется в каталог parquet/<таблица> в каталоге эксперимента, с разбиением
+    на партиции (hive: <колонка>=<значение>) и сжатием zstd. Таблицы читаются из БД пакетами,
+    поэтому расход памяти ограничен размером пакета.
+
+    Чтение результатов:
+        pyarrow.dataset.dataset("parquet/articles", partitioning="hive").to_table()
+    """
+
+    # Таблицы для выгрузки: название таблицы -> колонка для разбиения на партиции (None - без разбиения)
+    TABLES = {
+        "articles": "year",
+        "terms": None,
+        "article_term_annotations": "module_id",
+        "term_dictionary_ref": "dictionary_id",
+        "candidates": None,
+    }
+
+    # Соответствие типов SQLAlchemy (с подклассами: BigInteger, Text, ...) типам Arrow.
+    # JSON-колонки сохраняются строками JSON, колонки остальных типов - строками (str()).
+    ARROW_TYPES = {
+        Integer: pa.int64(),
+        Float: pa.float64(),
+        String: pa.string(),
+        Boolean: pa.bool_(),
+        DateTime: pa.timestamp("us"),
+        Date: pa.date32(),
+    }
+
+    def __init__(self, tables: list[str] = None, batch_size: int | str = 100000, force: bool = False):
+        """
+        Args:
+            tables: список таблиц для выгрузки, см. TABLES. По умолчанию - все таблицы.
+            batch_size: количество строк в пакете при чтении из БД
+            force: выгрузить таблицы, даже если данные не изменились
+        """
+        super().__init__(force)
+
+        if tables is None:
+            tables = list(self.TABLES)
+        for table in tables:
+            if table not in self.TABLES:
+                raise ValueError(f"Неизвестная таблица: {table}. Варианты: {", ".join(self.TABLES)}")
+
+        self.export_tables = tables
+        self.batch_size = int(batch_size)
+
+    @staticmethod
+    def info() -> ModuleInfo:
+        return ModuleInfo(module="output", type="parquet")
+
+    def handle(self) -> None:
+        """Запуск выгрузки"""
+        from src.container import container
+
+        self._create_experiment_dir()
+
+        with container.db_session() as session:
+            fingerprint = self._fingerprint(session, tuple(self.export_tables), {"tables": self.export_tables})
+            if self._is_up_to_date("parquet", fingerprint):
+                self.logger.info("Данные не изменились, таблицы не выгружаются")
+                return
+
+            output_dirs = [self._export_table(session, table) for table in self.export_tables]
+
+        self._save_fingerprint("parquet", fingerprint, output_dirs)
+        self._print_results(ParquetOutput, output_dirs)
+
+    def _export_table(self, session: Session, table_name: str) -> Path:
+        """
+        Выгрузка таблицы в Parquet.
+
+        Args:
+            session: сессия SQLAlchemy
+            table_name: название таблицы
+
+        Returns:
+            Каталог с файлами таблицы
+        """
+        table: Table = BaseModel.metadata.tables[table_name]
+        partition_column = self.TABLES[table_name]
+
+        query = self._build_query(table)
+        schema = self._arrow_schema(query)
+        json_columns = {column.name for column in query.selected_columns if isinstance(column.type, JSON)}
+        str_columns = {
+            column.name for column in query.selected_columns
+            if column.name not in json_columns and self._arrow_type(column.type) is None
+        }
+
+        # Результаты предыдущей выгрузки удаляются, чтобы не смешивать файлы разных запусков
+        output_dir = self._generate_output_file_path("parquet") / table_name
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+        file_options = ds.ParquetFileFormat().make_write_options(compression="zstd")
+
+        result = session.execute(query, execution_options={"yield_per": self.batch_size})
+
+        row_count = 0
+        for batch_idx, rows in enumerate(result.partitions()):
+            data = {name: list(values) for name, values in zip(schema.names, zip(*rows))}
+            for name in json_columns:
+                data[name] = [None if value is None else json.dumps(value) for value in data[name]]
+            for name in str_columns:
+                data[name] = [None if value is None else str(value) for value in data[name]]
+
+            ds.write_dataset(
+                pa.Table.from_pydict(data, schema=schema),
+                output_dir,
+                format="parquet",
+                file_options=file_options,
+                partitioning=[partition_column] if partition_column else None,
+                partitioning_flavor="hive",
+                basename_template=f"part-{batch_idx:05d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+            row_count += len(rows)
+
+        self.logger.info(f"Таблица {table_name} выгружена, строк: {row_count}")
+
+        return output_dir
+
+    def _build_query(self, table: Table) -> Select:
+        """
+        Запрос для выгрузки таблицы.
+
+        Для статей добавляется год публикации - колонка для разбиения на партиции.
+        """
+        query = select(table).order_by(table.c.id)
+
+        if table.name == "articles":
+            query = query.add_columns(extract("year", table.c.pubdate).cast(Integer).label("year"))
+
+        return query
+
+    def _arrow_schema(self, query: Select) -> pa.Schema:
+        """Схема Arrow по колонкам запроса"""
+        return pa.schema([
+            (column.name, self._arrow_type(column.type) or pa.string())
+            for column in query.selected_columns
+        ])
+
+    @classmethod
+    def _arrow_type(cls, column_type: TypeEngine) -> pa.DataType | None:
+        """Тип Arrow для типа колонки, None - нет соответствия (в том числе для JSON)"""
+        for sql_type, arrow_type in cls.ARROW_TYPES.items():
+            if isinstance(column_type, sql_type):
+                return arrow_type
+        return None
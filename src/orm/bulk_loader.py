@@ -0,0 +1,161 @@
+import hashlib
+import itertools
+import logging
+import time
+from typing import Iterable, Sequence
+
+from psycopg.types.json import Json
+from sqlalchemy import JSON, Column, MetaData, Table, delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from src.orm.database import BaseModel
+
+
+class BulkLoader:
+    """
+    Пакетная загрузка строк в таблицу через COPY.
+
+    Строки передаются в PostgreSQL потоком (COPY ... FROM STDIN) во временную таблицу, а затем переносятся
+    в целевую таблицу одним запросом INSERT ... SELECT с заданной обработкой конфликтов. В отличие от
+    INSERT на каждую строку нет обмена запросами с сервером, разбора SQL и проверки ограничений по строке.
+
+    Временная таблица создается один раз на соединение (ON COMMIT DELETE ROWS) и общая для загрузчиков
+    с одинаковыми колонками. Перенос строк очищает ее (DELETE ... RETURNING в том же запросе), поэтому
+    повторные вызовы load() не создают и не удаляют таблиц. Пустая загрузка не выполняет запросов.
+
+    Загрузка выполняется в транзакции сессии, commit - на стороне модуля.
+
+    Example:
+        loader = BulkLoader(session, TermDictionaryRef, ["term_id", "dictionary_id", "ref_id"],
+                            on_conflict="nothing", conflict_columns=["term_id", "dictionary_id"])
+        loader.load(rows)
+        session.commit()
+        loader.log_stats(logger)
+    """
+
+    # Обработка конфликтов уникальности при переносе строк в целевую таблицу:
+    # error - ошибка (обычный INSERT);
+    # nothing - строки с конфликтом пропускаются (ON CONFLICT DO NOTHING);
+    # update - строки с конфликтом обновляются (ON CONFLICT DO UPDATE), ключ не должен повторяться в загрузке.
+    ON_CONFLICT = ("error", "nothing", "update")
+
+    def __init__(self, session: Session, model: type[BaseModel] | Table, columns: Sequence[str],
+                 on_conflict: str = "error", conflict_columns: Sequence[str] = None,
+                 update_columns: Sequence[str] = None):
+        """
+        Args:
+            session: сессия SQLAlchemy
+            model: модель ORM или таблица
+            columns: колонки в порядке значений строки
+            on_conflict: обработка конфликтов, см. ON_CONFLICT
+            conflict_columns: колонки уникального индекса для ON CONFLICT, по умолчанию - любой конфликт
+                (обязательны для update)
+            update_columns: колонки для обновления при конфликте, по умолчанию - все колонки, кроме conflict_columns
+        """
+        if on_conflict not in self.ON_CONFLICT:
+            raise ValueError(f"Неизвестная обработка конфликтов: {on_conflict}. "
+                             f"Варианты: {", ".join(self.ON_CONFLICT)}")
+        if on_conflict == "update" and not conflict_columns:
+            raise ValueError("Для обновления при конфликте нужно указать conflict_columns")
+
+        self.session = session
+        self.table: Table = model if isinstance(model, Table) else model.__table__
+        self.columns = list(columns)
+        self.on_conflict = on_conflict
+        self.conflict_columns = list(conflict_columns) if conflict_columns else None
+        self.update_columns = list(update_columns or [c for c in self.columns if c not in (conflict_columns or [])])
+
+        unknown = [c for c in [*self.columns, *(self.conflict_columns or [])] if c not in self.table.c]
+        if unknown:
+            raise ValueError(f"В таблице {self.table.name} нет колонок: {", ".join(unknown)}")
+
+        # Значения колонок JSON передаются в COPY как текст JSON
+        self.json_positions = [i for i, c in enumerate(self.columns) if isinstance(self.table.c[c].type, JSON)]
+
+        # Имя временной таблицы зависит от набора колонок: загрузчики одной таблицы с разными колонками
+        # могут работать в одной транзакции
+        columns_hash = hashlib.md5(",".join(self.columns).encode()).hexdigest()[:8]
+        self.stage = Table(f"_bulk_{self.table.name}_{columns_hash}", MetaData(),
+                           *[Column(c, self.table.c[c].type) for c in self.columns],
+                           prefixes=["TEMPORARY"], postgresql_on_commit="DELETE ROWS")
+
+        # Статистика всех вызовов load()
+        self.rows_copied = 0
+        self.rows_inserted = 0
+        self.seconds = 0.0
+
+    def load(self, rows: Iterable[Sequence]) -> int:
+        """
+        Загрузка строк.
+
+        Args:
+            rows: строки - значения колонок в порядке columns, можно передать генератор
+
+        Returns:
+            Количество добавленных (и обновленных для on_conflict=update) строк
+        """
+        started = time.perf_counter()
+
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        rows = itertools.chain([first], rows)
+
+        connection = self.session.connection()
+        # Таблица, созданная в откаченной транзакции, удаляется, поэтому создание проверяется при каждой загрузке
+        connection.execute(CreateTable(self.stage, if_not_exists=True))
+
+        preparer = connection.dialect.identifier_preparer
+        copy_sql = (f"COPY {preparer.format_table(self.stage)} "
+                    f"({", ".join(preparer.quote(c) for c in self.columns)}) FROM STDIN")
+
+        copied = 0
+        with connection.connection.driver_connection.cursor() as cursor:
+            with cursor.copy(copy_sql) as copy:
+                for row in rows:
+                    if self.json_positions:
+                        row = list(row)
+                        for i in self.json_positions:
+                            if row[i] is not None:
+                                row[i] = Json(row[i])
+                    copy.write_row(row)
+                    copied += 1
+
+        # Для INSERT количество строк сохраняется только по опции preserve_rowcount
+        inserted = connection.execute(self._merge_statement().execution_options(preserve_rowcount=True)).rowcount
+
+        self.rows_copied += copied
+        self.rows_inserted += inserted
+        self.seconds += time.perf_counter() - started
+
+        return inserted
+
+    def _merge_statement(self):
+        """INSERT ... SELECT из временной таблицы в целевую с очисткой временной таблицы"""
+        moved = delete(self.stage).returning(*self.stage.c).cte("moved")
+        stmt = insert(self.table).from_select(self.columns, select(*moved.c)).add_cte(moved)
+
+        if self.on_conflict == "nothing":
+            return stmt.on_conflict_do_nothing(index_elements=self.conflict_columns)
+        if self.on_conflict == "update":
+            return stmt.on_conflict_do_update(
+                index_elements=self.conflict_columns,
+                set_={c: stmt.excluded[c] for c in self.update_columns},
+            )
+        return stmt
+
+    @property
+    def rows_per_sec(self) -> float | None:
+        """Скорость загрузки, строк в секунду"""
+        if not self.rows_copied or not self.seconds:
+            return None
+        return round(self.rows_copied / self.seconds, 2)
+
+    def log_stats(self, logger: logging.Logger) -> None:
+        """Запись статистики загрузки в лог модуля"""
+        logger.info(f"Загрузка в {self.table.name}: передано строк {self.rows_copied}, "
+                    f"добавлено {self.rows_inserted}, {self.seconds:.2f} сек, "
+                    f"{self.rows_per_sec or 0:.0f} строк/сек")
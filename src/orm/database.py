@@ -1,5 +1,5 @@
-from sqlalchemy import create_engine, Engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy import create_engine, Engine, text
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
 
 from src.config.database import DatabaseConfig
 
@@ -37,3 +37,13 @@ def create_session_factory_from_engine(engine: Engine) -> sessionmaker:
         autocommit=False,
         autoflush=False,
     )
+
+
+def analyze_tables(session: Session, tables: list[str]) -> None:
+    """
+    Обновляет статистику планировщика PostgreSQL после массовой загрузки данных.
+
+    До запуска autovacuum планировщик оценивает количество строк по устаревшей статистике
+    и может выбрать неэффективный план для запросов к только что загруженным таблицам.
+    """
+    session.execute(text(f"ANALYZE {", ".join(tables)}"))
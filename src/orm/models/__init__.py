@@ -8,3 +8,8 @@ from .module import Module
 from .term import Term
 from .term_dictionary_ref import TermDictionaryRef
 from .candidate import Candidate
+from .term_year_count import TermYearCount
+from .stage_run import StageRun
+from .ner_memo import NerMemo
+from .ner_processed_article import NerProcessedArticle
+from .table_generation import TableGeneration
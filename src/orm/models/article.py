@@ -2,7 +2,7 @@ import datetime
 from datetime import date, timedelta
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Text, Index, JSON
+from sqlalchemy import Computed, String, Text, Index, JSON, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.orm import validates
 
@@ -36,12 +36,21 @@ class Article(BaseModel):
         comment="Тип публикации (поле PT)"
     )
 
+    # Хеши текста полей вычисляются PostgreSQL при любой записи (ORM, insert(), COPY).
+    # Одинаковый текст в разных статьях (PubMed и PMC, перепечатки) имеет одинаковый хеш, см. NerMemo.
+    title_hash: Mapped[str] = mapped_column(String(32), Computed("md5(title)"), comment="Хеш названия (MD5)")
+    abstract_hash: Mapped[str] = mapped_column(String(32), Computed("md5(abstract)"), comment="Хеш аннотации (MD5)")
+
     # Связи с другими таблицами БД
     annotations: Mapped[list["ArticleTermAnnotation"]] = relationship("ArticleTermAnnotation", back_populates="article",
                                                                       cascade="all, delete-orphan")
 
     __table_args__ = (
         Index("idx_pubdate", "pubdate"),
+        # Год публикации: по нему группируются все отчеты
+        Index("idx_pub_year", text("(EXTRACT(YEAR FROM pubdate))")),
+        # Покрывающий индекс для соединения с разметкой: id -> дата публикации без чтения строк статей
+        Index("idx_id_pubdate", "id", postgresql_include=["pubdate"]),
         {"comment": "Научные статьи"}
     )
 
@@ -77,6 +86,10 @@ class Article(BaseModel):
     def get_text(self, field: str) -> str:
         return getattr(self, field)
 
+    def get_hash(self, field: str) -> str | None:
+        """Хеш текста поля, None - статья еще не сохранена в БД"""
+        return getattr(self, f"{field}_hash")
+
     def __str__(self):
 
         identifier = (
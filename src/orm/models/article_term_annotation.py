@@ -32,9 +32,12 @@ class ArticleTermAnnotation(BaseModel):
     module: Mapped["Module"] = relationship("Module", back_populates="annotations")
 
     __table_args__ = (
-        Index("idx_term_id", "term_id"),
+        # Составные индексы покрывают запросы агрегации по годам (см. TermYearCount.refresh()):
+        # нужные колонки читаются из индекса, без обращения к строкам таблицы.
+        # Индексы по term_id и module_id отдельно не нужны - это префиксы составных индексов.
+        Index("idx_term_article", "term_id", "article_id"),
+        Index("idx_module_term_article", "module_id", "term_id", "article_id"),
         Index("idx_article_id", "article_id"),
-        Index("idx_module_id", "module_id"),
         {"comment": "Разметка статей по терминам"}
     )
 
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Text, CheckConstraint, func, select, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship, Session, validates
 
 from src.orm.database import BaseModel
 
@@ -13,8 +13,15 @@ if TYPE_CHECKING:
 class Dictionary(BaseModel):
     __tablename__ = "dictionaries"
 
+    # Ключ рекомендательной блокировки PostgreSQL для refresh_term_masks()
+    MASKS_LOCK_ID = 7_310_001
+
+    # terms.dictionary_mask - знаковый BIGINT, доступно 63 бита
+    MAX_DICTIONARIES = 63
+
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(Text, nullable=False, comment="Название словаря", unique=True)
+    bit: Mapped[int] = mapped_column(nullable=True, comment="Номер бита словаря в terms.dictionary_mask")
 
     # Связи с другими таблицами БД
     # Связь с ассоциативной таблицей
@@ -32,9 +39,77 @@ class Dictionary(BaseModel):
     )
 
     __table_args__ = (
+        CheckConstraint(f"bit >= 0 AND bit < {MAX_DICTIONARIES}", name="ck_dictionaries_bit"),
         {"comment": "Словари терминов"}
     )
 
+    @staticmethod
+    def refresh_term_masks(session: Session) -> None:
+        """
+        Пересчет битовых масок принадлежности терминов словарям (terms.dictionary_mask).
+
+        Словарям назначаются биты по порядку id, маска термина - объединение битов словарей,
+        в которых найден термин. Обновляются только изменившиеся строки.
+
+        Args:
+            session: сессия SQLAlchemy
+        """
+        # Модули словарей могут работать параллельно (parallel: true). Блокировка до конца транзакции:
+        # следующий пересчет начнется после commit и увидит ссылки на словари, записанные предыдущим.
+        session.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": Dictionary.MASKS_LOCK_ID})
+
+        count = session.scalar(select(func.count()).select_from(Dictionary))
+        if count > Dictionary.MAX_DICTIONARIES:
+            raise ValueError(f"Словарей в БД: {count}, битовая маска terms.dictionary_mask вмещает не больше "
+                             f"{Dictionary.MAX_DICTIONARIES} словарей")
+
+        session.execute(text("""
+            UPDATE dictionaries d
+            SET bit = n.bit
+            FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS bit FROM dictionaries) n
+            WHERE d.id = n.id
+                AND d.bit IS DISTINCT FROM n.bit
+        """))
+
+        session.execute(text("""
+            UPDATE terms t
+            SET dictionary_mask = COALESCE(m.mask, 0)
+            FROM terms t2
+                LEFT JOIN (
+                    SELECT ref.term_id, BIT_OR(1::bigint << d.bit) AS mask
+                    FROM term_dictionary_ref ref
+                        JOIN dictionaries d ON d.id = ref.dictionary_id
+                    GROUP BY ref.term_id
+                ) m ON m.term_id = t2.id
+            WHERE t.id = t2.id
+                AND t.dictionary_mask <> COALESCE(m.mask, 0)
+        """))
+
+    @validates("bit")
+    def validate_bit(self, key, value) -> int | None:
+        if value is not None and not 0 <= value < self.MAX_DICTIONARIES:
+            raise ValueError(f"Номер бита словаря должен быть от 0 до {self.MAX_DICTIONARIES - 1}: "
+                             f"битовая маска terms.dictionary_mask вмещает не больше {self.MAX_DICTIONARIES} словарей")
+        return value
+
+    @staticmethod
+    def bit_mask(dictionaries: list) -> int:
+        """
+        Битовая маска набора словарей для сравнения с terms.dictionary_mask.
+
+        Args:
+            dictionaries: список словарей
+        Returns:
+            Маска
+        """
+        mask = 0
+        for dictionary in dictionaries:
+            if dictionary.bit is None:
+                raise RuntimeError(
+                    f"Словарю {dictionary.name} не назначен бит, требуется Dictionary.refresh_term_masks()")
+            mask |= 1 << dictionary.bit
+        return mask
+
     @staticmethod
     def filter_not_in_dict(dictionaries: list) -> tuple:
         """
@@ -43,34 +118,13 @@ class Dictionary(BaseModel):
         Args:
             dictionaries: список словарей
         Returns:
-            Части SQL-выражения и параметры.
+            Часть SQL-выражения (условие по таблице terms с алиасом t) и параметры.
         """
-        join_tables = []
-        where_cond = []
-        params = {}
-
-        # Проходим по списку словарей и подготавливаем части SQL для постановки в финальный запрос.
-        for idx, dictionary in enumerate(dictionaries):
-            # Для множественного объединения таблиц используем алиасы.
-            table_alias = f"ref_{idx}"
-
-            # Параметр для dictionary_id
-            param_name = f"dict_id_{idx}"
-            params[param_name] = dictionary.id
-
-            join_tables.append(
-                f"""
-                LEFT JOIN term_dictionary_ref {table_alias}
-                       ON {table_alias}.term_id = t.id
-                      AND {table_alias}.dictionary_id = :{param_name}"""
-            )
-            where_cond.append(f"""
-                AND {table_alias}.id IS NULL""")
-
-        joins_sql = "\n".join(join_tables)
-        where_sql = "\n".join(where_cond)
-
-        return params, joins_sql, where_sql
+        params = {"dict_mask": Dictionary.bit_mask(dictionaries)}
+        where_sql = """
+                AND t.dictionary_mask & :dict_mask = 0"""
+
+        return params, where_sql
 
     def __str__(self):
         id = self.id
@@ -0,0 +1,42 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, JSON, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.orm.database import BaseModel
+
+# Обход проблемы циклического импорта:
+if TYPE_CHECKING:
+    from src.orm.models import Module
+
+
+class NerMemo(BaseModel):
+    """
+    Результаты извлечения терминов модулем NER по хешу текста (см. Article.title_hash, Article.abstract_hash).
+
+    Модуль NER не обрабатывает повторно текст, который уже обработан той же версией модуля: дубликаты статей
+    в одном эксперименте и тексты из предыдущих экспериментов. Версия модуля - хеш названия, Ner.VERSION
+    и параметров, влияющих на результат (см. Ner._memo_version()).
+    """
+    __tablename__ = "ner_memos"
+
+    content_hash: Mapped[str] = mapped_column(String(32), primary_key=True, comment="Хеш текста (MD5)")
+    module_id: Mapped[int] = mapped_column(ForeignKey("modules.id", ondelete="CASCADE"), primary_key=True,
+                                           comment="Модуль NER")
+    version: Mapped[str] = mapped_column(String(64), primary_key=True,
+                                         comment="Хеш версии и параметров модуля")
+    terms: Mapped[list[dict]] = mapped_column(JSON, nullable=False, comment="Извлеченные термины (TermDto)")
+
+    # Связи с другими таблицами БД
+    module: Mapped["Module"] = relationship("Module")
+
+    __table_args__ = (
+        {"comment": "Результаты NER по хешу текста"}
+    )
+
+    def __str__(self):
+        content_hash = self.content_hash
+        module_id = self.module_id
+        version = self.version
+
+        return f"{content_hash=}\n{module_id=}\n{version=}"
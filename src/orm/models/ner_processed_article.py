@@ -0,0 +1,43 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.orm.database import BaseModel
+
+# Обход проблемы циклического импорта:
+if TYPE_CHECKING:
+    from src.orm.models import Article, Module
+
+
+class NerProcessedArticle(BaseModel):
+    """
+    Статья, обработанная модулем NER.
+
+    Хеш рассчитывается по версии модуля и хешам текста обработанных полей статьи (см. Ner._content_hash()).
+    В режиме incremental модуль NER обрабатывает только статьи без записи или с другим хешем:
+    новые статьи, статьи с измененным текстом, статьи после изменения параметров модуля.
+    """
+    __tablename__ = "ner_processed_articles"
+
+    article_id: Mapped[int] = mapped_column(ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True,
+                                            comment="Статья")
+    module_id: Mapped[int] = mapped_column(ForeignKey("modules.id", ondelete="CASCADE"), primary_key=True,
+                                           comment="Модуль NER")
+    content_hash: Mapped[str] = mapped_column(String(32), nullable=False,
+                                              comment="Хеш версии модуля и текста обработанных полей (MD5)")
+
+    # Связи с другими таблицами БД
+    article: Mapped["Article"] = relationship("Article")
+    module: Mapped["Module"] = relationship("Module")
+
+    __table_args__ = (
+        {"comment": "Статьи, обработанные модулями NER"}
+    )
+
+    def __str__(self):
+        article_id = self.article_id
+        module_id = self.module_id
+        content_hash = self.content_hash
+
+        return f"{article_id=}\n{module_id=}\n{content_hash=}"
@@ -0,0 +1,38 @@
+import datetime
+
+from sqlalchemy import JSON, Text, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.orm.database import BaseModel
+
+
+class StageRun(BaseModel):
+    """
+    Успешно выполненный этап workflow.
+
+    Хеш этапа рассчитывается по эксперименту, модулям, их параметрам и хешу предыдущего этапа (см. workflow.py).
+    Если хеш не изменился, повторный запуск этапа пропускается. Запись удаляется при очистке таблиц,
+    в которые записывают результаты модули этапа (см. CleanerDatabase).
+    """
+    __tablename__ = "stage_runs"
+
+    position: Mapped[int] = mapped_column(primary_key=True, autoincrement=False,
+                                          comment="Номер этапа в workflow (с 1)")
+    name: Mapped[str] = mapped_column(Text, nullable=False, comment="Название этапа")
+    hash: Mapped[str] = mapped_column(String(64), nullable=False, comment="Хеш модулей и параметров этапа")
+    tables: Mapped[list[str]] = mapped_column(JSON, nullable=False, server_default="[]",
+                                              comment="Таблицы с результатами модулей этапа")
+    finished_at: Mapped[datetime.datetime] = mapped_column(nullable=False, server_default=func.now(),
+                                                           comment="Время завершения этапа")
+
+    __table_args__ = (
+        {"comment": "Выполненные этапы workflow"}
+    )
+
+    def __str__(self):
+        position = self.position
+        name = self.name
+        hash = self.hash
+        finished_at = self.finished_at
+
+        return f"{position=}\n{name=}\n{hash=}\n{finished_at=}"
@@ -0,0 +1,55 @@
+import datetime
+from typing import Iterable
+
+from sqlalchemy import Text, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Session
+
+from src.orm.database import BaseModel
+
+
+class TableGeneration(BaseModel):
+    """
+    Номер изменения таблицы.
+
+    Увеличивается модулями, которые записывают в таблицу, и модулем очистки БД (см. Module._mark_tables_changed()).
+    Используется в отпечатке входных данных модулей вывода (см. Output._fingerprint()) вместе с количеством
+    строк и максимальным id: так отпечаток учитывает изменения на месте и очистку с перезапуском счетчиков id
+    без чтения содержимого таблицы.
+    """
+    __tablename__ = "table_generations"
+
+    table_name: Mapped[str] = mapped_column(Text, primary_key=True, comment="Таблица")
+    generation: Mapped[int] = mapped_column(nullable=False, server_default="1", comment="Номер изменения")
+    updated_at: Mapped[datetime.datetime] = mapped_column(nullable=False, server_default=func.now(),
+                                                          comment="Время изменения")
+
+    __table_args__ = (
+        {"comment": "Номера изменений таблиц"}
+    )
+
+    @staticmethod
+    def bump(session: Session, tables: Iterable[str]) -> None:
+        """
+        Увеличение номеров изменения таблиц.
+
+        Args:
+            session: сессия SQLAlchemy
+            tables: таблицы
+        """
+        tables = sorted(set(tables))
+        if not tables:
+            return
+
+        stmt = insert(TableGeneration).values([{"table_name": table} for table in tables])
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[TableGeneration.table_name],
+            set_={"generation": TableGeneration.generation + 1, "updated_at": func.now()},
+        ))
+
+    def __str__(self):
+        table_name = self.table_name
+        generation = self.generation
+
+        return f"{table_name=}\n{generation=}"
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Text, Index
+from sqlalchemy import Text, Index, BigInteger
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.orm import validates
 
@@ -19,6 +19,8 @@ class Term(BaseModel):
     word_count: Mapped[int] = mapped_column(nullable=False, comment="Количество слов в термине")
     pos_model: Mapped[str] = mapped_column(nullable=False, comment="Структурная модель термина (POS-теги)")
     label: Mapped[str] = mapped_column(nullable=True, comment="Метка (Disease, Drug, Anatomy, ...)")
+    dictionary_mask: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0",
+                                                 comment="Битовая маска словарей, в которых найден термин")
 
     # Связи с другими таблицами БД
     annotations: Mapped[list["ArticleTermAnnotation"]] = relationship("ArticleTermAnnotation", back_populates="term",
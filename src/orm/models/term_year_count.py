@@ -0,0 +1,75 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, Index, delete, extract, func, insert, select
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Session
+
+from src.orm.database import BaseModel
+
+# Обход проблемы циклического импорта:
+if TYPE_CHECKING:
+    from src.orm.models import Term, Module
+
+
+class TermYearCount(BaseModel):
+    """
+    Частота терминов по годам публикации - агрегат по таблице article_term_annotations.
+
+    Заполняется модулями NER после извлечения терминов (см. refresh()), используется модулями поиска
+    терминов-кандидатов и вывода результатов вместо повторной агрегации разметки.
+    """
+    __tablename__ = "term_year_counts"
+
+    term_id: Mapped[int] = mapped_column(ForeignKey("terms.id", ondelete="CASCADE"), primary_key=True,
+                                         comment="Термин")
+    module_id: Mapped[int] = mapped_column(ForeignKey("modules.id", ondelete="CASCADE"), primary_key=True,
+                                           comment="Модуль, который извлек термин")
+    year: Mapped[int] = mapped_column(primary_key=True, comment="Год публикации")
+    count: Mapped[int] = mapped_column(nullable=False, comment="Количество упоминаний")
+
+    # Связи с другими таблицами БД
+    term: Mapped["Term"] = relationship("Term")
+    module: Mapped["Module"] = relationship("Module")
+
+    __table_args__ = (
+        Index("idx_term_year_counts_year", "year"),
+        {"comment": "Частота терминов по годам"}
+    )
+
+    @staticmethod
+    def refresh(session: Session, module_id: int | None = None) -> None:
+        """
+        Пересчет частоты терминов по годам из разметки статей.
+
+        Args:
+            session: сессия SQLAlchemy
+            module_id: пересчитать только данные модуля, None - пересчитать все
+        """
+        # Импорт здесь из-за циклической зависимости моделей
+        from src.orm.models import Article, ArticleTermAnnotation
+
+        year = extract("year", Article.pubdate).cast(TermYearCount.year.type).label("year")
+
+        query = (
+            select(ArticleTermAnnotation.term_id, ArticleTermAnnotation.module_id, year, func.count())
+            .join(Article, Article.id == ArticleTermAnnotation.article_id)
+            .group_by(ArticleTermAnnotation.term_id, ArticleTermAnnotation.module_id, year)
+        )
+        delete_stmt = delete(TermYearCount)
+
+        if module_id is not None:
+            query = query.where(ArticleTermAnnotation.module_id == module_id)
+            delete_stmt = delete_stmt.where(TermYearCount.module_id == module_id)
+
+        session.execute(delete_stmt)
+        session.execute(
+            insert(TermYearCount).from_select(["term_id", "module_id", "year", "count"], query)
+        )
+
+    def __str__(self):
+        term_id = self.term_id
+        module_id = self.module_id
+        year = self.year
+        count = self.count
+
+        return f"{term_id=}\n{module_id=}\n{year=}\n{count=}"
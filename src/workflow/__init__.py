@@ -19,6 +19,8 @@ class Module(BaseModel, extra="allow"):
 
 class Stage(BaseModel):
     name: str = Field(..., description="Название этапа")
+    cache: bool = Field(True, description="Пропускать этап, если модули и их параметры не изменились")
+    parallel: bool = Field(False, description="Запускать модули этапа параллельно, в отдельных процессах")
     modules: List[Module]
 
 
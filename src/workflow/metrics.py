@@ -0,0 +1,150 @@
+"""Метрики запуска workflow: время, память и запросы к БД по этапам и модулям"""
+import cProfile
+import csv
+import json
+import os
+import resource
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Generator, List, Optional
+
+from pydantic import BaseModel, Field, computed_field
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class ModuleMetrics(BaseModel):
+    stage: str = Field(..., description="Название этапа")
+    module: str = Field(..., description="Название модуля")
+    wall_time: float = Field(0.0, description="Время выполнения, сек")
+    cpu_time: float = Field(0.0, description="Процессорное время, включая дочерние процессы, сек")
+    peak_rss_mb: float = Field(0.0, description="Пиковое потребление памяти процессом, МБ")
+    db_queries: int = Field(0, description="Количество запросов к БД")
+    db_time: float = Field(0.0, description="Время выполнения запросов к БД, сек")
+    items: int = Field(0, description="Количество обработанных объектов (статей, терминов)")
+
+    @computed_field(description="Обработано объектов в секунду")
+    @property
+    def items_per_sec(self) -> Optional[float]:
+        if not self.items or not self.wall_time:
+            return None
+        return round(self.items / self.wall_time, 2)
+
+
+class StageMetrics(BaseModel):
+    name: str = Field(..., description="Название этапа")
+    skipped: bool = Field(False, description="Этап пропущен")
+    wall_time: float = Field(0.0, description="Время выполнения, сек")
+    modules: List[ModuleMetrics] = Field(default_factory=list)
+
+
+class RunReport(BaseModel):
+    experiment: str = Field(..., description="Название эксперимента")
+    started_at: str = Field(..., description="Время запуска")
+    wall_time: float = Field(0.0, description="Время выполнения, сек")
+    stages: List[StageMetrics] = Field(default_factory=list)
+
+    def save(self, directory: Path) -> list[Path]:
+        """
+        Сохранение отчета: полный отчет в JSON, метрики модулей - в CSV.
+
+        Args:
+            directory: каталог эксперимента
+
+        Returns:
+            Список файлов
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+
+        json_file = directory / "run-report.json"
+        json_file.write_text(json.dumps(self.model_dump(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+        csv_file = directory / "run-report.csv"
+        with open(csv_file, "w", newline="", encoding="utf-8") as f:
+            fieldnames = list(ModuleMetrics.model_fields) + list(ModuleMetrics.model_computed_fields)
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for stage in self.stages:
+                writer.writerows(module.model_dump() for module in stage.modules)
+
+        return [json_file, csv_file]
+
+
+# Счетчики запросов к БД в текущем процессе.
+# Обработчики событий подключаются ко всем Engine, поэтому учитываются запросы любых сессий модуля.
+_db_stats = {"queries": 0, "time": 0.0}
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _db_stats["queries"] += 1
+    _db_stats["time"] += time.perf_counter() - conn.info["query_start_time"].pop()
+
+
+def _cpu_time() -> float:
+    """Процессорное время процесса и завершенных дочерних процессов"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _reset_peak_rss() -> None:
+    """Сброс пикового потребления памяти (Linux), чтобы измерить пик отдельного модуля"""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    """
+    Пиковое потребление памяти процессом, МБ.
+    На Linux - VmHWM (сбрасывается _reset_peak_rss()), иначе - пик за все время работы процесса.
+    """
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    # ru_maxrss: на Linux - в КБ, на macOS - в байтах
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024)
+
+
+@contextmanager
+def measure(metrics: ModuleMetrics, profile_file: Path | None = None) -> Generator[ModuleMetrics, None, None]:
+    """
+    Измерение метрик модуля. Значения записываются в metrics после выхода из контекста, в том числе при ошибке.
+
+    Args:
+        metrics: метрики модуля
+        profile_file: файл для сохранения профиля cProfile, None - без профилирования
+    """
+    _reset_peak_rss()
+    db_queries, db_time = _db_stats["queries"], _db_stats["time"]
+    wall_start, cpu_start = time.perf_counter(), _cpu_time()
+
+    profiler = cProfile.Profile() if profile_file else None
+    if profiler:
+        profiler.enable()
+
+    try:
+        yield metrics
+    finally:
+        if profiler:
+            profiler.disable()
+            profile_file.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(profile_file)
+
+        metrics.wall_time = round(time.perf_counter() - wall_start, 3)
+        metrics.cpu_time = round(_cpu_time() - cpu_start, 3)
+        metrics.peak_rss_mb = round(_peak_rss_mb(), 1)
+        metrics.db_queries = _db_stats["queries"] - db_queries
+        metrics.db_time = round(_db_stats["time"] - db_time, 3)
@@ -0,0 +1,267 @@
+"""
+Сервер workflow: очередь экспериментов в одном долгоживущем процессе.
+
+Эксперименты из очереди выполняются по одному, друг за другом. Модели NER (container.model_cache()),
+словари UMLS и соединения с БД загружаются при первом использовании и остаются в памяти для следующих
+экспериментов, поэтому повторные запуски не тратят время на старт Python и загрузку моделей.
+
+Запуск (из корня проекта - относительные пути в yaml-файлах считаются от каталога сервера):
+
+    python workflow.py serve                      # запуск сервера
+    python workflow.py submit workflows/a.yaml    # добавить эксперимент в очередь
+    python workflow.py status [<id задания>]      # состояние очереди или задания
+
+API (JSON, только localhost):
+
+    POST /jobs        - добавить задание: {"workflow": {...}, "file": "...", "from_stage": ..., "only": [...]}
+    GET  /jobs        - список заданий
+    GET  /jobs/<id>   - состояние задания, включая текущий этап и модуль
+"""
+import argparse
+import datetime
+import itertools
+import json
+import logging
+import queue
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+import yaml
+from pydantic import BaseModel, Field, ValidationError
+
+from src.workflow import Config
+
+# Команды сервера и клиента в workflow.py
+COMMANDS = ("serve", "submit", "status")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+logger = logging.getLogger("workflow-server")
+
+
+class Job(BaseModel):
+    id: int = Field(..., description="Номер задания")
+    file: Optional[str] = Field(None, description="Путь к yaml-файлу у клиента, для отображения")
+    workflow: dict = Field(..., description="Конфигурация workflow (содержимое yaml-файла)")
+    from_stage: Optional[str] = Field(None, description="Запустить этап и все следующие без проверки кеша")
+    only: List[str] = Field(default_factory=list, description="Запустить только эти этапы без проверки кеша")
+    profile: bool = Field(False, description="Сохранять профиль cProfile каждого модуля")
+    status: str = Field("queued", description="Состояние: queued, running, done, failed")
+    submitted_at: str = Field(..., description="Время добавления в очередь")
+    started_at: Optional[str] = Field(None, description="Время запуска")
+    finished_at: Optional[str] = Field(None, description="Время завершения")
+    error: Optional[str] = Field(None, description="Ошибка выполнения")
+    progress: dict = Field(default_factory=dict, description="Текущий этап и модуль")
+
+    def config(self) -> Config:
+        """Конфигурация workflow"""
+        return Config(**self.workflow)
+
+    def summary(self) -> dict:
+        """Состояние задания без конфигурации workflow"""
+        return self.model_dump(exclude={"workflow"})
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class WorkflowServer:
+    """HTTP-сервер с очередью заданий и одним потоком выполнения"""
+
+    def __init__(self, run_job: Callable[[Job], None], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """
+        Args:
+            run_job: функция запуска задания
+            host: адрес
+            port: порт, 0 - любой свободный
+        """
+        self.run_job = run_job
+        self.jobs: dict[int, Job] = {}
+
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[int | None] = queue.Queue()
+        self._worker = threading.Thread(target=self._work, name="workflow-worker", daemon=True)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def submit(self, payload: dict) -> Job:
+        """
+        Добавление задания в очередь. Конфигурация проверяется сразу, до постановки в очередь.
+
+        Args:
+            payload: параметры задания, см. Job
+
+        Returns:
+            Задание
+        """
+        # Состояние задания задается только сервером
+        params = {key: payload[key] for key in ("file", "workflow", "from_stage", "only", "profile") if key in payload}
+
+        with self._lock:
+            job = Job(id=next(self._ids), submitted_at=_now(), **params)
+            job.config()
+            self.jobs[job.id] = job
+
+        self._queue.put(job.id)
+        logger.info(f"Задание {job.id} добавлено в очередь: {job.file}")
+
+        return job
+
+    def serve_forever(self) -> None:
+        """Запуск сервера в текущем потоке"""
+        self._worker.start()
+        self._httpd.serve_forever()
+
+    def start(self) -> None:
+        """Запуск сервера в фоновом потоке"""
+        self._worker.start()
+        threading.Thread(target=self._httpd.serve_forever, name="workflow-http", daemon=True).start()
+
+    def shutdown(self) -> None:
+        """Остановка сервера после завершения текущего задания"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._queue.put(None)
+        self._worker.join()
+
+    def _work(self) -> None:
+        """Выполнение заданий из очереди по одному"""
+        while (job_id := self._queue.get()) is not None:
+            job = self.jobs[job_id]
+            job.status, job.started_at = "running", _now()
+            logger.info(f"Задание {job.id} запущено")
+
+            try:
+                self.run_job(job)
+                job.status = "done"
+            except Exception as e:
+                logger.exception(f"Задание {job.id} завершилось с ошибкой")
+                job.status, job.error = "failed", str(e)
+            finally:
+                job.finished_at = _now()
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/jobs":
+                    self._send(200, [job.summary() for job in server.jobs.values()])
+                    return
+
+                job_id = self.path.removeprefix("/jobs/")
+                if job_id.isdigit() and int(job_id) in server.jobs:
+                    self._send(200, server.jobs[int(job_id)].summary())
+                    return
+
+                self._send(404, {"error": f"Не найдено: {self.path}"})
+
+            def do_POST(self):
+                if self.path != "/jobs":
+                    self._send(404, {"error": f"Не найдено: {self.path}"})
+                    return
+
+                try:
+                    payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    job = server.submit(payload)
+                except (ValueError, TypeError, ValidationError) as e:
+                    self._send(400, {"error": str(e)})
+                    return
+
+                self._send(201, job.summary())
+
+            def _send(self, code: int, data) -> None:
+                body = json.dumps(data, ensure_ascii=False, default=str).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+def request(url: str, data: dict | None = None) -> dict | list:
+    """
+    Запрос к серверу workflow.
+
+    Args:
+        url: адрес
+        data: тело POST-запроса, None - GET-запрос
+
+    Returns:
+        Ответ сервера
+    """
+    body = json.dumps(data).encode() if data is not None else None
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(json.loads(e.read())["error"]) from e
+
+
+def main(argv: list[str], run_job: Callable[[Job], None]) -> None:
+    """
+    Команды сервера и клиента.
+
+    Args:
+        argv: аргументы командной строки, начиная с команды
+        run_job: функция запуска задания на сервере
+    """
+    # Адрес сервера - общий параметр всех команд
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--host", default=DEFAULT_HOST, help="Адрес сервера")
+    common.add_argument("--port", type=int, default=DEFAULT_PORT, help="Порт сервера")
+
+    parser = argparse.ArgumentParser(prog="workflow.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("serve", parents=[common], help="Запуск сервера")
+
+    submit = commands.add_parser("submit", parents=[common], help="Добавить эксперимент в очередь")
+    submit.add_argument("file", help="Путь к yaml-файлу")
+    submit.add_argument("--from-stage", help="Запустить этап (номер с 1 или название) и все следующие")
+    submit.add_argument("--only", action="append", default=[], help="Запустить только этот этап")
+    submit.add_argument("--profile", action="store_true", help="Сохранить профиль cProfile каждого модуля")
+
+    status = commands.add_parser("status", parents=[common], help="Состояние очереди или задания")
+    status.add_argument("job_id", nargs="?", type=int, help="Номер задания")
+
+    args = parser.parse_args(argv)
+    url = f"http://{args.host}:{args.port}"
+
+    if args.command == "serve":
+        logging.basicConfig(level=logging.INFO, format="%(levelname)s\t%(name)s: %(message)s")
+        server = WorkflowServer(run_job, args.host, args.port)
+        logger.info(f"Сервер workflow запущен: {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    if args.command == "submit":
+        with open(args.file, "r", encoding="utf-8") as f:
+            workflow = yaml.safe_load(f)
+        result = request(f"{url}/jobs", {
+            "file": args.file, "workflow": workflow, "from_stage": args.from_stage, "only": args.only,
+            "profile": args.profile,
+        })
+    else:
+        result = request(f"{url}/jobs/{args.job_id}" if args.job_id else f"{url}/jobs")
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,85 @@
+from datetime import date
+
+import pytest
+
+from factories.orm import ArticleFactory, ArticleTermAnnotationFactory, DictionaryFactory, TermFactory, \
+    TermDictionaryRefFactory
+from src.modules.candidate.emerging_term_detection import EmergingTermDetection
+from src.orm.models import Candidate, Dictionary, TermYearCount
+
+
+class TestEmergingTermDetection:
+
+    @pytest.fixture
+    def terms(self, db_session):
+        """
+        Фикстура с частотами терминов по годам:
+
+            * term_new - 2019: 1, 2020: 2, 2021: 4 - кандидат;
+            * term_gap - 2015: 1, 2017: 3, 2018: 3 - кандидат, устойчивость с 2017 года;
+            * term_flat - 2019: 3, 2020: 3 - нет роста;
+            * term_known - 2019: 1, 2020: 5 - есть в словаре.
+        """
+        mesh = DictionaryFactory(name="MeSH")
+
+        counts = {
+            "term_new": {2019: 1, 2020: 2, 2021: 4},
+            "term_gap": {2015: 1, 2017: 3, 2018: 3},
+            "term_flat": {2019: 3, 2020: 3},
+            "term_known": {2019: 1, 2020: 5},
+        }
+
+        articles = {year: ArticleFactory(pubdate=date(year, 6, 1)) for year in range(2015, 2022)}
+
+        terms = {}
+        for term_text, counts_per_year in counts.items():
+            term = TermFactory(term_text=term_text)
+            terms[term_text] = term
+            for year, count in counts_per_year.items():
+                for _ in range(count):
+                    ArticleTermAnnotationFactory(article=articles[year], term=term)
+
+        TermDictionaryRefFactory(term=terms["term_known"], dictionary=mesh)
+        TermYearCount.refresh(db_session)
+        Dictionary.refresh_term_masks(db_session)
+        db_session.commit()
+
+        return terms
+
+    @pytest.mark.parametrize("engine", EmergingTermDetection.ENGINES)
+    def test_handle(self, db_session, terms, engine):
+        """Проверка, что модуль находит терминов-кандидатов и сохраняет их в БД"""
+
+        module = EmergingTermDetection(min_years_present=2, min_growth=1.5, min_total_mentions=5,
+                                       dictionaries=["MeSH"], engine=engine)
+        module.handle()
+
+        db_session.expire_all()
+        candidates = {c.term.term_text: c for c in db_session.query(Candidate).all()}
+
+        assert set(candidates) == {"term_new", "term_gap"}
+
+        term_new = candidates["term_new"]
+        assert term_new.first_year == 2019
+        assert term_new.last_year == 2021
+        assert term_new.first_stable_year == 2019
+        assert term_new.max_consecutive == 3
+        assert term_new.growth == 4
+        assert term_new.total_mentions == 7
+        assert term_new.counts_per_year == {"2019": 1, "2020": 2, "2021": 4}
+
+        term_gap = candidates["term_gap"]
+        assert term_gap.first_year == 2015
+        assert term_gap.last_year == 2018
+        assert term_gap.first_stable_year == 2017
+        assert term_gap.max_consecutive == 2
+        assert term_gap.growth == 3
+        assert term_gap.total_mentions == 7
+        assert term_gap.counts_per_year == {"2015": 1, "2017": 3, "2018": 3}
+
+    def test_unknown_engine(self):
+        """Проверка, что неизвестный способ расчета приводит к ошибке"""
+
+        with pytest.raises(ValueError):
+            EmergingTermDetection(min_years_present=2, min_growth=1.5, min_total_mentions=5,
+                                  dictionaries=[], engine="unknown")
@@ -0,0 +1,32 @@
+from src.modules.candidate.emerging_term_detection.term_year_matrix import TermYearMatrix
+
+
+class TestTermYearMatrix:
+
+    def test_from_rows(self):
+        """Проверка построения матрицы из пакетов строк (year, term_id, count) и расчета метрик"""
+
+        partitions = [
+            [(2001, 7, 1), (2003, 7, 3)],
+            [(2004, 7, 3), (2000, 5, 2), (2001, 5, 2)],
+        ]
+
+        matrix = TermYearMatrix.from_rows(partitions, range(2000, 2005))
+
+        assert matrix.term_ids.tolist() == [5, 7]
+        assert matrix.counts.tolist() == [[2, 2, 0, 0, 0], [0, 1, 0, 3, 3]]
+        assert matrix.first_year.tolist() == [2000, 2001]
+        assert matrix.last_year.tolist() == [2001, 2004]
+        assert matrix.max_consecutive.tolist() == [2, 2]
+        assert matrix.first_stable_year.tolist() == [2000, 2003]
+        assert matrix.growth.tolist() == [1.0, 3.0]
+        assert matrix.total_mentions.tolist() == [4, 7]
+        assert matrix.counts_per_year(1) == {2001: 1, 2003: 3, 2004: 3}
+
+    def test_empty(self):
+        """Проверка, что пустой результат запроса дает пустую матрицу"""
+
+        matrix = TermYearMatrix.from_rows([], range(2000, 2005))
+
+        assert matrix.counts.shape == (0, 5)
+        assert matrix.max_consecutive.tolist() == []
@@ -1,5 +1,10 @@
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+
+from factories.orm import ArticleTermAnnotationFactory, DictionaryFactory, ModuleFactory, TermDictionaryRefFactory, \
+    TermFactory
 from src.modules.cleaner.database import CleanerDatabase
-from src.orm.models import Article
+from src.orm.models import Article, ArticleTermAnnotation, Dictionary, StageRun, Term, TermYearCount
 
 
 class TestCleanerDatabase:
@@ -18,3 +23,92 @@ class TestCleanerDatabase:
         module.handle()
 
         assert 0 == db_session.query(Article).count()
+
+    def test_handle_truncate(self, db_session):
+        """Проверка, что очистка через TRUNCATE очищает зависимые таблицы и сбрасывает счетчики id"""
+        ArticleTermAnnotationFactory.create_batch(3)
+        TermYearCount.refresh(db_session)
+        db_session.commit()
+
+        module = CleanerDatabase(["Term"])
+        module.handle()
+
+        assert 0 == db_session.query(Term).count()
+        assert 0 == db_session.query(ArticleTermAnnotation).count()
+        assert 0 == db_session.query(TermYearCount).count()
+        assert 3 == db_session.query(Article).count()
+        assert {"terms", "article_term_annotations", "candidates", "term_dictionary_ref",
+                "term_year_counts"} <= set(module.cleared_tables)
+        assert "articles" not in module.cleared_tables
+
+        assert TermFactory().id == 1
+
+    def test_handle_by_modules(self, db_session):
+        """Проверка, что с параметром modules удаляются только данные указанных модулей"""
+        module_a = ModuleFactory(name="ner-a")
+        module_b = ModuleFactory(name="ner-b")
+        ArticleTermAnnotationFactory.create_batch(2, module=module_a)
+        ArticleTermAnnotationFactory.create_batch(3, module=module_b)
+        db_session.commit()
+
+        CleanerDatabase(["ArticleTermAnnotation"], modules=["ner-a"]).handle()
+
+        assert {annotation.module.name for annotation in db_session.query(ArticleTermAnnotation)} == {"ner-b"}
+        assert 3 == db_session.query(ArticleTermAnnotation).count()
+        assert 5 == db_session.query(Term).count()
+
+        with pytest.raises(ValueError, match="не связана с модулями"):
+            CleanerDatabase(["Term"], modules=["ner-a"])
+
+    def test_handle_refresh_term_year_counts(self, db_session):
+        """Проверка, что после очистки статей или разметки пересчитывается частота терминов по годам"""
+        module_a = ModuleFactory(name="ner-a")
+        module_b = ModuleFactory(name="ner-b")
+        ArticleTermAnnotationFactory.create_batch(2, module=module_a)
+        ArticleTermAnnotationFactory.create_batch(3, module=module_b)
+        TermYearCount.refresh(db_session)
+        db_session.commit()
+
+        CleanerDatabase(["ArticleTermAnnotation"], modules=["ner-a"]).handle()
+
+        assert {count.module.name for count in db_session.query(TermYearCount)} == {"ner-b"}
+
+        CleanerDatabase(["Article"]).handle()
+
+        assert 5 == db_session.query(Term).count()
+        assert 0 == db_session.query(TermYearCount).count()
+
+    def test_handle_refresh_term_masks(self, db_session):
+        """Проверка, что после очистки ссылок на словари пересчитываются битовые маски терминов"""
+        term_id = TermDictionaryRefFactory(dictionary=DictionaryFactory(name="MeSH")).term_id
+        Dictionary.refresh_term_masks(db_session)
+        db_session.commit()
+        assert db_session.get(Term, term_id).dictionary_mask == 1
+
+        CleanerDatabase(["TermDictionaryRef"]).handle()
+
+        assert db_session.get(Term, term_id).dictionary_mask == 0
+
+    def test_handle_reset_stage_runs(self, db_session):
+        """Проверка, что сбрасывается кеш этапов, результаты которых находились в очищенных таблицах"""
+        db_session.add(StageRun(position=1, name="Импорт", hash="1", tables=["articles"]))
+        db_session.add(StageRun(position=2, name="NER", hash="2", tables=["article_term_annotations", "terms"]))
+        db_session.add(StageRun(position=3, name="Вывод", hash="3", tables=[]))
+        db_session.commit()
+
+        CleanerDatabase(["Term"]).handle()
+
+        assert [stage_run.position for stage_run in db_session.query(StageRun).order_by(StageRun.position)] == [1, 3]
+
+    def test_can_truncate(self):
+        """TRUNCATE CASCADE используется, только если все ссылки - обязательные с ON DELETE CASCADE"""
+        metadata = MetaData()
+        parent = Table("parent", metadata, Column("id", Integer, primary_key=True))
+        Table("child", metadata, Column("id", Integer, primary_key=True),
+              Column("parent_id", ForeignKey("parent.id", ondelete="CASCADE"), nullable=False))
+        Table("grandchild", metadata, Column("id", Integer, primary_key=True),
+              Column("child_id", ForeignKey("child.id", ondelete="SET NULL"), nullable=True))
+
+        assert [table.name for table in CleanerDatabase.dependent_tables(parent)] == ["child", "grandchild"]
+        assert not CleanerDatabase.can_truncate(parent)
+        assert CleanerDatabase.can_truncate(metadata.tables["grandchild"])
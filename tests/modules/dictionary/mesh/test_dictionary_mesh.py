@@ -1,4 +1,5 @@
-from unittest.mock import patch
+from sqlite3 import OperationalError
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -32,6 +33,18 @@ class TestDictionaryMesh:
             if expected_count:
                 assert search_value.ref_id == db_session.query(TermDictionaryRef).first().ref_id
 
+    def test_handle_database_locked(self, db_session):
+        """Проверка, что блокировка БД словаря - ошибка модуля, а не пропуск термина"""
+        dictionary = MagicMock()
+        dictionary.name.return_value = "MeSH"
+        dictionary.search.side_effect = OperationalError("database is locked")
+
+        with patch.object(DictionaryMesh, "dictionary", return_value=dictionary):
+            ArticleTermAnnotationFactory.create()
+
+            with pytest.raises(OperationalError, match="database is locked"):
+                DictionaryMesh().handle()
+
 
 class TestMeSH:
     @pytest.mark.parametrize(
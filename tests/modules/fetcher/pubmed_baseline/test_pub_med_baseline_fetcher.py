@@ -0,0 +1,135 @@
+import datetime
+import gzip
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from src.modules.fetcher.pubmed_baseline import PubMedBaselineFetcher
+from src.orm.models import Article
+
+PUBMED_XML = """<?xml version="1.0" encoding="utf-8"?>
+<PubmedArticleSet>
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID Version="1">12345</PMID>
+      <Article>
+        <Journal>
+          <JournalIssue>
+            <PubDate><Year>2019</Year><Month>Mar</Month><Day>5</Day></PubDate>
+          </JournalIssue>
+        </Journal>
+        <ArticleTitle>Test <i>Title</i></ArticleTitle>
+        <Abstract>
+          <AbstractText Label="BACKGROUND">Breast calcification.</AbstractText>
+          <AbstractText Label="RESULTS">Test Abstract</AbstractText>
+        </Abstract>
+        <AuthorList>
+          <Author><LastName>Author</LastName><Initials>T</Initials></Author>
+          <Author><CollectiveName>Test Group</CollectiveName></Author>
+        </AuthorList>
+        <PublicationTypeList>
+          <PublicationType>Journal Article</PublicationType>
+        </PublicationTypeList>
+      </Article>
+      <MeshHeadingList>
+        <MeshHeading><DescriptorName>Breast Neoplasms</DescriptorName></MeshHeading>
+      </MeshHeadingList>
+      <KeywordList><Keyword>keyword</Keyword></KeywordList>
+    </MedlineCitation>
+  </PubmedArticle>
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID Version="1">67890</PMID>
+      <Article>
+        <Journal>
+          <JournalIssue>
+            <PubDate><MedlineDate>2001 Dec-2002 Jan</MedlineDate></PubDate>
+          </JournalIssue>
+        </Journal>
+        <ArticleTitle>Other Title</ArticleTitle>
+        <Abstract><AbstractText>Other Abstract</AbstractText></Abstract>
+      </Article>
+      <MeshHeadingList>
+        <MeshHeading><DescriptorName>Lung Neoplasms</DescriptorName></MeshHeading>
+      </MeshHeadingList>
+    </MedlineCitation>
+  </PubmedArticle>
+</PubmedArticleSet>
+"""
+
+
+class TestPubMedBaselineFetcher:
+
+    @pytest.fixture
+    def baseline_file(self, tmp_path):
+        """Фикстура файла PubMed baseline"""
+        path = tmp_path / "pubmed25n0001.xml.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(PUBMED_XML)
+        return path
+
+    def test_handle(self, baseline_file, db_session):
+        """Проверка, что модуль разбирает файлы и сохраняет подходящие статьи в БД"""
+
+        module = PubMedBaselineFetcher(files=str(baseline_file.parent / "*.xml.gz"), mesh=["breast neoplasms"])
+        module.handle()
+
+        assert db_session.query(Article).filter_by(pmid="67890").first() is None, "Статья не прошла фильтр"
+
+        saved_article = db_session.query(Article).filter_by(pmid="12345").first()
+        assert isinstance(saved_article, Article)
+        assert saved_article.title == "Test Title"
+        assert saved_article.authors == "Author T, Test Group"
+        assert saved_article.abstract == "Breast calcification.\nTest Abstract"
+        assert saved_article.pubdate == datetime.date(2019, 3, 5)
+        assert saved_article.author_keywords == ["keyword"]
+        assert saved_article.publication_type == ["Journal Article"]
+
+    @pytest.mark.parametrize("params,expected", [
+        ({}, ["12345", "67890"]),
+        ({"keywords": ["CALCIFICATION"]}, ["12345"]),
+        ({"min_year": 2010}, ["12345"]),
+        ({"max_year": 2001}, ["67890"]),
+        ({"mesh": ["Heart Diseases"]}, []),
+    ])
+    def test_parse_files_filter(self, baseline_file, params, expected):
+        """Проверка фильтра по MeSH, ключевым словам и годам"""
+
+        module = PubMedBaselineFetcher(files=str(baseline_file), **params)
+        records = list(module._parse_files([baseline_file]))
+
+        assert [rec["PMID"] for rec in records[0]] == expected
+
+    def test_parse_files_workers(self, baseline_file):
+        """Проверка разбора в нескольких процессах: порядок результатов совпадает с порядком файлов"""
+        files = [baseline_file]
+        for i in range(2, 6):
+            files.append(baseline_file.with_name(f"pubmed25n000{i}.xml.gz"))
+            shutil.copy(baseline_file, files[-1])
+
+        module = PubMedBaselineFetcher(files=str(baseline_file.parent / "*.xml.gz"), workers=2)
+        records = list(module._parse_files(module._find_files()))
+
+        assert len(records) == 5
+        assert all([rec["PMID"] for rec in file_records] == ["12345", "67890"] for file_records in records)
+
+    def test_parse_files_window(self, baseline_file):
+        """Проверка, что в разбор передается не больше workers * 2 файлов, результаты которых не забраны"""
+        submitted = []
+
+        class Executor(ThreadPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                submitted.append(args[0])
+                return super().submit(fn, *args, **kwargs)
+
+        module = PubMedBaselineFetcher(files=str(baseline_file), workers=2)
+        with patch("src.modules.fetcher.pubmed_baseline.ProcessPoolExecutor", Executor):
+            results = module._parse_files([baseline_file] * 10)
+
+            next(results)
+            assert len(submitted) == 4
+
+            assert len(list(results)) == 9
+            assert len(submitted) == 10
@@ -0,0 +1,40 @@
+import datetime
+
+import pytest
+from dateutil import parser
+
+from src.modules.fetcher.pubdate import parse_pubdate, _parse_common_format
+
+
+class TestParsePubdate:
+
+    @pytest.mark.parametrize("dp_value,expected", [
+        ("2019 Mar 5", datetime.date(2019, 3, 5)),
+        ("2019 Mar", datetime.date(2019, 3, 1)),
+        ("2019", datetime.date(2019, 1, 1)),
+        ("2019 Winter", datetime.date(2019, 1, 1)),
+        ("2018 Dec-2019 Jan", datetime.date(2018, 12, 1)),
+        ("2019 Jan 5-11", datetime.date(2019, 1, 5)),
+        ("2019 March", datetime.date(2019, 3, 1)),
+        ("2019 Feb 30", datetime.date(2019, 1, 1)),
+        ("Mar 2019", datetime.date(2019, 3, 1)),
+        ("", None),
+        (None, None),
+        ("unknown", None),
+    ])
+    def test_parse_pubdate(self, dp_value, expected):
+        """Проверка разбора типовых и нетиповых форматов DP"""
+        assert parse_pubdate(dp_value) == expected
+
+    @pytest.mark.parametrize("dp_value", [
+        "2019 Mar 5", "2019 Mar 05", "2019 Mar", "2019 May", "2019 September", "2019", "2019 Winter", "2019 Fall",
+    ])
+    def test_common_format_same_as_dateutil(self, dp_value):
+        """Быстрый разбор должен давать тот же результат, что и dateutil"""
+        dt = parser.parse(dp_value, fuzzy=True, default=datetime.datetime(1900, 1, 1))
+        assert _parse_common_format(dp_value) == dt.date()
+
+    @pytest.mark.parametrize("dp_value", ["Mar 2019", "2019 Epub", "2019 Feb 30"])
+    def test_common_format_fallback(self, dp_value):
+        """Нетиповые форматы передаются в dateutil"""
+        assert _parse_common_format(dp_value) is None
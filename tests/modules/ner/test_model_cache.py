@@ -0,0 +1,37 @@
+from unittest.mock import Mock
+
+from src.container import container
+from src.modules.ner.model_cache import ModelCache
+
+
+class TestModelCache:
+
+    def test_get(self):
+        """Проверка, что модель загружается один раз для каждой пары (модель, устройство)"""
+        cache = ModelCache()
+        loader = Mock(side_effect=lambda: object())
+
+        model = cache.get("model", "cpu", loader)
+        assert cache.get("model", "cpu", loader) is model
+        assert loader.call_count == 1
+
+        assert cache.get("model", "cuda", loader) is not model
+        assert cache.get("other-model", "cpu", loader) is not model
+        assert loader.call_count == 3
+        assert ("model", "cuda") in cache
+
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_container_model_cache(self):
+        """Проверка, что контейнер возвращает один кеш на процесс"""
+        assert container.model_cache() is container.model_cache()
+
+    def test_container_model_cache_override(self):
+        """Проверка, что модули получают кеш из контейнера: его можно подменить без изменения общего кеша"""
+        model_cache = ModelCache()
+
+        with container.model_cache.override(model_cache):
+            assert container.model_cache() is model_cache
+
+        assert container.model_cache() is not model_cache
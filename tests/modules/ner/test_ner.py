@@ -1,10 +1,12 @@
+import hashlib
 from datetime import date
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from factories.orm import ArticleFactory
+from src.modules.cleaner.database import CleanerDatabase
 from src.modules.module import ModuleInfo
 from src.modules.ner.ner import Ner, TermDto
-from src.orm.models import Article, Term, ArticleTermAnnotation
+from src.orm.models import Article, Term, ArticleTermAnnotation, TermYearCount, NerMemo, NerProcessedArticle
 
 
 class NerStub(Ner):
@@ -56,6 +58,7 @@ class TestHandle:
             2. извлечение терминов
             3. сохранение терминов в БД
             4. сохранение разметки статьи по терминам в БД
+            5. пересчет частоты терминов по годам
         """
 
         # Подготовка: создаем тестовые статьи
@@ -164,3 +167,146 @@ class TestHandle:
             assert article_term_annotations[1].end_char == 50
             assert article_term_annotations[1].surface_form == "elderly patients living alone"
             assert article_term_annotations[1].article_field == "abstract"
+
+            # Проверка: частота терминов по годам
+            term_year_counts = {
+                c.term.term_text: (c.year, c.count) for c in db_session.query(TermYearCount).all()
+            }
+            assert term_year_counts == {
+                "cancer treatment": (2021, 2),
+                "effective therapy": (2021, 1),
+                "elderly patients living alone": (2021, 1),
+            }, "Частота терминов по годам не пересчитана"
+
+    def test_handle_reuses_results_for_same_text(self, db_session):
+        """
+        Одинаковый текст обрабатывается один раз: дубликаты статей в эксперименте
+        и тексты, уже обработанные той же версией модуля.
+        """
+        abstract = "Cancer treatment is effective therapy."
+        db_session.add_all([
+            Article(pmcid="PMC01", authors="Author", title="Title", abstract=abstract, pubdate=date(2021, 1, 1)),
+            Article(pmid="01", authors="Author", title="Title", abstract=abstract, pubdate=date(2021, 1, 1)),
+            Article(pmcid="PMC02", authors="Author", title="Title", abstract="Other text.", pubdate=date(2021, 1, 1)),
+        ])
+        db_session.commit()
+
+        article = db_session.query(Article).filter_by(pmcid="PMC01").one()
+        assert article.get_hash("abstract") == hashlib.md5(abstract.encode()).hexdigest()
+
+        term = TermDto(text="cancer treatment", word_count=2, start_pos=0, end_pos=16,
+                       surface_form="Cancer treatment", pos_model="NN + NN")
+        extract = Mock(side_effect=lambda text: [term.model_copy()] if text == abstract else [])
+
+        module = NerStub(["abstract"])
+        with patch.object(module, "_extract_terms_from_text", extract):
+            module.handle()
+
+        assert extract.call_count == 2
+        assert module.memo_hits == 1
+        assert db_session.query(ArticleTermAnnotation).count() == 2
+        assert db_session.query(NerMemo).count() == 2
+
+        # Повторный запуск: все тексты уже обработаны
+        extract.reset_mock()
+        module = NerStub(["abstract"])
+        with patch.object(module, "_extract_terms_from_text", extract):
+            module.handle()
+
+        assert extract.call_count == 0
+        assert module.memo_hits == 3
+        annotations = db_session.query(ArticleTermAnnotation).all()
+        assert len(annotations) == 4
+        assert {annotation.surface_form for annotation in annotations} == {"Cancer treatment"}
+        assert {annotation.article_field for annotation in annotations} == {"abstract"}
+
+        # Другие параметры модуля - другая версия, сохраненные результаты не используются
+        other_module = NerStub(["abstract"])
+        other_module.stop_words = {"therapy"}
+        assert other_module._memo_version() != module._memo_version()
+
+    def test_handle_incremental(self, db_session):
+        """
+        Режим incremental: обрабатываются только новые статьи и статьи с измененным текстом,
+        разметка измененных статей заменяется.
+        """
+        article1 = Article(pmcid="PMC01", authors="Author", title="Title", abstract="Aspirin reduces fever.",
+                           pubdate=date(2021, 1, 1))
+        article2 = Article(pmcid="PMC02", authors="Author", title="Title", abstract="Ibuprofen reduces pain.",
+                           pubdate=date(2021, 1, 1))
+        db_session.add_all([article1, article2])
+        db_session.commit()
+
+        def extract_first_word(text):
+            word = text.split()[0]
+            return [TermDto(text=word.lower(), word_count=1, start_pos=0, end_pos=len(word), surface_form=word,
+                            pos_model="NOUN")]
+
+        extract = Mock(side_effect=extract_first_word)
+
+        def run():
+            module = NerStub(["abstract"], incremental=True)
+            with patch.object(module, "_extract_terms_from_text", extract):
+                module.handle()
+            return module
+
+        assert run().items_processed == 2
+        assert db_session.query(NerProcessedArticle).count() == 2
+
+        # Повторный запуск без изменений: статьи не обрабатываются
+        extract.reset_mock()
+        assert run().items_processed == 0
+        assert extract.call_count == 0
+        assert db_session.query(ArticleTermAnnotation).count() == 2
+
+        # Новая статья и статья с измененным текстом
+        db_session.query(Article).filter_by(pmcid="PMC01").one().abstract = "Paracetamol reduces fever."
+        db_session.add(Article(pmcid="PMC03", authors="Author", title="Title", abstract="Metformin lowers glucose.",
+                               pubdate=date(2022, 1, 1)))
+        db_session.commit()
+
+        assert run().items_processed == 2
+        assert extract.call_count == 2
+
+        annotations = {
+            (annotation.article.pmcid, annotation.surface_form) for annotation in db_session.query(ArticleTermAnnotation)
+        }
+        assert annotations == {("PMC01", "Paracetamol"), ("PMC02", "Ibuprofen"), ("PMC03", "Metformin")}
+
+        term_year_counts = {c.term.term_text: (c.year, c.count) for c in db_session.query(TermYearCount).all()}
+        assert term_year_counts == {
+            "paracetamol": (2021, 1),
+            "ibuprofen": (2021, 1),
+            "metformin": (2022, 1),
+        }
+
+        # Другие параметры модуля - статьи обрабатываются заново
+        extract.reset_mock()
+        module = NerStub(["title", "abstract"], incremental=True)
+        with patch.object(module, "_extract_terms_from_text", extract):
+            module.handle()
+        assert module.items_processed == 3
+
+    def test_handle_incremental_after_cleaner(self, db_session):
+        """Режим incremental после очистки терминов: все статьи обрабатываются заново"""
+        db_session.add(Article(pmcid="PMC01", authors="Author", title="Title", abstract="Aspirin reduces fever.",
+                               pubdate=date(2021, 1, 1)))
+        db_session.commit()
+
+        def run():
+            module = NerStub(["abstract"], incremental=True)
+            terms = [TermDto(text="aspirin", word_count=1, start_pos=0, end_pos=7, surface_form="Aspirin",
+                             pos_model="NOUN")]
+            with patch.object(module, "_extract_terms_from_text", return_value=terms):
+                module.handle()
+            return module
+
+        assert run().items_processed == 1
+
+        CleanerDatabase(["Term"]).handle()
+        assert db_session.query(ArticleTermAnnotation).count() == 0
+        assert db_session.query(NerProcessedArticle).count() == 0
+
+        assert run().items_processed == 1
+        assert [a.surface_form for a in db_session.query(ArticleTermAnnotation)] == ["Aspirin"]
+        assert [c.term.term_text for c in db_session.query(TermYearCount)] == ["aspirin"]
@@ -0,0 +1,85 @@
+import json
+from unittest.mock import patch
+
+import pytest
+import torch
+from transformers import DistilBertConfig, DistilBertForTokenClassification, DistilBertTokenizerFast
+
+from src.modules.ner.transformer import onnx_backend
+from src.modules.ner.transformer.onnx_backend import MODEL_FILE, PARITY_FILE, check_parity, export_quantized, \
+    onnx_pipeline
+from src.modules.ner.transformer.transformer_biomedical_ner_all import TransformerBiomedicalNerAll
+
+
+@pytest.fixture
+def model_path(tmp_path) -> str:
+    """Маленькая модель DistilBert со случайными весами, без загрузки из HuggingFace"""
+    words = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "the", "patient", "lung", "cancer", "heart", "disease", "."]
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(words))
+
+    labels = ["O", "B-Disease", "I-Disease"]
+    config = DistilBertConfig(vocab_size=len(words), dim=32, hidden_dim=64, n_layers=2, n_heads=2,
+                              id2label=dict(enumerate(labels)), label2id={label: i for i, label in enumerate(labels)})
+    torch.manual_seed(0)
+
+    path = tmp_path / "model"
+    DistilBertForTokenClassification(config).save_pretrained(path)
+    DistilBertTokenizerFast(str(vocab_file)).save_pretrained(path)
+
+    return str(path)
+
+
+class TestOnnxBackend:
+
+    def test_export_quantized(self, model_path, tmp_path):
+        """Проверка экспорта: модель сохраняется в каталог и используется повторно без экспорта"""
+        onnx_dir = tmp_path / "onnx"
+
+        model_dir = export_quantized(model_path, "max", onnx_dir)
+
+        assert model_dir.parent == onnx_dir
+        assert (model_dir / MODEL_FILE).exists()
+        assert json.loads((model_dir / PARITY_FILE).read_text())["parity"] >= onnx_backend.MIN_PARITY
+        # Кроме модели в каталоге ничего не остается
+        assert list(onnx_dir.iterdir()) == [model_dir]
+
+        with patch.object(onnx_backend.AutoModelForTokenClassification, "from_pretrained") as from_pretrained:
+            assert export_quantized(model_path, "max", onnx_dir) == model_dir
+            from_pretrained.assert_not_called()
+
+        entities = onnx_pipeline(model_dir, "max")("the patient has lung cancer.")
+        assert all({"start", "end", "entity_group"} <= entity.keys() for entity in entities)
+
+    def test_export_quantized_parity_error(self, model_path, tmp_path):
+        """Проверка, что модель с расхождением результатов не сохраняется"""
+        onnx_dir = tmp_path / "onnx"
+
+        with patch.object(onnx_backend, "MIN_PARITY", 1.1):
+            with pytest.raises(RuntimeError, match="отличаются от PyTorch"):
+                export_quantized(model_path, "max", onnx_dir)
+
+        assert list(onnx_dir.iterdir()) == []
+
+    def test_check_parity(self):
+        """Проверка F1 по сущностям"""
+        expected = {
+            "a": [{"start": 0, "end": 4, "entity_group": "Disease"}, {"start": 5, "end": 9, "entity_group": "Drug"}],
+            "b": [{"start": 0, "end": 4, "entity_group": "Disease"}],
+        }
+        actual = {
+            "a": [{"start": 0, "end": 4, "entity_group": "Disease"}, {"start": 5, "end": 9, "entity_group": "Gene"}],
+            "b": [{"start": 0, "end": 4, "entity_group": "Disease"}],
+        }
+
+        assert check_parity(expected.get, expected.get, ["a", "b"]) == 1.0
+        assert check_parity(expected.get, actual.get, ["a", "b"]) == pytest.approx(2 / 3)
+        assert check_parity(lambda text: [], lambda text: [], ["a"]) == 1.0
+
+    def test_backend_validation(self):
+        """Проверка параметров бэкенда модуля biomedical-ner-all: проверяются до загрузки моделей"""
+        with pytest.raises(ValueError, match="Неизвестный бэкенд"):
+            TransformerBiomedicalNerAll(article_fields=["title"], backend="tensorrt")
+
+        with pytest.raises(ValueError, match="только устройство cpu"):
+            TransformerBiomedicalNerAll(article_fields=["title"], device="cuda", backend="onnx")
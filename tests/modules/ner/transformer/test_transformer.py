@@ -0,0 +1,108 @@
+import re
+
+import spacy
+
+from src.container import container
+from src.modules.module import ModuleInfo
+from src.modules.ner.model_cache import ModelCache
+from src.modules.ner.transformer.transformer import EntitySpan, TermFeature, Transformer
+
+
+class TransformerStub(Transformer):
+    """Трансформер-заглушка: сущности - слова с заглавной буквы"""
+
+    def __init__(self, max_tokens: int):
+        # Вместо en_core_web_sm - пустой конвейер spaCy в отдельном кеше моделей, общий кеш процесса не меняется
+        model_cache = ModelCache()
+        model_cache.get("spacy/en_core_web_sm", "cpu", lambda: spacy.blank("en"))
+        with container.model_cache.override(model_cache):
+            super().__init__(article_fields=["abstract"])
+        self.max_tokens = max_tokens
+        self.batches = []
+
+    @staticmethod
+    def info() -> ModuleInfo:
+        return ModuleInfo(module="ner", type="pytest")
+
+    def _predict(self, texts: list[str]) -> list[list[EntitySpan]]:
+        self.batches.append(texts)
+        return [
+            [EntitySpan(match.start(), match.end(), "Entity") for match in re.finditer(r"\b[A-Z]\w+", text)]
+            for text in texts
+        ]
+
+    def _term_feature(self, term: str) -> TermFeature:
+        return TermFeature([term.lower()], ["PROPN"])
+
+
+TEXT = ("Aspirin reduces fever in adults. Patients with Asthma were excluded from the trial. "
+        "Ibuprofen was given twice daily! Results were compared with Placebo. "
+        "Hepatotoxicity was not observed during the study.")
+
+
+class TestTransformerChunks:
+
+    def test_short_text(self):
+        """Короткий текст передается модели целиком"""
+        transformer = TransformerStub(max_tokens=100)
+
+        terms = transformer._extract_terms_from_text(TEXT)
+
+        assert transformer.batches == [[TEXT]]
+        assert [term.surface_form for term in terms] == [
+            "Aspirin", "Patients", "Asthma", "Ibuprofen", "Results", "Placebo", "Hepatotoxicity"]
+
+    def test_long_text(self):
+        """Длинный текст разбивается на окна из предложений, позиции терминов - в исходном тексте"""
+        transformer = TransformerStub(max_tokens=20)
+
+        chunks = transformer._split_text(TEXT)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert TEXT[chunk.start:chunk.start + len(chunk.text)] == chunk.text
+            assert transformer._count_tokens(chunk.text) <= transformer.max_tokens
+            # Окно начинается с начала предложения и заканчивается концом предложения
+            assert chunk.start == 0 or TEXT[chunk.start - 2] in ".!?"
+            assert chunk.text[-1] in ".!?"
+
+        # Соседние окна перекрываются на одно предложение
+        for previous, chunk in zip(chunks, chunks[1:]):
+            assert chunk.start < previous.start + len(previous.text)
+
+        terms = transformer._extract_terms_from_text(TEXT)
+
+        # Все окна текста обрабатываются одним пакетом
+        assert transformer.batches == [[chunk.text for chunk in chunks]]
+        assert [(term.start_pos, term.end_pos) for term in terms] == [
+            (match.start(), match.end()) for match in re.finditer(r"\b[A-Z]\w+", TEXT)]
+        assert all(TEXT[term.start_pos:term.end_pos] == term.surface_form for term in terms)
+
+    def test_long_sentence(self):
+        """Предложение длиннее окна разбивается по словам"""
+        transformer = TransformerStub(max_tokens=4)
+        text = "Aspirin and Ibuprofen reduce fever and pain in Adults"
+
+        chunks = transformer._split_text(text)
+
+        assert [chunk.text for chunk in chunks] == ["Aspirin and Ibuprofen reduce", "fever and pain in", "Adults"]
+        assert [term.surface_form for term in transformer._extract_terms_from_text(text)] == [
+            "Aspirin", "Ibuprofen", "Adults"]
+
+    def test_merge_spans(self):
+        """Пересекающиеся сущности из разных окон объединяются, из одного окна - остаются"""
+        spans = [
+            (EntitySpan(0, 7, "Drug"), 0),
+            (EntitySpan(10, 20, "Disease"), 0),
+            (EntitySpan(10, 20, "Finding"), 1),
+            (EntitySpan(15, 30, "Disease"), 1),
+            (EntitySpan(40, 45, "Gene"), 1),
+            (EntitySpan(42, 48, "Gene"), 1),
+        ]
+
+        assert Transformer._merge_spans(spans) == [
+            EntitySpan(0, 7, "Drug"),
+            EntitySpan(15, 30, "Disease"),
+            EntitySpan(40, 45, "Gene"),
+            EntitySpan(42, 48, "Gene"),
+        ]
@@ -0,0 +1,172 @@
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import matplotlib.pyplot as plt
+import pytest
+from matplotlib.colors import to_hex
+
+from factories.orm import ArticleFactory, ArticleTermAnnotationFactory, DictionaryFactory, TermFactory, \
+    TermDictionaryRefFactory
+from src.modules.output.charts import ChartsOutput, CandidatesByYear, PosModelByYear, VocabularyCoverage
+from src.orm.models import Candidate, Dictionary, Term, TermYearCount
+
+
+class TestChartsOutput:
+
+    @pytest.fixture
+    def data(self, db_session):
+        """
+        Фикстура с данными для всех графиков:
+
+            * статьи за 2015-2020 годы;
+            * термины с разными POS-структурами, один из них есть в словаре MeSH;
+            * два термина-кандидата.
+        """
+        mesh = DictionaryFactory(name="MeSH")
+
+        articles = [ArticleFactory(pubdate=date(year, 6, 1)) for year in range(2015, 2021)]
+
+        terms = [
+            TermFactory(term_text="breast cancer", word_count=2, pos_model="JJ + NN"),
+            TermFactory(term_text="tumor growth", word_count=2, pos_model="NN + NN"),
+            TermFactory(term_text="deep learning model", word_count=3, pos_model="JJ + NN + NN"),
+            TermFactory(term_text="mammography", word_count=1, pos_model="NN"),
+        ]
+        TermDictionaryRefFactory(term=terms[3], dictionary=mesh)
+
+        for idx, article in enumerate(articles):
+            for term in terms[:idx % len(terms) + 1]:
+                ArticleTermAnnotationFactory(article=article, term=term)
+
+        for term in terms[:2]:
+            db_session.add(Candidate(term_id=term.id, first_year=2015, last_year=2020, first_stable_year=2016,
+                                     max_consecutive=5, growth=2.0, total_mentions=6,
+                                     counts_per_year={"2015": 1, "2016": 1, "2020": 2}))
+
+        db_session.commit()
+
+        TermYearCount.refresh(db_session)
+        Dictionary.refresh_term_masks(db_session)
+        db_session.commit()
+
+        return [term.id for term in terms[:2]]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_handle(self, db_session, data, fake_experiment, workers):
+        """Проверка, что все графики построены, в том числе при отрисовке в пуле процессов"""
+        module = ChartsOutput(dpi=50, dictionaries=["MeSH"], workers=workers)
+        module.experiment = fake_experiment
+        module.handle()
+
+        directory = Path(fake_experiment.directory)
+        candidates_dir = directory / "Траектория появления терминов-кандидатов"
+
+        expected_files = [
+            directory / "Количество извлеченных терминов и их покрытие словарями.png",
+            directory / "Динамика покрытия извлеченных терминов словарями.png",
+            directory / "Облако терминов.png",
+            directory / "Облако терминов.csv",
+            directory / "Количество POS-структур по годам, кроме униграмм.png",
+            directory / "Доля POS-структур по годам, кроме униграмм.png",
+            directory / "Динамика POS-структур по годам, кроме униграмм.png",
+            candidates_dir / "meta.csv",
+            *[candidates_dir / f"{term_id}.png" for term_id in data],
+        ]
+
+        for file in expected_files:
+            assert file.exists(), f"Файл не создан: {file.name}"
+
+    @pytest.mark.parametrize("layout,expected_file", [
+        ("pdf", "candidates.pdf"),
+        ("grid", "grid_001.png"),
+    ])
+    def test_handle_candidates_layout(self, db_session, data, fake_experiment, layout, expected_file):
+        """Проверка вывода траекторий терминов-кандидатов в один файл"""
+        module = ChartsOutput(dpi=50, dictionaries=["MeSH"], workers=2, candidates_layout=layout)
+        module.experiment = fake_experiment
+        module.handle()
+
+        candidates_dir = Path(fake_experiment.directory) / "Траектория появления терминов-кандидатов"
+
+        assert sorted(file.name for file in candidates_dir.iterdir()) == sorted([expected_file, "meta.csv"])
+
+        meta = (candidates_dir / "meta.csv").read_text(encoding="utf-8")
+        assert meta.count(expected_file) == len(data), "В meta.csv должен быть указан файл каждого кандидата"
+
+    def test_unknown_candidates_layout(self):
+        """Проверка, что неизвестный вариант вывода приводит к ошибке"""
+        with pytest.raises(ValueError) as exc_info:
+            ChartsOutput(dpi=50, dictionaries=[], candidates_layout="svg")
+
+        assert "Неизвестный вариант вывода" in str(exc_info.value)
+
+    def test_candidates_line_color(self, db_session):
+        """Проверка, что на переиспользуемых осях линии всех кандидатов одного цвета"""
+        chart = CandidatesByYear(db_session, 50, None)
+        all_years = range(2015, 2021)
+        fig, ax = chart._create_figure(all_years)
+
+        colors = []
+        for term_text in ["breast cancer", "tumor growth"]:
+            term = {"term_text": term_text, "first_year": 2015, "first_stable_year": 2016,
+                    "counts_per_year": {"2015": 1, "2016": 2}}
+            artists = chart._draw_term(ax, term, all_years)
+            colors.append(to_hex(artists[0].get_color()))
+            chart._clear(artists)
+        plt.close(fig)
+
+        # Первый цвет цикла по умолчанию, как у графика на новых осях
+        assert colors == ["#1f77b4", "#1f77b4"]
+
+    def test_pos_model_by_year_fetch(self, db_session, data):
+        """Проверка, что ТОП-n POS-структур и суммы по годам получаются одним запросом и переиспользуются"""
+        mesh = db_session.query(Dictionary).filter_by(name="MeSH").one()
+        chart = PosModelByYear(db_session, 50, [mesh], None)
+
+        with patch.object(db_session, "execute", wraps=db_session.execute) as mock_execute:
+            pos_models_by_year, total_pos_models_by_year = chart.fetch(2)
+            assert chart.fetch(2) == (pos_models_by_year, total_pos_models_by_year)
+
+            mock_execute.assert_called_once()
+
+        # Униграмма "mammography" есть в словаре и не учитывается.
+        # У всех POS-структур по одному термину, при равенстве порядок - по названию структуры.
+        assert sorted((it["year"], it["pos_model"], it["count"]) for it in pos_models_by_year) == [
+            (2015, "JJ + NN", 1),
+            (2016, "JJ + NN", 1),
+            (2017, "JJ + NN", 1),
+            (2017, "JJ + NN + NN", 1),
+            (2018, "JJ + NN", 1),
+            (2018, "JJ + NN + NN", 1),
+            (2019, "JJ + NN", 1),
+            (2020, "JJ + NN", 1),
+        ]
+        assert sorted((it["year"], it["count"]) for it in total_pos_models_by_year) == [
+            (2015, 1), (2016, 2), (2017, 3), (2018, 3), (2019, 1), (2020, 2),
+        ]
+
+    def test_handle_up_to_date(self, db_session, data, fake_experiment):
+        """Проверка, что перестраиваются только графики, входные данные которых изменились"""
+        module = ChartsOutput(dpi=50, dictionaries=["MeSH"])
+        module.experiment = fake_experiment
+        module.handle()
+
+        # Новый термин-кандидат из уже извлеченных: изменились только данные траекторий кандидатов
+        term = db_session.query(Term).filter_by(term_text="deep learning model").one()
+        db_session.add(Candidate(term_id=term.id, first_year=2015, last_year=2020, first_stable_year=2015,
+                                 max_consecutive=6, growth=2.0, total_mentions=6,
+                                 counts_per_year={"2015": 1, "2020": 2}))
+        db_session.commit()
+        term_id = term.id
+
+        with patch.object(VocabularyCoverage, "fetch") as mock_coverage_fetch, \
+                patch.object(CandidatesByYear, "fetch", autospec=True,
+                             side_effect=CandidatesByYear.fetch) as mock_candidates_fetch:
+            module.handle()
+
+            mock_coverage_fetch.assert_not_called()
+            mock_candidates_fetch.assert_called_once()
+
+        candidates_dir = Path(fake_experiment.directory) / "Траектория появления терминов-кандидатов"
+        assert (candidates_dir / f"{term_id}.png").exists()
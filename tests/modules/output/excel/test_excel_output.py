@@ -1,14 +1,18 @@
+import gzip
 from datetime import date
+from pathlib import Path
 from decimal import Decimal
 from unittest.mock import patch
 
 import pandas as pd
+import pyarrow.parquet as pq
 import pytest
+from openpyxl import load_workbook
 
 from factories.orm import TermDictionaryRefFactory, DictionaryFactory, TermFactory, ArticleFactory, \
     ArticleTermAnnotationFactory
 from src.modules.output.excel import ExcelOutput
-from src.orm.models import Dictionary
+from src.orm.models import Dictionary, TermYearCount
 
 
 class TestExcelOutput:
@@ -24,15 +28,17 @@ class TestExcelOutput:
             "SNOMED CT": "snomed_code_1"
         }
 
-    def test_handle(self, db_session, term_statistics_result):
+    def test_handle(self, db_session, fake_experiment, term_statistics_result):
         """Проверка, что запуск модуля приводит к выполнению цепочки связанных операций"""
 
         dictionaries = ["MeSH", "SNOMED CT"]
         module = ExcelOutput(dictionaries)
+        module.experiment = fake_experiment
 
         with patch.object(module, "_load_dictionaries") as mock_load_dicts, \
                 patch.object(module, "_load_statistics") as mock_load_stats, \
-                patch.object(module, "_generate_excel") as mock_generate:
+                patch.object(module, "_generate_excel") as mock_generate, \
+                patch.object(module, "_save_fingerprint"):
             # Мокаем параметры
             mesh = DictionaryFactory.build(name="MeSH")
             snomed = DictionaryFactory.build(name="SNOMED CT")
@@ -126,9 +132,15 @@ class TestExcelOutput:
         ArticleTermAnnotationFactory(article=article_2001, term=term_none)
         db_session.commit()
 
+        # 6. Частота терминов по годам и битовые маски словарей
+        TermYearCount.refresh(db_session)
+        Dictionary.refresh_term_masks(db_session)
+        db_session.commit()
+        db_session.expire_all()
+
         # Получаем результаты
         module = ExcelOutput([])
-        statistics = module._load_statistics(db_session, [mesh, snomed])
+        statistics = list(module._load_statistics(db_session, [mesh, snomed]))
 
         # Сравниваем с ожидаемыми данными
         expected = [
@@ -170,3 +182,107 @@ class TestExcelOutput:
             term_statistics_result["SNOMED CT"],
         ]
         assert expected == df.values[0].tolist()
+
+    def test_generate_excel_split_sheets(self, fake_experiment, term_statistics_result):
+        """Проверка, что при превышении лимита строк результаты разбиваются на листы"""
+        module = ExcelOutput([])
+        module.experiment = fake_experiment
+
+        results = [{**term_statistics_result, "Count": count} for count in range(1, 6)]
+
+        # Лимит в 3 строки: заголовок + 2 строки данных
+        with patch.object(ExcelOutput, "EXCEL_MAX_ROWS", 3):
+            excel_file = module._generate_excel(iter(results))
+
+        workbook = load_workbook(excel_file, read_only=True)
+        assert workbook.sheetnames == ["statistics", "statistics_2", "statistics_3"]
+
+        counts = []
+        for sheet in workbook.worksheets:
+            rows = list(sheet.values)
+            assert rows[0] == tuple(term_statistics_result.keys()), "На каждом листе должен быть заголовок"
+            counts += [row[3] for row in rows[1:]]
+
+        assert counts == [1, 2, 3, 4, 5]
+
+    def test_generate_excel_empty(self, fake_experiment):
+        """Проверка, что при отсутствии данных файл не создается"""
+        module = ExcelOutput([])
+        module.experiment = fake_experiment
+
+        assert module._generate_excel(iter([])) is None
+
+    def test_generate_parquet(self, fake_experiment, term_statistics_result):
+        """Проверка, что результаты сохранятся в Parquet-файл"""
+        module = ExcelOutput([])
+        module.experiment = fake_experiment
+
+        results = [{**term_statistics_result, "SNOMED CT": None}, term_statistics_result]
+
+        with patch.object(ExcelOutput, "BATCH_SIZE", 1):
+            parquet_file = module._generate_parquet(iter(results))
+
+        table = pq.read_table(parquet_file)
+        assert table.column_names == list(term_statistics_result.keys())
+        assert table.to_pylist() == [
+            {**term_statistics_result, "Year": 2000, "SNOMED CT": None},
+            {**term_statistics_result, "Year": 2000},
+        ]
+
+    def test_generate_csv(self, fake_experiment, term_statistics_result):
+        """Проверка, что результаты сохранятся в CSV-файл, сжатый gzip"""
+        module = ExcelOutput([])
+        module.experiment = fake_experiment
+
+        csv_file = module._generate_csv(iter([term_statistics_result]))
+
+        with gzip.open(csv_file, "rt", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+        assert lines == [
+            "Term,Word count,Year,Count,MeSH,SNOMED CT",
+            "term_in_both,1,2000,1,mesh_code_1,snomed_code_1",
+        ]
+
+    def test_unknown_format(self):
+        """Проверка, что неизвестный формат приводит к ошибке"""
+        with pytest.raises(ValueError) as exc_info:
+            ExcelOutput([], formats=["docx"])
+
+        assert "Неизвестный формат" in str(exc_info.value)
+
+    def test_handle_up_to_date(self, db_session, fake_experiment):
+        """Проверка, что файлы не перегенерируются, если входные данные не изменились"""
+        TermYearCount.refresh(db_session)
+        db_session.commit()
+
+        module = ExcelOutput([])
+        module.experiment = fake_experiment
+
+        with patch.object(module, "_load_statistics", return_value=[{"Term": "term"}]) as mock_load_stats:
+            module.handle()
+            module.handle()
+            assert mock_load_stats.call_count == 1, "Повторный запуск не должен перегенерировать файлы"
+
+            # Изменение параметров
+            module.formats = ["csv.gz"]
+            module.handle()
+            assert mock_load_stats.call_count == 2, "Изменились параметры - файлы перегенерируются"
+
+            # Удаление файла
+            (Path(fake_experiment.directory) / "statistics.csv.gz").unlink()
+            module.handle()
+            assert mock_load_stats.call_count == 3, "Файл удален - файлы перегенерируются"
+
+            # Принудительная перегенерация
+            module.force = True
+            module.handle()
+            assert mock_load_stats.call_count == 4, "force - файлы перегенерируются всегда"
+
+        # Изменение входных данных
+        module.force = False
+        TermFactory()
+        db_session.commit()
+        assert not module._is_up_to_date("statistics", module._fingerprint(db_session, module.SOURCES, {
+            "dictionaries": [], "formats": ["csv.gz"]
+        })), "Изменились входные данные - отпечаток не совпадает"
@@ -0,0 +1,73 @@
+import json
+from datetime import date
+from unittest.mock import patch
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Integer, MetaData, Table, Text, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from factories.orm import ArticleFactory, ArticleTermAnnotationFactory, TermFactory
+from src.modules.output.parquet import ParquetOutput
+from src.orm.models import Candidate
+
+
+class TestParquetOutput:
+
+    def test_handle(self, db_session, fake_experiment):
+        """Проверка, что таблицы выгружаются в Parquet с разбиением на партиции"""
+        article_2000 = ArticleFactory(pubdate=date(2000, 5, 1), author_keywords=["keyword"])
+        article_2001 = ArticleFactory(pubdate=date(2001, 7, 1))
+        term = TermFactory(term_text="term")
+        ArticleTermAnnotationFactory(article=article_2000, term=term)
+        ArticleTermAnnotationFactory(article=article_2001, term=term)
+        db_session.add(Candidate(term_id=term.id, first_year=2000, last_year=2001, first_stable_year=2000,
+                                 max_consecutive=2, growth=1.0, total_mentions=2,
+                                 counts_per_year={"2000": 1, "2001": 1}))
+        db_session.commit()
+        term_id = term.id
+
+        module = ParquetOutput(tables=["articles", "article_term_annotations", "candidates"])
+        module.experiment = fake_experiment
+        # Выгружаемые таблицы не относятся к таблицам, в которые пишет модуль (Module.tables)
+        assert module.tables == ()
+
+        # Пакеты по 1 строке - каждый пакет пишется отдельным файлом
+        with patch.object(module, "batch_size", 1):
+            module.handle()
+
+        parquet_dir = fake_experiment.directory + "/parquet"
+
+        # Статьи разбиты на партиции по году публикации
+        articles = ds.dataset(f"{parquet_dir}/articles", partitioning="hive").to_table()
+        assert sorted(articles.column("year").to_pylist()) == [2000, 2001]
+        assert sorted(articles.column("pubdate").to_pylist()) == [date(2000, 5, 1), date(2001, 7, 1)]
+        assert json.dumps(["keyword"]) in articles.column("author_keywords").to_pylist()
+
+        # Разметка разбита на партиции по модулю
+        annotations = ds.dataset(f"{parquet_dir}/article_term_annotations", partitioning="hive").to_table()
+        assert annotations.num_rows == 2
+        assert set(annotations.column("term_id").to_pylist()) == {term_id}
+
+        # Кандидаты без разбиения на партиции
+        candidates = ds.dataset(f"{parquet_dir}/candidates").to_table().to_pylist()
+        assert len(candidates) == 1
+        assert json.loads(candidates[0]["counts_per_year"]) == {"2000": 1, "2001": 1}
+
+    def test_arrow_schema(self):
+        """Проверка схемы Arrow: типы без соответствия в Python (tsvector) сохраняются строками"""
+        table = Table("sample", MetaData(), Column("id", BigInteger), Column("count", Integer),
+                      Column("text", Text), Column("data", JSON), Column("created_at", DateTime),
+                      Column("search", TSVECTOR))
+
+        schema = ParquetOutput()._arrow_schema(select(table))
+
+        assert schema.types == [pa.int64(), pa.int64(), pa.string(), pa.string(), pa.timestamp("us"), pa.string()]
+
+    def test_unknown_table(self):
+        """Проверка, что неизвестная таблица приводит к ошибке"""
+        with pytest.raises(ValueError) as exc_info:
+            ParquetOutput(tables=["unknown"])
+
+        assert "Неизвестная таблица" in str(exc_info.value)
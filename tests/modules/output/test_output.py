@@ -0,0 +1,47 @@
+from sqlalchemy import text
+
+from factories.orm import TermFactory
+from src.modules.cleaner.database import CleanerDatabase
+from src.modules.output.excel import ExcelOutput
+from src.orm.models import Candidate, TableGeneration
+
+
+class TestOutput:
+
+    def test_fingerprint(self, db_session):
+        """
+        Проверка отпечатка: очистка таблицы модулем очистки меняет отпечаток,
+        даже если новые данные того же объема получают те же id.
+        """
+        module = ExcelOutput([])
+        terms = TermFactory.create_batch(4)
+        db_session.commit()
+        term_ids = [term.id for term in terms]
+
+        def save_candidates(candidate_term_ids):
+            for term_id in candidate_term_ids:
+                db_session.add(Candidate(term_id=term_id, first_year=2015, last_year=2020, first_stable_year=2016,
+                                         max_consecutive=5, growth=2.0, total_mentions=6,
+                                         counts_per_year={"2015": 1, "2020": 2}))
+            db_session.commit()
+            return module._fingerprint(db_session, ("candidates",), {})
+
+        fingerprint = save_candidates(term_ids[:2])
+
+        # Те же данные - тот же отпечаток
+        assert module._fingerprint(db_session, ("candidates",), {}) == fingerprint
+        # Другие параметры - другой отпечаток
+        assert module._fingerprint(db_session, ("candidates",), {"param": 1}) != fingerprint
+
+        # Столько же других кандидатов с теми же id после очистки - другой отпечаток
+        CleanerDatabase(["Candidate"]).handle()
+        assert db_session.get(TableGeneration, "candidates").generation == 1
+        assert save_candidates(term_ids[2:]) != fingerprint
+
+        # Изменение на месте без отметки модуля не учитывается: содержимое таблиц не читается
+        fingerprint = module._fingerprint(db_session, ("candidates",), {})
+        db_session.execute(text("UPDATE candidates SET growth = 3.0"))
+        assert module._fingerprint(db_session, ("candidates",), {}) == fingerprint
+
+        TableGeneration.bump(db_session, ["candidates"])
+        assert module._fingerprint(db_session, ("candidates",), {}) != fingerprint
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.modules.module_registry import ModuleRegistry, _global_registry
+
+
+class TestModuleRegistry:
+
+    def test_registered_modules(self):
+        """Проверка, что все зарегистрированные пути импорта указывают на классы соответствующих модулей"""
+        for module, type in _global_registry.keys():
+            module_class = _global_registry.get(module, type)
+            assert (module_class.info().module, module_class.info().type) == (module, type)
+
+    def test_lazy_import(self):
+        """Проверка, что модуль импортируется только при запросе"""
+        registry = ModuleRegistry()
+        registry.register("pytest", "lazy", "src.modules.not_existing_module.NotExistingModule")
+
+        with pytest.raises(ModuleNotFoundError):
+            registry.get("pytest", "lazy")
+
+    def test_wrong_class(self):
+        """Проверка, что класс другого модуля приводит к ошибке"""
+        registry = ModuleRegistry()
+        registry.register("pytest", "other", "src.modules.pytest.pytest_module.PytestModule")
+
+        with pytest.raises(ValueError) as exc_info:
+            registry.get("pytest", "other")
+
+        assert "относится к модулю (pytest, pytest)" in str(exc_info.value)
+
+    def test_startup_import_time(self):
+        """
+        Проверка времени запуска workflow.py: тяжелые зависимости модулей не должны импортироваться при старте.
+        Замер: python -X importtime -c "import workflow"
+        """
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import workflow"],
+            cwd=Path(__file__).parents[2], capture_output=True, text=True, check=True
+        )
+
+        # Строки вида: "import time: self [us] | cumulative | imported package"
+        imports = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+                _, cumulative, name = line.split("|")
+                imports[name.strip()] = int(cumulative)
+
+        heavy = {"torch", "transformers", "gliner", "spacy", "owlready2", "matplotlib", "seaborn", "statsmodels"}
+        assert heavy.isdisjoint(imports), f"Импортированы при старте: {heavy & set(imports)}"
+
+        # До ленивого реестра импорт занимал ~10 сек, после - ~0.7 сек. Порог с запасом на медленное окружение.
+        assert imports["workflow"] < 3_000_000, f"Импорт workflow: {imports["workflow"] / 1e6:.2f} сек"
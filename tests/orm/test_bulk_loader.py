@@ -0,0 +1,102 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select, text
+
+from factories.orm import DictionaryFactory, TermDictionaryRefFactory, TermFactory
+from src.orm.bulk_loader import BulkLoader
+from src.orm.models import Article, TermDictionaryRef
+
+
+class TestBulkLoader:
+    """Тесты загрузки строк через COPY."""
+
+    def test_load(self, db_session):
+        """Проверка загрузки строк, в том числе колонок JSON, NULL и спецсимволов COPY"""
+        loader = BulkLoader(db_session, Article, ["pmid", "title", "abstract", "authors", "pubdate", "author_keywords"])
+
+        rows = (
+            (str(pmid), f"Title\t{pmid}", "Line 1\nLine 2 \\N", "Author", datetime.date(2020, 1, 1),
+             ["keyword"] if pmid == 1 else None)
+            for pmid in range(1, 4)
+        )
+        assert loader.load(rows) == 3
+
+        articles = db_session.scalars(select(Article).order_by(Article.pmid)).all()
+        assert [article.title for article in articles] == ["Title\t1", "Title\t2", "Title\t3"]
+        assert articles[0].abstract == "Line 1\nLine 2 \\N"
+        assert [article.author_keywords for article in articles] == [["keyword"], None, None]
+        # Вычисляемые колонки заполняются PostgreSQL
+        assert articles[0].title_hash is not None
+
+        assert (loader.rows_copied, loader.rows_inserted) == (3, 3)
+        assert loader.rows_per_sec > 0
+
+    def test_load_repeated(self, db_session):
+        """Проверка повторных загрузок: временная таблица создается один раз и очищается после переноса"""
+        columns = ["pmid", "title", "abstract", "authors", "pubdate"]
+        loader = BulkLoader(db_session, Article, columns, on_conflict="nothing", conflict_columns=["pmid"])
+
+        def rows(*pmids):
+            return [(str(pmid), "Title", "Abstract", "Author", datetime.date(2020, 1, 1)) for pmid in pmids]
+
+        assert loader.load(rows(1, 2)) == 2
+        assert loader.load(rows(2, 3)) == 1
+        db_session.commit()
+        assert loader.load(rows(4)) == 1
+        # Другой загрузчик с теми же колонками использует ту же временную таблицу
+        assert BulkLoader(db_session, Article, columns).load(rows(5)) == 1
+        db_session.commit()
+
+        assert db_session.scalars(select(Article.pmid).order_by(Article.pmid)).all() == ["1", "2", "3", "4", "5"]
+        assert (loader.rows_copied, loader.rows_inserted) == (5, 4)
+        assert db_session.execute(text("SELECT COUNT(*) FROM pg_class "
+                                       "WHERE relname LIKE '\\_bulk\\_%' AND relpersistence = 't'")).scalar() == 1
+
+        # Пустая загрузка не обращается к БД
+        with patch.object(db_session, "connection") as connection:
+            assert loader.load(iter([])) == 0
+        connection.assert_not_called()
+
+    def test_load_on_conflict(self, db_session):
+        """Проверка обработки конфликтов: nothing - пропуск, update - обновление, error - ошибка"""
+        dictionary = DictionaryFactory(name="MeSH")
+        term1, term2 = TermFactory(), TermFactory()
+        TermDictionaryRefFactory(term=term1, dictionary=dictionary, ref_id="old")
+        db_session.commit()
+
+        columns = ["term_id", "dictionary_id", "ref_id"]
+        rows = [(term1.id, dictionary.id, "new"), (term2.id, dictionary.id, "new")]
+
+        loader = BulkLoader(db_session, TermDictionaryRef, columns, on_conflict="nothing",
+                            conflict_columns=["term_id", "dictionary_id"])
+        assert loader.load(rows) == 1
+        assert self._ref_ids(db_session) == {term1.id: "old", term2.id: "new"}
+
+        loader = BulkLoader(db_session, TermDictionaryRef, columns, on_conflict="update",
+                            conflict_columns=["term_id", "dictionary_id"])
+        assert loader.load([(term1.id, dictionary.id, "updated")]) == 1
+        assert self._ref_ids(db_session) == {term1.id: "updated", term2.id: "new"}
+
+        # Загрузка в рамках транзакции сессии: после ошибки изменения откатываются
+        db_session.commit()
+        with pytest.raises(Exception, match="duplicate key"):
+            BulkLoader(db_session, TermDictionaryRef, columns).load(rows)
+        db_session.rollback()
+        assert self._ref_ids(db_session) == {term1.id: "updated", term2.id: "new"}
+
+    def test_validation(self, db_session):
+        """Проверка параметров загрузчика"""
+        with pytest.raises(ValueError, match="Неизвестная обработка конфликтов"):
+            BulkLoader(db_session, Article, ["pmid"], on_conflict="replace")
+
+        with pytest.raises(ValueError, match="нужно указать conflict_columns"):
+            BulkLoader(db_session, Article, ["pmid"], on_conflict="update")
+
+        with pytest.raises(ValueError, match="нет колонок: doi"):
+            BulkLoader(db_session, Article, ["pmid", "doi"])
+
+    @staticmethod
+    def _ref_ids(db_session) -> dict[int, str]:
+        return dict(db_session.execute(select(TermDictionaryRef.term_id, TermDictionaryRef.ref_id)).all())
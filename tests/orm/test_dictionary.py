@@ -0,0 +1,52 @@
+import pytest
+
+from factories.orm import DictionaryFactory, TermFactory, TermDictionaryRefFactory
+from src.orm.models import Dictionary
+
+
+class TestDictionary:
+    """Тесты битовых масок словарей."""
+
+    def test_refresh_term_masks(self, db_session):
+        """Проверка, что словарям назначаются биты, а терминам - маски словарей"""
+        mesh = DictionaryFactory(name="MeSH")
+        snomed = DictionaryFactory(name="SNOMED CT")
+
+        term_both = TermFactory(term_text="term_in_both")
+        term_snomed = TermFactory(term_text="term_in_snomed")
+        term_none = TermFactory(term_text="term_not_in_dict")
+
+        TermDictionaryRefFactory(term=term_both, dictionary=mesh)
+        TermDictionaryRefFactory(term=term_both, dictionary=snomed)
+        TermDictionaryRefFactory(term=term_snomed, dictionary=snomed)
+        db_session.commit()
+
+        Dictionary.refresh_term_masks(db_session)
+        db_session.commit()
+        db_session.expire_all()
+
+        assert (mesh.bit, snomed.bit) == (0, 1)
+        assert term_both.dictionary_mask == 0b11
+        assert term_snomed.dictionary_mask == 0b10
+        assert term_none.dictionary_mask == 0
+
+        assert Dictionary.bit_mask([mesh, snomed]) == 0b11
+        assert Dictionary.bit_mask([snomed]) == 0b10
+
+    def test_bit_mask_without_bit(self):
+        """Проверка, что маску нельзя получить для словаря без назначенного бита"""
+        with pytest.raises(RuntimeError) as exc_info:
+            Dictionary.bit_mask([DictionaryFactory.build(name="MeSH")])
+
+        assert "не назначен бит" in str(exc_info.value)
+
+    def test_refresh_term_masks_limit(self, db_session):
+        """Проверка, что словарей не больше, чем бит в маске"""
+        DictionaryFactory.create_batch(Dictionary.MAX_DICTIONARIES + 1)
+        db_session.commit()
+
+        with pytest.raises(ValueError, match="не больше 63 словарей"):
+            Dictionary.refresh_term_masks(db_session)
+
+        with pytest.raises(ValueError, match="от 0 до 62"):
+            Dictionary(name="MeSH", bit=63)
@@ -1,12 +1,27 @@
+import csv
+import json
+import os
+import pstats
 import sys
+from pathlib import Path
 from unittest.mock import patch
 
+import pytest
 import yaml
+from sqlalchemy import text
 
-from factories.workflow_factories import ConfigFactory
+from factories.workflow_factories import ConfigFactory, StageFactory, ModuleFactory
+from src.modules.cleaner.database import CleanerDatabase
+from src.modules.pytest.pytest_module import PytestModule
+from src.workflow.metrics import ModuleMetrics, measure
 from workflow import Workflow
 
 
+def _save_pid(self: PytestModule) -> None:
+    """Замена PytestModule.handle(): сохраняет id процесса, в котором запущен модуль"""
+    (Path(self.experiment.directory) / f"{self.param1}.pid").write_text(str(os.getpid()))
+
+
 class TestWorkflow:
     """
     Тестирование workflow.py
@@ -43,3 +58,141 @@ class TestWorkflow:
 
         # Проверяем, что был вызван PytestModule.handle()
         mock_handle.assert_called_once()
+
+    @pytest.fixture
+    def app(self, tmp_path):
+        """Workflow из трех этапов с тестовым модулем"""
+        with patch("workflow.Workflow._load_workflow_from_file"):
+            app = Workflow()
+
+        app.cfg = ConfigFactory(
+            experiment__directory=str(tmp_path),
+            stages=[StageFactory(name=f"Этап {idx}") for idx in range(1, 4)]
+        )
+        return app
+
+    def _run(self, app: Workflow) -> int:
+        """Запуск workflow, возвращает количество запущенных модулей"""
+        with patch("src.modules.pytest.pytest_module.PytestModule.handle") as mock_handle:
+            app.run()
+        return mock_handle.call_count
+
+    def test_workflow_run_cached(self, app):
+        """
+        Проверка, что этапы с неизмененными модулями и параметрами пропускаются,
+        а изменение параметров этапа приводит к запуску его и всех следующих этапов
+        """
+        assert self._run(app) == 3
+        assert self._run(app) == 0
+
+        app.cfg.stages[1].modules[0].params = {"param1": "value2"}
+        assert self._run(app) == 2
+        assert self._run(app) == 0
+
+    def test_workflow_run_other_experiment(self, app, tmp_path):
+        """Проверка, что другой эксперимент на той же БД запускает все этапы"""
+        assert self._run(app) == 3
+
+        app.cfg.experiment.directory = str(tmp_path / "other")
+        assert self._run(app) == 3
+        assert self._run(app) == 0
+
+    def test_workflow_run_after_cleaner(self, app):
+        """Проверка, что очистка таблиц с результатами этапов сбрасывает их кеш"""
+        with patch.object(PytestModule, "tables", ("candidates",)):
+            assert self._run(app) == 3
+
+            CleanerDatabase(["Term"]).handle()
+            assert self._run(app) == 3, "Term очищается вместе с candidates"
+
+            CleanerDatabase(["Article"]).handle()
+            assert self._run(app) == 0, "Таблицы с результатами этапов не очищались"
+
+    def test_workflow_run_without_cache(self, app):
+        """Проверка, что этап с cache: false запускается всегда, а следующие за ним - тоже"""
+        app.cfg.stages[1].cache = False
+
+        assert self._run(app) == 3
+        assert self._run(app) == 2
+
+    @pytest.mark.parametrize("from_stage", ["2", "Этап 2"])
+    def test_workflow_run_from_stage(self, app, from_stage):
+        """Проверка принудительного запуска этапа и всех следующих"""
+        self._run(app)
+
+        app.from_stage = from_stage
+        assert self._run(app) == 2
+
+    def test_workflow_run_only(self, app):
+        """Проверка принудительного запуска только выбранного этапа; следующие этапы запустятся при следующем запуске"""
+        self._run(app)
+
+        app.only = ["1"]
+        assert self._run(app) == 1
+
+        app.only = []
+        assert self._run(app) == 2
+
+    def test_workflow_run_unknown_stage(self, app):
+        """Проверка, что неизвестный этап приводит к ошибке"""
+        app.only = ["Неизвестный этап"]
+
+        with pytest.raises(ValueError) as exc_info:
+            app.run()
+
+        assert "Этап не найден" in str(exc_info.value)
+
+    def test_workflow_run_parallel(self, app, tmp_path):
+        """Проверка, что модули этапа с parallel: true запускаются в отдельных процессах"""
+        app.cfg.stages = [StageFactory(parallel=True, modules=[
+            ModuleFactory(params={"param1": f"module_{idx}"}) for idx in range(3)
+        ])]
+
+        with patch.object(PytestModule, "handle", _save_pid):
+            app.run()
+
+        pids = {int((tmp_path / f"module_{idx}.pid").read_text()) for idx in range(3)}
+        assert os.getpid() not in pids
+
+    def test_workflow_run_report(self, app, tmp_path):
+        """Проверка, что после запуска сохраняется отчет с метриками этапов и модулей"""
+        self._run(app)
+        app.cfg.stages[2].modules[0].params = {"param1": "value2"}
+        self._run(app)
+
+        report = json.loads((tmp_path / "run-report.json").read_text(encoding="utf-8"))
+        assert [stage["skipped"] for stage in report["stages"]] == [True, True, False]
+        assert report["stages"][2]["modules"][0]["module"] == "pytest-pytest"
+
+        with open(tmp_path / "run-report.csv", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["stage"] for row in rows] == ["Этап 3"]
+        assert {"wall_time", "cpu_time", "peak_rss_mb", "db_queries", "db_time", "items_per_sec"} <= set(rows[0])
+
+    def test_workflow_run_profile(self, app, tmp_path):
+        """Проверка, что с --profile сохраняется профиль каждого модуля"""
+        app.profile = True
+        self._run(app)
+
+        assert sorted(file.name for file in (tmp_path / "profiles").iterdir()) == [
+            "01-01-pytest-pytest.prof", "02-01-pytest-pytest.prof", "03-01-pytest-pytest.prof",
+        ]
+        pstats.Stats(str(tmp_path / "profiles" / "01-01-pytest-pytest.prof"))
+
+    def test_measure(self, db_session):
+        """Проверка подсчета запросов к БД и обработанных объектов в секунду"""
+        metrics = ModuleMetrics(stage="Этап", module="pytest-pytest")
+        # Транзакция и savepoint тестовой сессии открываются до измерения
+        db_session.execute(text("SELECT 1"))
+
+        with measure(metrics):
+            for _ in range(3):
+                db_session.execute(text("SELECT pg_sleep(0.01)"))
+
+        assert metrics.db_queries == 3
+        assert metrics.wall_time >= metrics.db_time >= 0.03
+        assert metrics.peak_rss_mb > 0
+        assert metrics.items_per_sec is None
+
+        metrics.items = 10
+        assert metrics.items_per_sec == round(10 / metrics.wall_time, 2)
@@ -0,0 +1,77 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from factories.workflow_factories import ConfigFactory
+from src.workflow.server import Job, WorkflowServer, request
+from workflow import _run_job
+
+
+class TestWorkflowServer:
+    """
+    Тестирование сервера workflow (python workflow.py serve)
+    """
+
+    @pytest.fixture
+    def server(self):
+        server = WorkflowServer(_run_job, port=0)
+        server.start()
+        try:
+            yield server
+        finally:
+            server.shutdown()
+
+    def _wait(self, server: WorkflowServer, job_id: int) -> dict:
+        """Ожидание завершения задания"""
+        for _ in range(100):
+            job = request(f"{server.url}/jobs/{job_id}")
+            if job["status"] in ("done", "failed"):
+                return job
+            time.sleep(0.05)
+        raise TimeoutError(f"Задание {job_id} не завершено")
+
+    def test_jobs_run_back_to_back(self, server, tmp_path):
+        """Проверка, что задания из очереди выполняются по одному в процессе сервера"""
+        workflow = ConfigFactory(experiment__directory=str(tmp_path)).model_dump()
+
+        with patch("src.modules.pytest.pytest_module.PytestModule.handle") as mock_handle:
+            first = request(f"{server.url}/jobs", {"file": "first.yaml", "workflow": workflow})
+            second = request(f"{server.url}/jobs", {"file": "second.yaml", "workflow": workflow, "only": ["1"]})
+
+            assert self._wait(server, first["id"])["status"] == "done"
+            job = self._wait(server, second["id"])
+
+        assert job["status"] == "done"
+        assert job["progress"] == {"stage": "Этап pytest", "position": 1, "stages": 1, "module": "pytest-pytest"}
+
+        # Второе задание запускает этап принудительно (--only), поэтому модуль запущен дважды
+        assert mock_handle.call_count == 2
+        assert [it["file"] for it in request(f"{server.url}/jobs")] == ["first.yaml", "second.yaml"]
+
+    def test_job_failed(self, server, tmp_path):
+        """Проверка, что ошибка задания не останавливает сервер"""
+        workflow = ConfigFactory(experiment__directory=str(tmp_path)).model_dump()
+
+        with patch("src.modules.pytest.pytest_module.PytestModule.handle", side_effect=RuntimeError("Ошибка модуля")):
+            job = request(f"{server.url}/jobs", {"workflow": workflow})
+            job = self._wait(server, job["id"])
+
+        assert job["status"] == "failed"
+        assert job["error"] == "Ошибка модуля"
+
+    def test_invalid_workflow(self, server):
+        """Проверка, что неверная конфигурация отклоняется до постановки в очередь"""
+        with pytest.raises(RuntimeError) as exc_info:
+            request(f"{server.url}/jobs", {"workflow": {"experiment": {}}})
+
+        assert "validation error" in str(exc_info.value)
+        assert request(f"{server.url}/jobs") == []
+
+    def test_job_config(self, tmp_path):
+        """Проверка, что задание содержит конфигурацию workflow"""
+        cfg = ConfigFactory(experiment__directory=str(tmp_path))
+        job = Job(id=1, workflow=cfg.model_dump(), submitted_at="2025-01-01T00:00:00")
+
+        assert job.config() == cfg
+        assert "workflow" not in job.summary()
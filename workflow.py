@@ -3,8 +3,14 @@
 Подробная информация находится в README.md
 """
 import argparse
+import datetime
+import hashlib
+import json
 import logging
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 logger = logging.getLogger("workflow")
 # Разрешаем только оффлайн-режим без скачивания моделей.
@@ -17,17 +23,81 @@ from pathlib import Path
 
 import yaml
 from dotenv import load_dotenv
+from sqlalchemy import func
 
 from src.container import container
-from src.workflow import Config
+from src.modules.module_registry import get_module_class
+from src.orm.models import StageRun
+from src.workflow import Config, Experiment, Stage, Module
+from src.workflow.metrics import ModuleMetrics, RunReport, StageMetrics, measure
+from src.workflow.server import COMMANDS, Job, main as server_main
+
+
+def _run_module(module: Module, experiment: Experiment, stage_name: str,
+                profile_file: Path | None = None) -> ModuleMetrics:
+    """
+    Запуск модуля workflow.
+
+    Args:
+        module: конфигурация модуля
+        experiment: эксперимент
+        stage_name: название этапа
+        profile_file: файл для профиля cProfile, None - без профилирования
+
+    Returns:
+        Метрики модуля
+    """
+    metrics = ModuleMetrics(stage=stage_name, module=f"{module.module}-{module.type}")
+
+    with measure(metrics, profile_file):
+        params = module.params or {}
+        module_obj = container.module(
+            module=module.module,
+            type=module.type,
+            **params
+        )
+        module_obj.experiment = experiment
+        module_obj.handle()
+
+    metrics.items = module_obj.items_processed
+    logger.info(f"[{metrics.module}] {metrics.wall_time:.2f} сек, запросов к БД: {metrics.db_queries}")
+
+    return metrics
+
+
+def _init_worker() -> None:
+    """
+    Инициализация процесса для параллельного запуска модулей.
+
+    Соединения с БД, унаследованные от основного процесса, не закрываются (они используются основным процессом),
+    а забываются: в воркере container.db_session() откроет свои соединения.
+    """
+    container.db_engine().dispose(close=False)
 
 
 class Workflow:
     """Класс для запуска workflow из файла workflow.yml"""
 
-    def __init__(self):
+    def __init__(self, cfg: Config | None = None, from_stage: str | None = None, only: list[str] | None = None,
+                 profile: bool = False):
+        """
+        Args:
+            cfg: конфигурация workflow, None - прочитать файл и параметры из командной строки
+            from_stage: запустить этап и все следующие без проверки кеша
+            only: запустить только эти этапы без проверки кеша
+            profile: сохранять профиль cProfile каждого модуля
+        """
+        self.from_stage = from_stage
+        self.only = list(only or [])
+        self.profile = profile
+        # Текущий этап и модуль, используется для отображения хода выполнения (см. src/workflow/server.py)
+        self.progress: dict = {}
+
         self._setup_log_level()
-        self._load_workflow_from_file()
+        if cfg is None:
+            self._load_workflow_from_file()
+        else:
+            self.cfg = cfg
 
     def _setup_log_level(self):
         """Настройка уровня и формата журналирования"""
@@ -41,29 +111,192 @@ class Workflow:
         """Чтение управляющей последовательности из файла workflow.yml"""
         parser = argparse.ArgumentParser()
         parser.add_argument("file", type=Path, help="Путь к файлу")
+        parser.add_argument("--from-stage", help="Запустить этап (номер с 1 или название) и все следующие "
+                                                 "без проверки кеша")
+        parser.add_argument("--only", action="append", default=[],
+                            help="Запустить только этот этап (номер с 1 или название) без проверки кеша. "
+                                 "Можно указать несколько раз")
+        parser.add_argument("--profile", action="store_true",
+                            help="Сохранить профиль cProfile каждого модуля в каталог profiles эксперимента")
         args = parser.parse_args()
 
         with open(args.file, "r", encoding="utf-8") as f:
             self.cfg = Config(**yaml.safe_load(f))
 
+        self.from_stage = args.from_stage
+        self.only = args.only
+        self.profile = args.profile
+
     def run(self):
-        """Запуск последовательности стадий"""
+        """
+        Запуск последовательности стадий.
+
+        Этап пропускается, если его хеш (модули, параметры и хеш предыдущего этапа) совпадает с сохраненным
+        в БД после последнего успешного запуска. После запуска этапа сохраненные хеши следующих этапов удаляются,
+        поэтому они тоже будут запущены. Хеш первого этапа зависит от эксперимента: другой эксперимент
+        на той же БД (например, из очереди сервера) запускает все этапы и сохраняет результаты в свой каталог.
+        """
         logger.info(self.cfg.experiment.name)
 
-        for stage in self.cfg.stages:
-            logger.info(stage.name)
-            for module in stage.modules:
-                params = module.params or {}
-                module_obj = container.module(
-                    module=module.module,
-                    type=module.type,
-                    **params
-                )
-                module_obj.experiment = self.cfg.experiment
-                module_obj.handle()
+        from_position = self._stage_position(self.from_stage) if self.from_stage else None
+        only_positions = {self._stage_position(selector) for selector in self.only}
+
+        # Отчет сохраняется и при ошибке - с метриками завершенных модулей
+        report = RunReport(
+            experiment=self.cfg.experiment.name,
+            started_at=datetime.datetime.now().isoformat(timespec="seconds")
+        )
+        run_start = time.perf_counter()
+
+        try:
+            stage_hash = self._experiment_hash()
+            for position, stage in enumerate(self.cfg.stages, start=1):
+                stage_hash = self._stage_hash(stage, stage_hash)
+                stage_metrics = StageMetrics(name=stage.name)
+                report.stages.append(stage_metrics)
+
+                if only_positions and position not in only_positions:
+                    logger.info(f"{stage.name}: пропущен (--only)")
+                    stage_metrics.skipped = True
+                    continue
+
+                forced = position in only_positions or (from_position is not None and position >= from_position)
+                if not forced and stage.cache and self._is_stage_done(position, stage_hash):
+                    logger.info(f"{stage.name}: пропущен, модули и параметры не изменились")
+                    stage_metrics.skipped = True
+                    continue
+
+                logger.info(stage.name)
+                self.progress.update(stage=stage.name, position=position, stages=len(self.cfg.stages), module=None)
+                stage_start = time.perf_counter()
+                if stage.parallel and len(stage.modules) > 1:
+                    self._run_parallel(position, stage, stage_metrics)
+                else:
+                    for idx, module in enumerate(stage.modules, start=1):
+                        self.progress["module"] = f"{module.module}-{module.type}"
+                        stage_metrics.modules.append(
+                            _run_module(module, self.cfg.experiment, stage.name,
+                                        self._profile_file(position, idx, module))
+                        )
+                stage_metrics.wall_time = round(time.perf_counter() - stage_start, 3)
+
+                self._save_stage_run(position, stage, stage_hash)
+        finally:
+            report.wall_time = round(time.perf_counter() - run_start, 3)
+            report_files = report.save(Path(self.cfg.experiment.directory))
+            logger.info(f"Отчет о запуске сохранен в файлы: {", ".join(str(file) for file in report_files)}")
+
+    def _run_parallel(self, position: int, stage: Stage, stage_metrics: StageMetrics) -> None:
+        """
+        Параллельный запуск модулей этапа, каждый модуль - в отдельном процессе со своей сессией БД.
+        Время этапа близко ко времени самого долгого модуля.
+
+        Args:
+            position: номер этапа
+            stage: этап
+            stage_metrics: метрики этапа, дополняются метриками модулей
+        """
+        with ProcessPoolExecutor(max_workers=len(stage.modules), initializer=_init_worker) as executor:
+            futures = [
+                executor.submit(_run_module, module, self.cfg.experiment, stage.name,
+                                self._profile_file(position, idx, module))
+                for idx, module in enumerate(stage.modules, start=1)
+            ]
+            for future in as_completed(futures):
+                # Исключение из модуля пробрасывается в основной процесс
+                stage_metrics.modules.append(future.result())
+
+    def _profile_file(self, position: int, idx: int, module: Module) -> Path | None:
+        """
+        Файл профиля модуля, если включено профилирование (--profile).
+        Просмотр: snakeviz <файл>
+        """
+        if not self.profile:
+            return None
+
+        filename = f"{position:02d}-{idx:02d}-{module.module}-{module.type}.prof"
+        return Path(self.cfg.experiment.directory) / "profiles" / filename
+
+    def _stage_position(self, selector: str) -> int:
+        """
+        Номер этапа по номеру (с 1) или названию.
+
+        Args:
+            selector: номер или название этапа
+
+        Returns:
+            Номер этапа
+        """
+        for position, stage in enumerate(self.cfg.stages, start=1):
+            if selector == str(position) or selector == stage.name:
+                return position
+
+        raise ValueError(f"Этап не найден: {selector}")
+
+    def _experiment_hash(self) -> str:
+        """Хеш эксперимента: название и каталог результатов"""
+        experiment = self.cfg.experiment
+        payload = json.dumps({"name": experiment.name, "directory": experiment.directory}, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _stage_hash(stage: Stage, upstream_hash: str) -> str:
+        """
+        Хеш этапа: модули с параметрами и хеш предыдущего этапа.
+        Название этапа не учитывается, чтобы переименование не приводило к повторному запуску.
+
+        Args:
+            stage: этап
+            upstream_hash: хеш предыдущего этапа
+
+        Returns:
+            Хеш SHA-256
+        """
+        payload = json.dumps(
+            {"upstream": upstream_hash, "modules": [module.model_dump() for module in stage.modules]},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _is_stage_done(position: int, stage_hash: str) -> bool:
+        """Этап уже выполнен с тем же хешем"""
+        with container.db_session() as session:
+            stage_run = session.get(StageRun, position)
+            return stage_run is not None and stage_run.hash == stage_hash
+
+    @staticmethod
+    def _save_stage_run(position: int, stage: Stage, stage_hash: str) -> None:
+        """
+        Сохранение хеша выполненного этапа.
+        Хеши следующих этапов удаляются: они выполнялись по данным, которые этот этап изменил.
+        """
+        tables = sorted({
+            table
+            for module in stage.modules
+            for table in get_module_class(module.module, module.type).tables
+        })
+
+        with container.db_session() as session:
+            session.query(StageRun).filter(StageRun.position > position).delete()
+            session.merge(StageRun(position=position, name=stage.name, hash=stage_hash, tables=tables,
+                                   finished_at=func.now()))
+            session.commit()
+
+
+def _run_job(job: Job) -> None:
+    """Запуск workflow из очереди сервера (python workflow.py serve)"""
+    app = Workflow(cfg=job.config(), from_stage=job.from_stage, only=job.only, profile=job.profile)
+    # Ход выполнения доступен клиентам сервера во время работы
+    job.progress = app.progress
+    app.run()
 
 
 if __name__ == "__main__":
     load_dotenv()
-    app = Workflow()
-    app.run()
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        # Сервер и клиент: python workflow.py serve | submit <файл> | status [<id задания>]
+        server_main(sys.argv[1:], _run_job)
+    else:
+        app = Workflow()
+        app.run()